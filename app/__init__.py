@@ -14,6 +14,7 @@ DEFAULT_PATHS = {
     "save_path": os.path.join(APP_ROOT, "checkpoints"),
     "credentials_file": os.path.join(APP_ROOT, "dimabra", "credentials"),  # Absolute path
     "roms_path": os.path.join(APP_ROOT, "roms"),  # Absolute path
+    "control_dir": os.path.join(APP_ROOT, "tmp", "control"),  # Web app -> training process requests
 }
 
 # Default training configuration
@@ -22,6 +23,44 @@ DEFAULT_TRAINING_CONFIG = {
     "num_envs": 1,
     "total_timesteps": 2000000,
     "autosave_freq": 100000,
+    "resume_from": "",
+    "supervise": False,
+    "stall_timeout": 600,
+    "max_restarts": 3,
+    "remote_env_hosts": "",
+    "remote_roms_path": "",
+    "vec_env_backend": "subprocess",
+    "vec_env_benchmark": False,
+    "benchmark_rollouts": 3,
+    "mixed_precision": "off",
+    "compile_policy": False,
+    "learner_cores": "",
+    "env_cores": "",
+    "learner_threads": 0,
+    "cpu_calibration": False,
+    "uint8_fast_path": False,
+    "rollout_memory_budget_gb": 8,
+    "rollout_memory_policy": "warn",
+    "checkpoint_keep_last": 5,
+    "checkpoint_store": False,
+    "checkpoint_keep_every": 0,
+    "checkpoint_keep_best": 1,
+    "pbt_population": 1,
+    "pbt_interval": 50000,
+    "pbt_fraction": 0.25,
+    "pbt_perturb": 0.2,
+    "plateau_check_freq": 100000,
+    "plateau_window": 100,
+    "plateau_min_improvement": 0.5,
+    "plateau_patience": 3,
+    "plateau_min_timesteps": 500000,
+    "profiler_report_freq": 10,
+    "episode_stats_window": 100,
+    "reproducible": False,
+    "action_repeat": 1,
+    "action_repeat_benchmark": False,
+    "rollout_workers": 2,
+    "shutdown_deadline": 8,
 }
 
 # Dictionary of available games and their IDs
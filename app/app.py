@@ -8,6 +8,7 @@ from app.routes.tensorboard_routes import create_tensorboard_blueprint
 from app.routes.dashboard_routes import create_dashboard_blueprint
 from app.routes.stream_routes import create_stream_blueprint
 from app.routes.settings_routes import create_settings_blueprint
+from app.routes.sweep_routes import create_sweep_blueprint
 import logging
 import requests
 from threading import Timer
@@ -44,6 +45,7 @@ app.register_blueprint(create_tensorboard_blueprint(training_manager, app_logger
 app.register_blueprint(create_stream_blueprint(training_manager, app_logger), url_prefix="/stream")
 app.register_blueprint(create_dashboard_blueprint(training_manager, app_logger))
 app.register_blueprint(create_settings_blueprint(app_logger), url_prefix="/settings")
+app.register_blueprint(create_sweep_blueprint(training_manager, app_logger), url_prefix="/sweeps")
 
 @app.route("/", methods=["GET"])
 def index():
@@ -2,24 +2,106 @@
 
 import threading
 import subprocess
+import signal
+import time
+import uuid
 import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
 from app.log_manager import LogManager
 
+LAUNCH_FILE_ENV = "DIAMBRA_LAUNCH_FILE"
+
+
+def record_launch_addresses():
+    """
+    Report the engine addresses of this `diambra run` launch to the ContainerManager.
+
+    Called by the launched script before it adds any remote addresses to `DIAMBRA_ENVS`.
+    The manager finds the group's containers by the host ports they publish.
+    """
+    path = os.getenv(LAUNCH_FILE_ENV)
+    if not path:
+        return
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(os.getenv("DIAMBRA_ENVS", ""))
+    os.replace(tmp_path, path)
+
+
+class ContainerOperation:
+    """
+    Status handle for an asynchronous container operation (start, stop or restart).
+    """
+
+    def __init__(self, group, action):
+        self.id = uuid.uuid4().hex[:12]
+        self.group = group
+        self.action = action
+        self.state = "pending"
+        self.error = None
+        self.started_at = time.time()
+        self.finished_at = None
+        self.done = threading.Event()
+
+    @property
+    def duration(self):
+        """Elapsed seconds, frozen once the operation has finished."""
+        end = self.finished_at or time.time()
+        return end - self.started_at
+
+    def finish(self, error=None):
+        """Mark the operation as finished, successfully or with an error."""
+        self.finished_at = time.time()
+        self.error = str(error) if error else None
+        self.state = "failed" if error else "done"
+        self.done.set()
+
+    def to_dict(self):
+        """Return a JSON-serializable view of the operation."""
+        return {
+            "id": self.id,
+            "group": self.group,
+            "action": self.action,
+            "state": self.state,
+            "error": self.error,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "duration": round(self.duration, 3),
+        }
+
 
 class ContainerManager:
-    def __init__(self, name, log_file="container_activity.log"):
+    max_operations = 20
+
+    def __init__(self, name, log_file="container_activity.log", stop_grace_period=10, stop_deadline=20,
+                 discovery_timeout=60):
         """
         Initialize the container manager.
 
         :param name: Unique name for this manager instance (e.g., 'training', 'rendering').
         :param log_file: Path to the file where container activity is logged.
+        :param stop_grace_period: Seconds containers get to exit after SIGTERM before being killed.
+        :param stop_deadline: Hard deadline in seconds for a stop operation to complete.
+        :param discovery_timeout: Seconds to wait for the launched containers to appear.
         """
         self.name = name
         self.log_file = log_file
         self.logger = LogManager(f"ContainerManager[{name}]")
         self.container_process = None  # Holds the process for the container
+        self.container_ids = []  # Docker ids of the containers launched by this manager
         self.monitoring_thread = None
         self.monitoring_active = threading.Event()
+        self.stop_grace_period = stop_grace_period
+        self.stop_deadline = stop_deadline
+        self.discovery_timeout = discovery_timeout
+        self.operations = OrderedDict()
+        self.latency = {"start": None, "stop": None, "restart": None}
+        self._launch_args = None
+        self.pickle_path = None  # Overrides the shared snapshot, e.g. for sweep trials
+        self._start_operation = None
+        self.stop_requested = False  # Distinguishes deliberate stops from crashes
+        self.last_output_time = None
 
     def _get_python_executable(self):
         """
@@ -54,23 +136,103 @@ class ContainerManager:
 
         :return: Path to the pickle file.
         """
+        if self.pickle_path:
+            return self.pickle_path
         temp_dir = os.path.join(os.getcwd(), "tmp")
         os.makedirs(temp_dir, exist_ok=True)
         return os.path.join(temp_dir, "training_manager_snapshot.pkl")
 
-    def start_container(self, container_group, script_path, num_envs):
+    def _new_operation(self, container_group, action):
+        """Create and register a status handle, dropping the oldest ones beyond `max_operations`."""
+        operation = ContainerOperation(container_group, action)
+        self.operations[operation.id] = operation
+        while len(self.operations) > self.max_operations:
+            self.operations.popitem(last=False)
+        return operation
+
+    def get_operation(self, operation_id):
+        """
+        Look up a container operation by id.
+
+        :param operation_id: Id returned by `start_container`, `stop_container` or `restart_container`.
+        :return: The ContainerOperation, or None if unknown.
+        """
+        return self.operations.get(operation_id)
+
+    @property
+    def start_operation(self):
+        """The ContainerOperation of the latest start, or None if the group was never started."""
+        return self._start_operation
+
+    def _get_launch_file(self, operation):
+        """
+        Get the file a launch's script reports its engine addresses to.
+
+        :return: Path to the (not yet existing) launch file.
+        """
+        launch_dir = os.path.join(os.getcwd(), "tmp", "launches")
+        os.makedirs(launch_dir, exist_ok=True)
+        return os.path.join(launch_dir, f"{operation.id}.txt")
+
+    def _list_container_ids(self, addresses):
+        """
+        List the ids of the running Docker containers publishing the given engine addresses.
+
+        :param addresses: `host:port` addresses reported by the launch.
+        :return: Set of full container ids.
+        """
+        container_ids = set()
+        for address in addresses:
+            result = subprocess.run(
+                ["docker", "ps", "-q", "--no-trunc", "--filter", f"publish={address.rsplit(':', 1)[-1]}"],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                timeout=10,
+            )
+            container_ids.update(result.stdout.split())
+        return container_ids
+
+    def start_container(self, container_group, script_path, num_envs, tracer=None, pickle_path=None):
         """
         Start a new container and monitor its logs in real-time.
 
+        The launch runs in the background; the returned handle reports when the
+        group's containers have been discovered.
+
         :param container_group: Group of containers ('training_group' or 'render_group').
         :param script_path: Path to the script to execute in the container.
         :param num_envs: Number of environments (1 for rendering).
+        :param tracer: Optional LaunchTracer recording the container spawn stage.
+        :param pickle_path: TrainingManager snapshot to train from; kept for restarts. Defaults to the shared one.
+        :return: ContainerOperation tracking the launch.
+        """
+        if pickle_path:
+            self.pickle_path = pickle_path
+        operation = self._new_operation(container_group, "start")
+        self._launch_args = (container_group, script_path, num_envs)
+        self._start_operation = operation
+        self.stop_requested = False
+        self.last_output_time = time.time()
+        self.monitoring_active.set()
+        threading.Thread(
+            target=self._launch,
+            args=(operation, container_group, script_path, num_envs, tracer),
+            daemon=True
+        ).start()
+        return operation
+
+    def _launch(self, operation, container_group, script_path, num_envs, tracer=None):
+        """
+        Spawn `diambra run` and record the ids of the containers it creates.
         """
+        operation.state = "running"
         try:
             python_executable = self._get_python_executable()
             roms_path = self._get_roms_path()
             pickle_path = self._get_pickle_path()
             num_envs = str(num_envs) if num_envs else "1"
+            launch_file = self._get_launch_file(operation)
 
             # Construct the full command
             command = [
@@ -89,17 +251,18 @@ class ContainerManager:
             self.logger.info(f"Starting container for group '{container_group}' with command: {' '.join(command)}")
 
             # Start the container as a subprocess
-            self.container_process = subprocess.Popen(
+            process = subprocess.Popen(
                 command,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
                 text=True,
                 bufsize=1,
                 encoding="utf-8",
+                env={**os.environ, "DIAMBRA_CONTAINER_GROUP": container_group, LAUNCH_FILE_ENV: launch_file},
                 creationflags=subprocess.CREATE_NEW_PROCESS_GROUP if os.name == "nt" else 0,
                 preexec_fn=None if os.name == "nt" else os.setsid
             )
-            self.monitoring_active.set()
+            self.container_process = process
 
             # Start a thread to monitor logs
             self.monitoring_thread = threading.Thread(
@@ -109,11 +272,67 @@ class ContainerManager:
             )
             self.monitoring_thread.start()
 
-            self.logger.info(f"Container for group '{container_group}' started successfully.")
+            spawn_start = time.time()
+            container_ids = self._discover_containers(launch_file, int(num_envs))
+            if os.path.isfile(launch_file):
+                os.remove(launch_file)
+            if tracer:
+                tracer.record(
+                    "container_spawn", spawn_start, time.time(),
+                    group=container_group, containers=len(container_ids),
+                )
+
+            if self.stop_requested:
+                # The stop may have stopped waiting for this launch, so tear down what it found
+                self.logger.info(f"Launch of group '{container_group}' was stopped during discovery; tearing it down.")
+                self._teardown(process, container_ids, container_group)
+                operation.finish(error=RuntimeError(f"Launch of group '{container_group}' was stopped."))
+                return
+            self.container_ids = container_ids
+
+            self.latency["start"] = operation.duration
+            self.logger.info(
+                f"Container for group '{container_group}' started successfully in {operation.duration:.2f}s "
+                f"with {len(self.container_ids)} container(s)."
+            )
+            operation.finish()
         except Exception as e:
             self.logger.error(f"Error starting container for group '{container_group}': {e}", exc_info=True)
+            operation.finish(error=e)
             self.stop_container(container_group)
 
+    def _discover_containers(self, launch_file, expected):
+        """
+        Wait for the launched script to report its engine addresses and look up their containers.
+
+        Only containers publishing this launch's ports are attributed to the group, so
+        containers started concurrently by other groups or tools are never claimed.
+
+        :param launch_file: File the script writes its `DIAMBRA_ENVS` to.
+        :param expected: Number of containers the launch should create.
+        :return: List of container ids attributed to this group.
+        """
+        deadline = time.time() + self.discovery_timeout
+        new_ids = set()
+        while time.time() < deadline and not self.stop_requested:
+            process = self.container_process
+            if process is None or process.poll() is not None:
+                break
+            if os.path.isfile(launch_file):
+                with open(launch_file, encoding="utf-8") as f:
+                    addresses = f.read().split()
+                new_ids = self._list_container_ids(addresses)
+                if len(new_ids) >= expected:
+                    break
+            time.sleep(0.5)
+
+        if len(new_ids) < expected:
+            self.logger.warning(
+                f"Discovered {len(new_ids)} of {expected} container(s) for '{self.name}' "
+                f"within {self.discovery_timeout}s."
+            )
+        return sorted(new_ids)
+
     def _monitor_logs(self, container_group):
         """
         Monitor the logs of the running container process.
@@ -122,9 +341,11 @@ class ContainerManager:
             self.logger.info(f"Skipping log monitoring for group: {container_group}.")
             return  # Skip monitoring logs for the render group
 
+        process = self.container_process
         self.logger.info(f"Monitoring logs for group: {container_group}.")
         try:
-            for line in self.container_process.stdout:
+            for line in process.stdout:
+                self.last_output_time = time.time()
                 if self.monitoring_active.is_set() and line.strip():
                     try:
                         self.logger.info(f"[{container_group}] {line.strip()}")
@@ -135,50 +356,166 @@ class ContainerManager:
         except Exception as e:
             self.logger.error(f"Error while monitoring logs for group '{container_group}': {e}", exc_info=True)
         finally:
-            self.container_process.wait()
-            if self.container_process.returncode != 0:
+            process.wait()
+            if process.returncode != 0:
                 self.logger.error(
-                    f"Container for group '{container_group}' exited with return code {self.container_process.returncode}."
+                    f"Container for group '{container_group}' exited with return code {process.returncode}."
                 )
 
-    def stop_container(self, container_group):
+    def stop_container(self, container_group, wait=False):
         """
-        Stop the running container and terminate log monitoring using 'diambra arena down'.
+        Stop this group's containers and terminate log monitoring.
+
+        Only the containers launched by this manager are stopped, in parallel, with a
+        graceful SIGTERM followed by a forced kill once the grace period expires.
+        The work runs in the background unless `wait` is set.
 
         :param container_group: Group of containers to stop.
+        :param wait: Block until the stop has completed.
+        :return: ContainerOperation tracking the stop.
+        """
+        operation = self._new_operation(container_group, "stop")
+        self.logger.info(f"Stopping container for group: {container_group}")
+        self.stop_requested = True
+        self.monitoring_active.clear()
+        thread = threading.Thread(target=self._shutdown, args=(operation, container_group), daemon=True)
+        thread.start()
+        if wait:
+            operation.done.wait()
+        return operation
+
+    def _shutdown(self, operation, container_group):
+        """
+        Stop the process and tracked containers within `stop_deadline` seconds.
         """
+        operation.state = "running"
         try:
-            self.logger.info(f"Stopping container for group: {container_group}")
-            self.monitoring_active.clear()
-
-            # Use 'diambra arena down' to gracefully stop the container group
-            try:
-                subprocess.run(
-                    ["diambra", "arena", "down"],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    check=True
-                )
-                self.logger.info(f"'diambra arena down' executed successfully for group: {container_group}")
-            except subprocess.CalledProcessError as e:
-                self.logger.error(
-                    f"Failed to stop container group '{container_group}' using 'diambra arena down': {e.stderr}"
-                )
+            # Let an in-flight launch finish so its containers are known
+            start_operation = self._start_operation
+            if start_operation and start_operation is not operation:
+                start_operation.done.wait(timeout=self.stop_deadline)
 
-            # Ensure the container process is terminated
-            if self.container_process and self.container_process.poll() is None:
-                self.container_process.terminate()
-                self.container_process.wait()
-                self.logger.info(f"Process for group '{container_group}' terminated successfully.")
+            self._teardown(self.container_process, list(self.container_ids), container_group)
 
+            self.latency["stop"] = operation.duration
+            self.logger.info(f"Group '{container_group}' stopped in {operation.duration:.2f}s.")
+            operation.finish()
         except Exception as e:
             self.logger.error(f"Failed to stop container for group '{container_group}': {e}", exc_info=True)
+            operation.finish(error=e)
         finally:
+            self.container_ids = []
             self.container_process = None
             if self.monitoring_thread and self.monitoring_thread.is_alive():
                 self.monitoring_thread.join(timeout=5)
 
+    def _teardown(self, process, container_ids, container_group):
+        """
+        Stop the process and the given containers in parallel within `stop_deadline` seconds.
+        """
+        with ThreadPoolExecutor(max_workers=len(container_ids) + 1) as executor:
+            futures = [executor.submit(self._stop_process, process, container_group)]
+            futures += [executor.submit(self._stop_docker_container, cid) for cid in container_ids]
+            _, pending = wait(futures, timeout=self.stop_deadline)
+
+        if pending:
+            raise TimeoutError(f"Stop of group '{container_group}' exceeded {self.stop_deadline}s deadline.")
+
+    def _stop_process(self, process, container_group):
+        """
+        Send SIGTERM to the `diambra run` process group, then SIGKILL after the grace period.
+        """
+        if process is None or process.poll() is not None:
+            return
+        try:
+            if os.name == "nt":
+                process.terminate()
+            else:
+                os.killpg(os.getpgid(process.pid), signal.SIGTERM)
+            process.wait(timeout=self.stop_grace_period)
+            self.logger.info(f"Process for group '{container_group}' terminated successfully.")
+        except subprocess.TimeoutExpired:
+            self.logger.warning(f"Process for group '{container_group}' ignored SIGTERM; killing it.")
+            if os.name == "nt":
+                process.kill()
+            else:
+                os.killpg(os.getpgid(process.pid), signal.SIGKILL)
+            process.wait(timeout=self.stop_grace_period)
+        except ProcessLookupError:
+            pass
+
+    def _stop_docker_container(self, container_id):
+        """
+        Stop a single container; Docker kills it if it outlives the grace period.
+        """
+        try:
+            subprocess.run(
+                ["docker", "stop", "--time", str(self.stop_grace_period), container_id],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                check=True,
+                timeout=self.stop_grace_period + 5,
+            )
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+            self.logger.warning(f"'docker stop' failed for container {container_id[:12]}: {e}; killing it.")
+            subprocess.run(
+                ["docker", "kill", container_id],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+            )
+
+    def restart_container(self, container_group):
+        """
+        Stop and relaunch this group with the arguments of its last start.
+
+        :param container_group: Group of containers to restart.
+        :return: ContainerOperation tracking the restart.
+        """
+        if not self._launch_args:
+            raise RuntimeError(f"Group '{container_group}' has never been started; nothing to restart.")
+
+        operation = self._new_operation(container_group, "restart")
+
+        def _restart():
+            operation.state = "running"
+            stop_operation = self.stop_container(container_group, wait=True)
+            if stop_operation.error:
+                operation.finish(error=stop_operation.error)
+                return
+            start_operation = self.start_container(*self._launch_args)
+            start_operation.done.wait()
+            if not start_operation.error:
+                self.latency["restart"] = operation.duration
+            operation.finish(error=start_operation.error)
+
+        threading.Thread(target=_restart, daemon=True).start()
+        return operation
+
+    def get_status(self):
+        """
+        Summarize the manager's containers, latencies and recent operations.
+
+        :return: JSON-serializable status dictionary.
+        """
+        return {
+            "name": self.name,
+            "running": self.is_monitoring(),
+            "container_ids": [cid[:12] for cid in self.container_ids],
+            "latency": {key: round(value, 3) if value is not None else None for key, value in self.latency.items()},
+            "operations": [operation.to_dict() for operation in self.operations.values()],
+        }
+
+    def get_exit_code(self):
+        """
+        Return the exit code of the container process.
+
+        :return: The return code, or None if the process is still running or was never started.
+        """
+        process = self.container_process
+        return process.poll() if process else None
+
     def is_monitoring(self):
         """
         Check if monitoring is active.
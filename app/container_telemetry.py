@@ -0,0 +1,187 @@
+# path: app/container_telemetry.py
+
+import threading
+import subprocess
+import json
+import time
+import re
+from collections import deque
+from app.log_manager import LogManager
+
+SIZE_UNITS = {
+    "b": 1,
+    "kb": 1000, "mb": 1000 ** 2, "gb": 1000 ** 3, "tb": 1000 ** 4,
+    "kib": 1024, "mib": 1024 ** 2, "gib": 1024 ** 3, "tib": 1024 ** 4,
+}
+
+
+def parse_size(text):
+    """
+    Convert a Docker size string (e.g. '512MiB', '1.2kB') to bytes.
+
+    :param text: Size string as printed by `docker stats`.
+    :return: Size in bytes, or None if it cannot be parsed.
+    """
+    match = re.match(r"^\s*([\d.]+)\s*([a-zA-Z]+)\s*$", text or "")
+    if not match:
+        return None
+    value, unit = match.groups()
+    factor = SIZE_UNITS.get(unit.lower())
+    return int(float(value) * factor) if factor else None
+
+
+def parse_pair(text):
+    """
+    Split a Docker 'used / total' column into two byte counts.
+
+    :param text: Column value such as '100MiB / 2GiB'.
+    :return: Tuple of (first, second) in bytes.
+    """
+    parts = (text or "").split("/")
+    if len(parts) != 2:
+        return None, None
+    return parse_size(parts[0]), parse_size(parts[1])
+
+
+def parse_percent(text):
+    """Convert '12.34%' to 12.34, or None."""
+    try:
+        return float((text or "").strip().rstrip("%"))
+    except ValueError:
+        return None
+
+
+class ContainerTelemetry:
+    """
+    Periodically samples `docker stats` for every container tracked by the given
+    ContainerManagers and keeps a bounded time series per container.
+    """
+
+    def __init__(self, container_managers, interval=5, max_samples=720):
+        """
+        Initialize the sampler.
+
+        :param container_managers: Mapping of group name (e.g. 'training_group') to ContainerManager.
+        :param interval: Seconds between samples.
+        :param max_samples: Samples kept per container (720 at 5s is one hour).
+        """
+        self.container_managers = container_managers
+        self.interval = interval
+        self.max_samples = max_samples
+        self.logger = LogManager("ContainerTelemetry")
+        self.series = {}  # container id -> deque of samples
+        self.container_groups = {}  # container id -> group name
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start sampling in a background thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self.logger.info(f"Container telemetry sampling every {self.interval}s.")
+
+    def stop(self):
+        """Stop sampling; collected series are kept until the next `clear`."""
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=self.interval * 2)
+        self._thread = None
+
+    def clear(self):
+        """Drop all collected samples."""
+        with self._lock:
+            self.series.clear()
+            self.container_groups.clear()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                self.logger.error(f"Error sampling container stats: {e}")
+            self._stop_event.wait(self.interval)
+
+    def sample(self):
+        """
+        Take one `docker stats` snapshot of all tracked containers.
+
+        :return: Number of containers sampled.
+        """
+        groups = {
+            container_id: group
+            for group, manager in self.container_managers.items()
+            for container_id in manager.container_ids
+        }
+        if not groups:
+            return 0
+
+        result = subprocess.run(
+            ["docker", "stats", "--no-stream", "--no-trunc", "--format", "{{json .}}", *groups.keys()],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            timeout=max(self.interval * 2, 10),
+        )
+        timestamp = time.time()
+
+        sampled = 0
+        with self._lock:
+            for line in result.stdout.splitlines():
+                if not line.strip():
+                    continue
+                stats = json.loads(line)
+                container_id = next((cid for cid in groups if cid.startswith(stats.get("ID", ""))), None)
+                if container_id is None:
+                    continue
+
+                mem_used, mem_limit = parse_pair(stats.get("MemUsage"))
+                net_rx, net_tx = parse_pair(stats.get("NetIO"))
+                block_read, block_write = parse_pair(stats.get("BlockIO"))
+                sample = {
+                    "t": timestamp,
+                    "cpu_percent": parse_percent(stats.get("CPUPerc")),
+                    "mem_bytes": mem_used,
+                    "mem_limit_bytes": mem_limit,
+                    "mem_percent": parse_percent(stats.get("MemPerc")),
+                    "net_rx_bytes": net_rx,
+                    "net_tx_bytes": net_tx,
+                    "block_read_bytes": block_read,
+                    "block_write_bytes": block_write,
+                    "pids": int(stats["PIDs"]) if str(stats.get("PIDs", "")).isdigit() else None,
+                }
+                self.series.setdefault(container_id, deque(maxlen=self.max_samples)).append(sample)
+                self.container_groups[container_id] = groups[container_id]
+                sampled += 1
+        return sampled
+
+    def get_series(self, group=None, since=None):
+        """
+        Return the collected time series with a per-container summary.
+
+        :param group: Only include containers of this group.
+        :param since: Only include samples taken after this UNIX timestamp.
+        :return: JSON-serializable dictionary keyed by short container id.
+        """
+        with self._lock:
+            containers = {}
+            for container_id, samples in self.series.items():
+                container_group = self.container_groups.get(container_id)
+                if group and container_group != group:
+                    continue
+                selected = [s for s in samples if since is None or s["t"] > since]
+                cpu = [s["cpu_percent"] for s in samples if s["cpu_percent"] is not None]
+                containers[container_id[:12]] = {
+                    "group": container_group,
+                    "summary": {
+                        "cpu_mean": round(sum(cpu) / len(cpu), 2) if cpu else None,
+                        "cpu_max": max(cpu) if cpu else None,
+                        "mem_bytes": samples[-1]["mem_bytes"] if samples else None,
+                        "samples": len(samples),
+                    },
+                    "samples": selected,
+                }
+        return {"interval": self.interval, "max_samples": self.max_samples, "containers": containers}
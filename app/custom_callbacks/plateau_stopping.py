@@ -0,0 +1,129 @@
+import os
+import json
+import time
+from collections import deque
+import numpy as np
+from stable_baselines3.common.callbacks import BaseCallback
+from app import DEFAULT_PATHS
+from app.tools.utils import load_run_report
+
+BUDGET_DIR = os.path.join(DEFAULT_PATHS["log_dir"], "budgets")
+
+
+# Stops runs whose rolling episode reward has flat-lined and accounts for the compute spent
+class PlateauStopping(BaseCallback):
+    def __init__(self, check_freq=100000, num_envs=1, window=100, min_improvement=0.5, patience=3,
+                 min_timesteps=500000, total_timesteps=None, run_id="", verbose=1):
+        """
+        Every `check_freq` timesteps, compare the rolling mean reward of the last `window`
+        episodes with the best seen so far. After `patience` checks in a row that improved the
+        best by less than `min_improvement`, training stops (never before `min_timesteps`).
+
+        Wall-clock time, env steps and steps/s are logged under `budget/` and written to
+        `logs/budgets/<run_id>.json` when training ends.
+        """
+        super(PlateauStopping, self).__init__(verbose)
+        self.check_freq = max(int(check_freq) // int(num_envs), 1)
+        self.window = int(window)
+        self.min_improvement = float(min_improvement)
+        self.patience = int(patience)
+        self.min_timesteps = int(min_timesteps)
+        self.total_timesteps = int(total_timesteps) if total_timesteps else None
+        self.run_id = run_id or f"untracked-{os.getpid()}"
+
+        self.episode_rewards = deque(maxlen=self.window)
+        self.best_mean = None
+        self.stale_checks = 0
+        self.history = []
+        self.stop_reason = None
+        self.start_time = None
+        self.start_timesteps = 0
+        self.last_check_time = None
+        self.last_check_timesteps = 0
+
+    def _on_training_start(self):
+        self.start_time = self.last_check_time = time.time()
+        self.start_timesteps = self.last_check_timesteps = self.num_timesteps
+
+    def _on_step(self) -> bool:
+        for info in self.locals.get("infos", []):
+            if "episode" in info:
+                self.episode_rewards.append(info["episode"]["r"])
+
+        if self.n_calls % self.check_freq != 0:
+            return True
+        return self._check()
+
+    def _check(self):
+        now = time.time()
+        steps_per_sec = (self.num_timesteps - self.last_check_timesteps) / max(now - self.last_check_time, 1e-9)
+        self.last_check_time, self.last_check_timesteps = now, self.num_timesteps
+
+        rolling_mean = float(np.mean(self.episode_rewards)) if self.episode_rewards else None
+        improvement = None
+        if rolling_mean is not None:
+            if self.best_mean is None:
+                self.best_mean = rolling_mean
+            else:
+                improvement = rolling_mean - self.best_mean
+                self.best_mean = max(self.best_mean, rolling_mean)
+                self.stale_checks = self.stale_checks + 1 if improvement < self.min_improvement else 0
+
+        self.history.append({
+            "timesteps": self.num_timesteps,
+            "rolling_reward": rolling_mean,
+            "improvement": improvement,
+            "steps_per_sec": round(steps_per_sec, 2),
+        })
+        if rolling_mean is not None:
+            self.logger.record("plateau/rolling_reward", rolling_mean)
+        self.logger.record("plateau/stale_checks", self.stale_checks)
+        self.logger.record("budget/steps_per_sec", steps_per_sec)
+        self.logger.record("budget/wall_clock_seconds", now - self.start_time)
+        self.logger.record("budget/env_steps", self.num_timesteps - self.start_timesteps)
+
+        if self.stale_checks >= self.patience and self.num_timesteps >= self.min_timesteps:
+            self.stop_reason = (
+                f"rolling reward improved by less than {self.min_improvement} over "
+                f"{self.patience} check(s) of {self.check_freq * self.training_env.num_envs} steps"
+            )
+            if self.verbose > 0:
+                print(f"Plateau detected at {self.num_timesteps} timesteps: {self.stop_reason}. Stopping training.")
+            return False
+        return True
+
+    def budget(self):
+        """Compute consumed by this run, and what stopping early saved."""
+        env_steps = self.num_timesteps - self.start_timesteps
+        wall_clock = time.time() - self.start_time if self.start_time else 0.0
+        report = {
+            "run_id": self.run_id,
+            "stopped_early": self.stop_reason is not None,
+            "stop_reason": self.stop_reason,
+            "num_timesteps": self.num_timesteps,
+            "env_steps": env_steps,
+            "wall_clock_seconds": round(wall_clock, 1),
+            "steps_per_sec": round(env_steps / wall_clock, 2) if wall_clock else None,
+            "best_rolling_reward": self.best_mean,
+            "history": self.history,
+        }
+        if self.total_timesteps:
+            remaining = max(self.total_timesteps - self.num_timesteps, 0)
+            report["total_timesteps"] = self.total_timesteps
+            report["saved_env_steps"] = remaining if self.stop_reason else 0
+            if self.stop_reason and report["steps_per_sec"]:
+                report["saved_seconds_estimate"] = round(remaining / report["steps_per_sec"], 1)
+        return report
+
+    def _on_training_end(self):
+        os.makedirs(BUDGET_DIR, exist_ok=True)
+        path = os.path.join(BUDGET_DIR, f"{self.run_id}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.budget(), f, indent=4)
+        if self.verbose > 0:
+            print(f"Compute budget report saved to: {path}")
+
+
+def load_budget_report(run_id=None):
+    """Return a run's compute budget report (the latest one by default), or None."""
+    return load_run_report(BUDGET_DIR, run_id)
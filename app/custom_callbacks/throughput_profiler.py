@@ -0,0 +1,179 @@
+import os
+import json
+import time
+from collections import deque
+from functools import wraps
+from stable_baselines3.common.callbacks import BaseCallback
+from app import DEFAULT_PATHS
+from app.tools.utils import load_run_report
+
+THROUGHPUT_DIR = os.path.join(DEFAULT_PATHS["log_dir"], "throughput")
+
+PHASES = ("env_seconds", "inference_seconds", "gae_seconds", "train_seconds")
+
+
+# Breaks every PPO update down into env stepping, policy inference, GAE and SGD time
+class ThroughputProfiler(BaseCallback):
+    def __init__(self, run_id="", report_freq=10, history=200, verbose=0):
+        """
+        Timestamps the rollout and training phase boundaries of every update:
+
+        - env_seconds: time spent inside `env.step` during the rollout.
+        - inference_seconds: the rest of the rollout, i.e. policy forward passes, rollout buffer
+          writes and the other callbacks' `_on_step`.
+        - gae_seconds: last-value prediction and `compute_returns_and_advantage`.
+        - train_seconds: from the end of the rollout to the start of the next one, i.e. the SGD
+          epochs plus the logger dump.
+
+        With the async collector backend the next rollout starts as soon as the update begins,
+        so train_seconds only covers the logger dump; the SGD time is hidden behind the rollout
+        and update_seconds is the figure to compare.
+
+        With the distributed backend the workers gather the rollout in one `env.collect` call,
+        so env_seconds is that whole call, with the workers' env stepping and inference
+        overlapping inside it. inference_seconds then only covers replaying the trajectory into
+        the buffer and callbacks; the `distributed/` metrics split the workers' time.
+
+        Each update is logged under `profiler/` and the report is written to
+        `logs/throughput/<run_id>.json` every `report_freq` updates and when training ends.
+        """
+        super(ThroughputProfiler, self).__init__(verbose)
+        self.run_id = run_id or f"untracked-{os.getpid()}"
+        self.report_freq = max(int(report_freq), 1)
+        self.updates = deque(maxlen=int(history))
+        self.totals = {phase: 0.0 for phase in PHASES}
+        self.update_count = 0
+        self.start_time = None
+
+        self._env_step = None
+        self._env_collect = None
+        self._env_seconds = 0.0
+        self._rollout_start = None
+        self._last_step = None
+        self._rollout = None
+        self._update_start = None
+
+    def _timed(self, method):
+        @wraps(method)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._env_seconds += time.perf_counter() - start
+        return timed
+
+    def _on_training_start(self):
+        self.start_time = self._update_start = time.perf_counter()
+        env = self.training_env
+        # The env is excluded from saved models, so timing it on the instance is safe for checkpoints
+        self._env_step = env.step
+        env.step = self._timed(self._env_step)
+        # Rollout workers (distributed backend) gather whole rollouts without `env.step`
+        if hasattr(env, "collect"):
+            self._env_collect = env.collect
+            env.collect = self._timed(self._env_collect)
+
+    def _on_rollout_start(self):
+        now = time.perf_counter()
+        if self._rollout is not None:
+            self._finish_update(now)
+        self._rollout_start = now
+        self._last_step = None
+        self._env_seconds = 0.0
+
+    def _on_step(self) -> bool:
+        self._last_step = time.perf_counter()
+        return True
+
+    def _on_rollout_end(self):
+        now = time.perf_counter()
+        rollout_seconds = now - self._rollout_start
+        gae_seconds = now - self._last_step if self._last_step is not None else 0.0
+        self._rollout = {
+            "end": now,
+            "rollout_seconds": rollout_seconds,
+            "env_seconds": self._env_seconds,
+            "inference_seconds": max(rollout_seconds - self._env_seconds - gae_seconds, 0.0),
+            "gae_seconds": gae_seconds,
+        }
+
+    def _finish_update(self, now):
+        rollout = self._rollout
+        self._rollout = None
+        steps = self.model.n_steps * self.model.n_envs
+        update_seconds = now - self._update_start
+        self._update_start = now
+
+        record = {
+            "update": self.update_count + 1,
+            "timesteps": self.num_timesteps,
+            "env_seconds": rollout["env_seconds"],
+            "inference_seconds": rollout["inference_seconds"],
+            "gae_seconds": rollout["gae_seconds"],
+            "train_seconds": now - rollout["end"],
+            "update_seconds": update_seconds,
+            "steps_per_sec": steps / update_seconds if update_seconds else None,
+            # Every sample of the rollout is seen once per epoch
+            "samples_per_sec": (
+                self.model.n_epochs * steps / (now - rollout["end"]) if now > rollout["end"] else None
+            ),
+        }
+        self.update_count += 1
+        self.updates.append(record)
+        for phase in PHASES:
+            self.totals[phase] += record[phase]
+
+        for key, value in record.items():
+            if key not in ("update", "timesteps") and value is not None:
+                self.logger.record(f"profiler/{key}", value)
+        if self.update_count % self.report_freq == 0:
+            self.write_report()
+
+    def report(self):
+        """Per-phase totals and shares over the run, plus the most recent updates."""
+        phase_total = sum(self.totals.values())
+        elapsed = time.perf_counter() - self.start_time if self.start_time else 0.0
+        recent = list(self.updates)
+        return {
+            "run_id": self.run_id,
+            "updates": self.update_count,
+            "num_timesteps": self.num_timesteps,
+            "n_steps": self.model.n_steps if self.model else None,
+            "num_envs": self.model.n_envs if self.model else None,
+            "batch_size": self.model.batch_size if self.model else None,
+            "n_epochs": self.model.n_epochs if self.model else None,
+            "elapsed_seconds": round(elapsed, 1),
+            "steps_per_sec": round(self.num_timesteps / elapsed, 2) if elapsed else None,
+            "phase_seconds": {phase: round(seconds, 3) for phase, seconds in self.totals.items()},
+            "phase_share": {
+                phase: round(seconds / phase_total, 3) if phase_total else None
+                for phase, seconds in self.totals.items()
+            },
+            "recent_updates": recent,
+        }
+
+    def write_report(self):
+        os.makedirs(THROUGHPUT_DIR, exist_ok=True)
+        path = os.path.join(THROUGHPUT_DIR, f"{self.run_id}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=4)
+        return path
+
+    def _on_training_end(self):
+        if self._rollout is not None:
+            self._finish_update(time.perf_counter())
+        if self._env_step is not None:
+            self.training_env.step = self._env_step
+            self._env_step = None
+        if self._env_collect is not None:
+            self.training_env.collect = self._env_collect
+            self._env_collect = None
+        path = self.write_report()
+        if self.verbose > 0:
+            print(f"Throughput report saved to: {path}")
+
+
+def load_throughput_report(run_id=None):
+    """Return a run's throughput report (the latest one by default), or None."""
+    return load_run_report(THROUGHPUT_DIR, run_id)
@@ -0,0 +1,56 @@
+import numpy as np
+import gymnasium as gym
+
+# Episode progress flags that must survive being skipped over by a repeat
+PROGRESS_FLAGS = ("round_done", "stage_done", "game_done", "episode_done", "env_done")
+
+
+# Agent-side frame skip: one decision is held for several env steps
+class ActionRepeat(gym.Wrapper):
+    def __init__(self, env, repeat=2):
+        """
+        Repeat every action `repeat` times, summing the rewards and max-pooling the frames of
+        the last two steps (so sprites that flicker between frames stay visible).
+
+        This stacks on top of the engine's `step_ratio`: every env step already advances the
+        game by `step_ratio` frames, so a decision covers `repeat * step_ratio` game frames.
+        The repeat stops early when the episode ends. Progress flags like `round_done` are
+        carried over from skipped steps so frame stacking after this wrapper still sees them.
+
+        With DIAMBRA's own frame stack (`stack_frames` > 1) the stacked channels are pooled
+        slot by slot; use the uint8 fast path so frames are stacked after this wrapper.
+        """
+        super(ActionRepeat, self).__init__(env)
+        if repeat < 1:
+            raise ValueError(f"ActionRepeat needs repeat >= 1, got {repeat}.")
+        self.repeat = int(repeat)
+        self.is_dict = isinstance(self.observation_space, gym.spaces.Dict)
+
+    def _frame(self, obs):
+        return obs["frame"] if self.is_dict else obs
+
+    def step(self, action):
+        total_reward = 0.0
+        previous_frame = None
+        flags = {}
+        for step in range(self.repeat):
+            if step == self.repeat - 1 and step > 0:
+                # Copied, since the inner env or a frame stack may reuse its output buffer
+                previous_frame = np.array(self._frame(obs), copy=True)
+            obs, reward, terminated, truncated, info = self.env.step(action)
+            total_reward += reward
+            for flag in PROGRESS_FLAGS:
+                if info.get(flag):
+                    flags[flag] = info[flag]
+            if terminated or truncated:
+                previous_frame = None
+                break
+
+        if previous_frame is not None:
+            pooled = np.maximum(previous_frame, self._frame(obs))
+            if self.is_dict:
+                obs["frame"] = pooled
+            else:
+                obs = pooled
+        info.update(flags)
+        return obs, total_reward, terminated, truncated, info
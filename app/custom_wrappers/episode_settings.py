@@ -1,20 +1,38 @@
 import random
-import uuid  # Import uuid for unique environment IDs
+from collections import Counter
 import gymnasium as gym
+from app.tools.characters import available_characters, game_type
+
+# Characters per player where a game picks more than one (tag team games)
+TEAM_SIZES = {"double": 2, "kof98umh": 3}
+
 
 class CharacterTester(gym.Wrapper):
-    def __init__(self, env, training_stats, min_episodes_per_character=10, eval_interval=20):
+    def __init__(self, env, training_stats=None, min_episodes_per_character=10, eval_interval=20, seed=None):
+        """
+        Rotates through the game's characters so each one gets played.
+
+        Every reset picks the least-played selection, breaking ties with a seeded RNG. The env
+        id and the default seed come from the env's rank and engine seed, so runs with the
+        same per-env seeds draw the same characters in the same order.
+
+        :param training_stats: Optional shared stats object providing `get_characters(env_id)`
+            and `update_stats(characters, reward, env_id)`; it replaces the built-in rotation.
+        :param seed: Seed of the character draws; defaults to the engine seed of this env.
+        """
         super(CharacterTester, self).__init__(env)
 
         # Use the provided TrainingStats instance to manage shared data
         self.training_stats = training_stats
-        
-        # Create a unique and persistent ID for this environment
-        self.env_id = uuid.uuid4().int
 
-        # Ensure that TrainingStats has been properly initialized
-        if self.training_stats is None:
-            raise ValueError("TrainingStats must be initialized before using CharacterSettings.")
+        # Persistent id of this environment: its rank within the vec env
+        env_settings = getattr(self.env.unwrapped, "env_settings", None)
+        self.env_id = getattr(env_settings, "rank", 0)
+        self.game_id = getattr(env_settings, "game_id", None)
+        if seed is None:
+            seed = getattr(env_settings, "seed", None)
+        # Mixing in the rank keeps the draws apart when every env got the same seed
+        self.rng = random.Random(None if seed is None else int(seed) * 1000003 + self.env_id)
 
         # Initialization parameters
         self.min_episodes_per_character = min_episodes_per_character
@@ -22,6 +40,23 @@ class CharacterTester(gym.Wrapper):
         self.current_episode_rewards = 0.0
         self.current_characters = None
         self.top_pool_selection = False
+        self.usage = Counter()
+
+    def _team_size(self):
+        return TEAM_SIZES.get(self.game_id, TEAM_SIZES.get(game_type.get(self.game_id), 1))
+
+    def _draw_characters(self):
+        """Pick the least-played characters, ties broken by the seeded RNG."""
+        roster = sorted(available_characters.get(self.game_id, []))
+        if not roster:
+            return None
+        team = []
+        for _ in range(min(self._team_size(), len(roster))):
+            candidates = [character for character in roster if character not in team]
+            fewest = min(self.usage[character] for character in candidates)
+            team.append(self.rng.choice([character for character in candidates if self.usage[character] == fewest]))
+        self.usage.update(team)
+        return team[0] if len(team) == 1 else tuple(team)
 
     def step(self, action):
         obs, reward, terminated, truncated, info = self.env.step(action)
@@ -31,33 +66,32 @@ class CharacterTester(gym.Wrapper):
 
         # Check if the episode has ended
         if terminated or truncated:
-            # Log or handle episode-end conditions
-            print(f"Total Reward for this episode: {self.current_episode_rewards}")
+            # Tag the last step so the episode statistics can group the reward by character pair
+            info["character_pair"] = self.current_characters
 
         return obs, reward, terminated, truncated, info
 
     def reset(self, **kwargs):
         # Update stats for the characters used in the last episode
-        if self.current_characters:
-            print(f"Updating stats for characters: {self.current_characters} with reward: {self.current_episode_rewards}")
-            self.training_stats.update_stats(self.current_characters, self.current_episode_rewards, self.env_id)  # Pass env_id here
+        if self.current_characters and self.training_stats is not None:
+            self.training_stats.update_stats(self.current_characters, self.current_episode_rewards, self.env_id)
 
         # Get a new set of characters for this episode
-        print("Requesting new character pair for reset...")
-        self.current_characters = self.training_stats.get_characters(self.env_id)  # Pass env_id to get unique characters
+        if self.training_stats is not None:
+            self.current_characters = self.training_stats.get_characters(self.env_id)
+        else:
+            self.current_characters = self._draw_characters()
 
         # Update episode settings and reset the environment
-        episode_settings = kwargs.get('options', {})
-        episode_settings.update({"characters": self.current_characters})
+        episode_settings = kwargs.get('options') or {}
+        if self.current_characters:
+            episode_settings.update({"characters": self.current_characters})
         kwargs['options'] = episode_settings
 
         # Reset rewards for the new episode
         self.current_episode_rewards = 0.0
 
-        # Display the character pair usage table after each episode
-        self.training_stats.display_usage_table()
-
-        print(f"Selected Characters for this episode: {self.current_characters}")
+        print(f"Env {self.env_id}: selected characters for this episode: {self.current_characters}")
 
         return self.env.reset(**kwargs)
 
@@ -65,12 +99,13 @@ class CharacterTester(gym.Wrapper):
 
 # Custom Wrapper to Incrementally Adjust Difficulty
 class DifficultySettings(gym.Wrapper):
-    def __init__(self, env, difficulty_range=(8, 8), total_timesteps=16000000, num_envs=1):
+    def __init__(self, env, difficulty_range=(8, 8), total_timesteps=16000000, num_envs=1, initial_steps=0):
         super(DifficultySettings, self).__init__(env)
         self.difficulty_range = difficulty_range
         self.total_timesteps = total_timesteps // num_envs  # Multiply by number of environments to get effective total steps
         self.steps_per_difficulty = self.total_timesteps // (difficulty_range[1] - difficulty_range[0] + 1)
-        self.total_steps = 0  # Track the total step count across all environments
+        self.total_steps = initial_steps  # Track the total step count across all environments; restored on resume
+        self.current_difficulty = None
         print(f"Initialized DifficultySettings with difficulty_range: {difficulty_range}, "
               f"effective_total_timesteps: {self.total_timesteps}, steps_per_difficulty: {self.steps_per_difficulty}")
 
@@ -81,6 +116,10 @@ class DifficultySettings(gym.Wrapper):
         # Proceed with the original step
         obs, reward, terminated, truncated, info = self.env.step(action)
 
+        # Tag the last step so the episode statistics can group the reward by difficulty
+        if (terminated or truncated) and self.current_difficulty is not None:
+            info["difficulty"] = self.current_difficulty
+
         return obs, reward, terminated, truncated, info
 
     def reset(self, **kwargs):
@@ -98,6 +137,8 @@ class DifficultySettings(gym.Wrapper):
               f"steps_per_difficulty: {self.steps_per_difficulty}, "
               f"calculated_difficulty: {current_difficulty}")
 
+        self.current_difficulty = current_difficulty
+
         # Update episode settings
         episode_settings = kwargs.get('options', {})
         episode_settings.update({
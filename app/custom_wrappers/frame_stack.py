@@ -0,0 +1,67 @@
+import numpy as np
+import gymnasium as gym
+
+
+# Frame stacking over a preallocated ring instead of deque + np.concatenate
+class RingFrameStack(gym.Wrapper):
+    def __init__(self, env, n_frames=4, dilation=1):
+        """
+        Stack the last `n_frames` frames (every `dilation`-th one) along the channel axis.
+
+        Drop-in replacement for DIAMBRA's FrameStack, applied after the other wrappers. Each
+        frame is written twice into a ring of 2 * n_frames * dilation slots, so the newest
+        window is always one contiguous, evenly strided slice and building the observation
+        is a single copy that keeps the frame dtype (uint8).
+        """
+        super(RingFrameStack, self).__init__(env)
+        frame_space = self.observation_space["frame"]
+        if frame_space.dtype != np.uint8:
+            raise ValueError(
+                f"RingFrameStack expects uint8 frames, got {frame_space.dtype}. "
+                f"Set 'exclude_image_scaling' so frames are not normalized to floats."
+            )
+
+        self.n_frames = n_frames
+        self.dilation = dilation
+        self.window = n_frames * dilation
+        height, width, channels = frame_space.shape
+        self.ring = np.zeros((2 * self.window, height, width, channels), dtype=np.uint8)
+        self.pos = 0
+
+        self.observation_space = gym.spaces.Dict({
+            **self.observation_space.spaces,
+            "frame": gym.spaces.Box(low=0, high=255, shape=(height, width, channels * n_frames), dtype=np.uint8),
+        })
+
+    def _fill(self, frame):
+        self.ring[:] = frame
+        self.pos = 0
+
+    def _push(self, frame):
+        self.pos = (self.pos + 1) % self.window
+        self.ring[self.pos] = frame
+        self.ring[self.pos + self.window] = frame
+
+    def _get_ob(self):
+        # Slots pos+1 .. pos+window hold the last `window` frames, oldest first
+        frames = self.ring[self.pos + self.dilation:self.pos + self.window + 1:self.dilation]
+        height, width, channels = frames.shape[1:]
+        return np.moveaxis(frames, 0, 2).reshape(height, width, channels * self.n_frames)
+
+    def reset(self, **kwargs):
+        obs, info = self.env.reset(**kwargs)
+        self._fill(obs["frame"])
+        obs["frame"] = self._get_ob()
+        return obs, info
+
+    def step(self, action):
+        obs, reward, terminated, truncated, info = self.env.step(action)
+
+        # Start from a full stack of the new frame on a new round / stage / continue, like FrameStack
+        if (info.get("round_done") or info.get("stage_done") or info.get("game_done")) and not (terminated or truncated):
+            self._fill(obs["frame"])
+        else:
+            self._push(obs["frame"])
+
+        obs["frame"] = self._get_ob()
+        return obs, reward, terminated, truncated, info
@@ -0,0 +1,166 @@
+# path: app/remote_env_manager.py
+
+import threading
+import subprocess
+import os
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+from app.log_manager import LogManager
+
+ENGINE_IMAGE = "docker.io/diambra/engine:latest"
+ENGINE_PORT = "50051/tcp"
+LOCAL_HOST = "local"
+
+
+def parse_remote_hosts(spec):
+    """
+    Parse the `remote_env_hosts` setting.
+
+    :param spec: Comma-separated `<docker_host>=<num_envs>` entries, e.g.
+        "tcp://10.0.0.5:2375=4,local=2". `local` uses the local Docker daemon as a stand-in.
+    :return: List of (docker_host, num_envs) tuples.
+    """
+    hosts = []
+    for entry in (spec or "").split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        docker_host, _, count = entry.rpartition("=")
+        if not docker_host or not count.isdigit() or int(count) < 1:
+            raise ValueError(f"Invalid remote env host entry '{entry}'. Expected '<docker_host>=<num_envs>'.")
+        hosts.append((docker_host.strip(), int(count)))
+    return hosts
+
+
+class RemoteEnvPool:
+    """
+    Launches DIAMBRA engine containers on additional Docker daemons so a single
+    learner can step environments spread across several machines.
+    """
+
+    def __init__(self, image=ENGINE_IMAGE, credentials_path=None):
+        """
+        Initialize the pool.
+
+        :param image: Engine image to run on each host.
+        :param credentials_path: DIAMBRA credentials file on the Docker hosts.
+        """
+        self.image = image
+        self.credentials_path = credentials_path or os.path.join(os.path.expanduser("~"), ".diambra", "credentials")
+        self.logger = LogManager("RemoteEnvPool")
+        self.containers = []  # (docker_host, container_id, address)
+        self._lock = threading.Lock()
+
+    @property
+    def addresses(self):
+        """Engine addresses (`host:port`) of the running containers."""
+        return [address for _, _, address in self.containers]
+
+    def _docker(self, docker_host, *args, timeout=60):
+        """
+        Run a docker CLI command against the given daemon.
+
+        :return: Stripped stdout of the command.
+        """
+        command = ["docker"] + ([] if docker_host == LOCAL_HOST else ["-H", docker_host]) + list(args)
+        result = subprocess.run(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            check=True,
+            timeout=timeout,
+        )
+        return result.stdout.strip()
+
+    def _start_engine(self, docker_host, roms_path):
+        """
+        Start one engine container and resolve the address it is reachable on.
+
+        :return: Tuple of (docker_host, container_id, address).
+        """
+        container_id = self._docker(
+            docker_host, "run", "-d", "--rm",
+            "-p", ENGINE_PORT.split("/")[0],
+            "-v", f"{roms_path}:/opt/diambraArena/roms",
+            "-v", f"{self.credentials_path}:/tmp/.diambra/credentials",
+            self.image,
+        )
+        # `docker port` prints e.g. "0.0.0.0:49153"; the host part is replaced by the daemon's address
+        port = self._docker(docker_host, "port", container_id, ENGINE_PORT).splitlines()[0].rsplit(":", 1)[1]
+        hostname = "127.0.0.1" if docker_host == LOCAL_HOST else urlparse(docker_host).hostname
+        return docker_host, container_id, f"{hostname}:{port}"
+
+    def start(self, hosts, roms_path):
+        """
+        Start engine containers on every host in parallel.
+
+        :param hosts: List of (docker_host, num_envs) tuples from `parse_remote_hosts`.
+        :param roms_path: ROMs directory on the Docker hosts.
+        :return: List of engine addresses.
+        """
+        jobs = [docker_host for docker_host, count in hosts for _ in range(count)]
+        if not jobs:
+            return []
+
+        self.logger.info(f"Starting {len(jobs)} remote env container(s) on {len(hosts)} host(s)...")
+        with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+            futures = [executor.submit(self._start_engine, docker_host, roms_path) for docker_host in jobs]
+            results, errors = [], []
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    errors.append(e)
+
+        with self._lock:
+            self.containers.extend(results)
+
+        if errors:
+            self.logger.error(f"Failed to start {len(errors)} remote env container(s): {errors[0]}")
+            self.stop(wait=True)
+            raise RuntimeError(f"Failed to start remote env containers: {errors[0]}")
+
+        self.logger.info(f"Remote env addresses: {self.addresses}")
+        return self.addresses
+
+    def stop(self, wait=False):
+        """
+        Stop all remote engine containers in parallel.
+
+        :param wait: Block until every container has been stopped.
+        """
+        with self._lock:
+            containers, self.containers = self.containers, []
+        if not containers:
+            return
+
+        def _stop_all():
+            with ThreadPoolExecutor(max_workers=len(containers)) as executor:
+                for docker_host, container_id, _ in containers:
+                    executor.submit(self._stop_engine, docker_host, container_id)
+            self.logger.info(f"Stopped {len(containers)} remote env container(s).")
+
+        if wait:
+            _stop_all()
+        else:
+            threading.Thread(target=_stop_all, daemon=True).start()
+
+    def _stop_engine(self, docker_host, container_id):
+        try:
+            self._docker(docker_host, "stop", "--time", "10", container_id, timeout=30)
+        except Exception as e:
+            self.logger.warning(f"Failed to stop remote container {container_id[:12]} on {docker_host}: {e}")
+
+    def get_status(self):
+        """
+        Summarize the running remote containers.
+
+        :return: JSON-serializable status dictionary.
+        """
+        return {
+            "containers": [
+                {"docker_host": docker_host, "container_id": container_id[:12], "address": address}
+                for docker_host, container_id, address in self.containers
+            ],
+        }
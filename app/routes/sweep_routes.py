@@ -0,0 +1,76 @@
+# path: routes/sweep_routes.py
+
+from flask import Blueprint, request, jsonify
+from app.sweep_manager import SweepManager
+
+
+def create_sweep_blueprint(training_manager, app_logger):
+    """
+    Create the sweep blueprint for running hyperparameter sweeps.
+
+    :param training_manager: Global TrainingManager instance providing blueprints and the active config.
+    :param app_logger: Global logger instance to be shared across blueprints.
+    :return: Sweep blueprint.
+    """
+    logger = app_logger.__class__("sweep_routes")
+
+    sweep_blueprint = Blueprint("sweep_routes", __name__)
+    sweep_manager = SweepManager(training_manager)
+
+    @sweep_blueprint.route("/start", methods=["POST"])
+    def start_sweep():
+        """
+        Start a sweep.
+
+        Example body: `{"base_config": "my_config", "method": "random", "num_trials": 12, "max_envs": 16,
+        "training_config": {"num_envs": 4, "total_timesteps": 500000},
+        "space": {"hyperparameters.learning_rate_start": {"min": 1e-5, "max": 1e-3, "log": true},
+                  "wrapper_settings.stack_frames": [2, 4]},
+        "median_stopping": {"grace_timesteps": 100000, "min_trials": 3}}`
+        """
+        data = request.get_json(silent=True)
+        if not data or not data.get("space"):
+            return jsonify({"status": "error", "message": "A sweep needs a parameter 'space'."}), 400
+        try:
+            sweep = sweep_manager.start(data)
+            return jsonify({"status": "success", "message": f"Sweep started with {len(sweep['results'])} trial(s).", "sweep": sweep})
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+        except Exception as e:
+            logger.error(f"Error starting sweep: {str(e)}", exc_info=True)
+            return jsonify({"status": "error", "message": f"Failed to start sweep: {str(e)}"}), 500
+
+    @sweep_blueprint.route("/", methods=["GET"])
+    def list_sweeps():
+        """List past and running sweeps, newest first."""
+        try:
+            return jsonify({"status": "success", "sweeps": sweep_manager.list_sweeps()})
+        except Exception as e:
+            logger.error(f"Error listing sweeps: {str(e)}", exc_info=True)
+            return jsonify({"status": "error", "message": f"Failed to list sweeps: {str(e)}"}), 500
+
+    @sweep_blueprint.route("/<sweep_id>", methods=["GET"])
+    def get_sweep(sweep_id):
+        """Return a sweep's results table, best trial first."""
+        try:
+            report = sweep_manager.report(sweep_id)
+            if report is None:
+                return jsonify({"status": "error", "message": f"Sweep '{sweep_id}' not found."}), 404
+            return jsonify({"status": "success", "sweep": report})
+        except Exception as e:
+            logger.error(f"Error loading sweep '{sweep_id}': {str(e)}", exc_info=True)
+            return jsonify({"status": "error", "message": f"Failed to load sweep: {str(e)}"}), 500
+
+    @sweep_blueprint.route("/<sweep_id>/stop", methods=["POST"])
+    def stop_sweep(sweep_id):
+        """Stop a running sweep and its trials."""
+        try:
+            report = sweep_manager.stop(sweep_id)
+            if report is None:
+                return jsonify({"status": "error", "message": f"Sweep '{sweep_id}' is not running."}), 404
+            return jsonify({"status": "success", "message": f"Stopping sweep '{sweep_id}'.", "sweep": report})
+        except Exception as e:
+            logger.error(f"Error stopping sweep '{sweep_id}': {str(e)}", exc_info=True)
+            return jsonify({"status": "error", "message": f"Failed to stop sweep: {str(e)}"}), 500
+
+    return sweep_blueprint
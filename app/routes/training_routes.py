@@ -14,12 +14,35 @@ import json
 import gc
 from app.tools.utils import save_to_pickle
 import platform
+import uuid
 from datetime import datetime
 from app.container_manager import ContainerManager
+from app.training_supervisor import TrainingSupervisor
+from app.container_telemetry import ContainerTelemetry
+from app.remote_env_manager import RemoteEnvPool, parse_remote_hosts
+from app.tools.launch_trace import LaunchTracer, load_waterfall, latest_run_id
+from app.tools.vec_env_backends import load_latest_benchmark
+from app.tools.preflight import load_preflight_report
+from app.tools.rollout_memory import advise_rollout_memory, describe_advice
+from app.tools.checkpoint_store import CheckpointStore, list_checkpoints
+from app.tools.pbt import load_pbt_report
+from app.custom_callbacks.plateau_stopping import load_budget_report
+from app.custom_callbacks.throughput_profiler import load_throughput_report
+from app.tools.profiler_capture import request_profile, load_profile_status
+from app.tools.control_channel import send_command, load_control_state
+from app.tools.reproducibility import load_run_spec
+from app.tools.shutdown import load_shutdown_report
+from app.tools.utils import parse_bool
 
 # Initialize managers
 training_container_manager = ContainerManager("training", log_file="logs/training_containers.log")
 rendering_container_manager = ContainerManager("rendering", log_file="logs/rendering_containers.log")
+training_supervisor = TrainingSupervisor(training_container_manager)
+remote_env_pool = RemoteEnvPool()
+container_telemetry = ContainerTelemetry({
+    "training_group": training_container_manager,
+    "render_group": rendering_container_manager,
+})
 
 enable_crt_shader = False
 
@@ -43,6 +66,7 @@ def create_training_blueprint(training_manager, app_logger, ):
     # Shared state for training
     training_thread = None
     training_lock = threading.Lock()  # Ensure thread-safe access to training_manager
+    training_starting = threading.Event()  # Set while a start launches remote envs outside the lock
 
     def serialize_config(config):
         """Prepare the configuration dictionary for JSON serialization."""
@@ -68,10 +92,14 @@ def create_training_blueprint(training_manager, app_logger, ):
         gc.collect()  # Run garbage collection to free up memory
 
         with training_lock:
-            if training_container_manager.is_monitoring():
+            if training_container_manager.is_monitoring() or training_starting.is_set():
                 return jsonify({"status": "running", "message": "Training is already in progress."})
 
             try:
+                # Every launch stage, on both sides, is recorded under this run id
+                run_id = uuid.uuid4().hex[:12]
+                tracer = LaunchTracer(run_id, side="web")
+
                 # Parse request data
                 data = request.get_json() or {}
                 logger.debug(f"Received training data: {json.dumps(data, indent=4)}")
@@ -81,6 +109,18 @@ def create_training_blueprint(training_manager, app_logger, ):
                 if num_envs < 1:
                     return jsonify({"status": "error", "message": "Number of environments must be at least 1."}), 400
 
+                # Split environments between the local `diambra run` and remote Docker hosts
+                try:
+                    remote_hosts = parse_remote_hosts(data.get("training_config", {}).get("remote_env_hosts"))
+                except ValueError as e:
+                    return jsonify({"status": "error", "message": str(e)}), 400
+                local_envs = num_envs - sum(count for _, count in remote_hosts)
+                if local_envs < 1:
+                    return jsonify({
+                        "status": "error",
+                        "message": "Remote env hosts must leave at least 1 of the environments to run locally.",
+                    }), 400
+
                 # Update training configuration
                 updated_config = {
                     "training_config": data.get("training_config", {}),
@@ -97,7 +137,8 @@ def create_training_blueprint(training_manager, app_logger, ):
 
                 logger.debug("Updating training configuration with:")
                 logger.debug(json.dumps(updated_config, indent=4))
-                training_manager.update_config(updated_config)
+                with tracer.stage("config_update"):
+                    training_manager.update_config(updated_config)
 
                 # Validate active configuration
                 active_config = training_manager.get_active_config()
@@ -105,63 +146,461 @@ def create_training_blueprint(training_manager, app_logger, ):
                     logger.error("No valid active configuration found in TrainingManager.")
                     return jsonify({"status": "error", "message": "Failed to set active training configuration."}), 500
 
-                logger.info("Training configuration successfully updated.")
-                logger.info(json.dumps(active_config, indent=4))
-
-                # Save the updated TrainingManager state
-                temp_dir = os.path.join(os.getcwd(), "tmp")
-                pickle_path = save_to_pickle(training_manager, "training_manager_snapshot.pkl", custom_dir=temp_dir)
-                logger.info(f"TrainingManager state saved to {pickle_path}")
-
-                # Define script paths
-                training_script_path = os.path.join(os.getcwd(), "training_script.py")
-                rendering_script_path = os.path.join(os.getcwd(), "render_script.py")
+                # Size the rollout buffer before anything is launched
+                rollout_memory = advise_rollout_memory(active_config)
+                if not rollout_memory["within_budget"]:
+                    message = describe_advice(rollout_memory)
+                    if active_config["training_config"].get("rollout_memory_policy") == "refuse":
+                        logger.error(message)
+                        return jsonify({"status": "error", "message": message, "rollout_memory": rollout_memory}), 400
+                    logger.warning(message)
 
-                # Start training containers
-                training_container_manager.start_container(
-                    container_group="training_group",
-                    script_path=training_script_path,
-                    num_envs=num_envs
-                )
-
-                # Start rendering container
-                rendering_container_manager.start_container(
-                    container_group="render_group",
-                    script_path=training_script_path,
-                    num_envs=1  # Fixed to 1 for rendering
-                )
-
-                return jsonify({"status": "success", "message": "Training and rendering containers started successfully."})
+                remote_roms_path = active_config["training_config"].get("remote_roms_path") or DEFAULT_PATHS["roms_path"]
+                training_starting.set()
 
             except Exception as e:
                 logger.error(f"Error during training setup: {str(e)}", exc_info=True)
                 return jsonify({"status": "error", "message": f"Failed to start training: {str(e)}"}), 500
 
+        try:
+            # Launch remote env containers without holding the lock; `training_starting` keeps other starts out
+            try:
+                remote_env_pool.stop(wait=True)
+                with tracer.stage("remote_env_start", containers=num_envs - local_envs):
+                    remote_addresses = remote_env_pool.start(remote_hosts, roms_path=remote_roms_path)
+            except Exception as e:
+                logger.error(f"Error starting remote env containers: {str(e)}", exc_info=True)
+                return jsonify({"status": "error", "message": f"Failed to start training: {str(e)}"}), 500
+
+            with training_lock:
+                try:
+                    # Hand the remote addresses to the training process
+                    active_config["training_config"]["remote_env_addresses"] = " ".join(remote_addresses)
+                    active_config["training_config"]["run_id"] = run_id
+
+                    logger.info("Training configuration successfully updated.")
+                    logger.info(json.dumps(active_config, indent=4))
+
+                    # Save the updated TrainingManager state
+                    temp_dir = os.path.join(os.getcwd(), "tmp")
+                    with tracer.stage("pickle_snapshot"):
+                        pickle_path = save_to_pickle(training_manager, "training_manager_snapshot.pkl", custom_dir=temp_dir)
+                    logger.info(f"TrainingManager state saved to {pickle_path}")
+
+                    # Define script paths
+                    training_script_path = os.path.join(os.getcwd(), "training_script.py")
+                    rendering_script_path = os.path.join(os.getcwd(), "render_script.py")
+
+                    # Start training containers
+                    training_container_manager.start_container(
+                        container_group="training_group",
+                        script_path=training_script_path,
+                        num_envs=local_envs,
+                        tracer=tracer,
+                    )
+
+                    # Start rendering container
+                    rendering_container_manager.start_container(
+                        container_group="render_group",
+                        script_path=training_script_path,
+                        num_envs=1,  # Fixed to 1 for rendering
+                        tracer=tracer,
+                    )
+
+                    # Sample per-container resource usage for both groups
+                    container_telemetry.clear()
+                    container_telemetry.start()
+
+                    # Restart the training group from its last checkpoint if it crashes or stalls
+                    training_config = active_config.get("training_config", {})
+                    if parse_bool(training_config.get("supervise")):
+                        training_supervisor.configure(training_config)
+                        training_supervisor.start(training_manager, container_group="training_group")
+
+                    return jsonify({
+                        "status": "success",
+                        "message": "Training and rendering containers started successfully.",
+                        "run_id": run_id,
+                        "rollout_memory": rollout_memory,
+                    })
+
+                except Exception as e:
+                    remote_env_pool.stop()
+                    logger.error(f"Error during training setup: {str(e)}", exc_info=True)
+                    return jsonify({"status": "error", "message": f"Failed to start training: {str(e)}"}), 500
+        finally:
+            training_starting.clear()
+
 
     @training_blueprint.route("/stop_training", methods=["POST"])
     def stop_training():
-        """Stop the training and rendering processes."""
+        """Stop the training and rendering processes without waiting for the containers to exit."""
+        # Stop supervising first, outside the lock, since joining the watcher can take a few seconds
+        training_supervisor.stop()
+
         with training_lock:
             # Check if the training process is currently active
             if not training_container_manager.is_monitoring():
                 return jsonify({"status": "not_running", "message": "Training is not running."})
 
             try:
-                # Stop training containers
+                container_telemetry.stop()
+                remote_env_pool.stop()
+
+                # Stop both groups in parallel; each manager only stops its own containers
                 logger.info("Stopping training containers...")
-                training_container_manager.stop_container("training_group")
-                
-                # Stop rendering containers
+                training_operation = training_container_manager.stop_container("training_group")
+
                 logger.info("Stopping rendering containers...")
-                rendering_container_manager.stop_container("render_group")
+                rendering_operation = rendering_container_manager.stop_container("render_group")
 
-                return jsonify({"status": "success", "message": "Training and rendering processes stopped successfully."})
+                return jsonify({
+                    "status": "stopping",
+                    "message": "Training and rendering processes are stopping.",
+                    "operations": [training_operation.to_dict(), rendering_operation.to_dict()],
+                }), 202
 
             except Exception as e:
                 logger.error(f"Error stopping training: {str(e)}", exc_info=True)
                 return jsonify({"status": "error", "message": f"Failed to stop training: {str(e)}"}), 500
 
 
+    @training_blueprint.route("/restart_training", methods=["POST"])
+    def restart_training():
+        """Restart the training and/or rendering group with the last launch arguments."""
+        data = request.get_json(silent=True) or {}
+        groups = data.get("groups", ["training_group", "render_group"])
+        managers = {
+            "training_group": training_container_manager,
+            "render_group": rendering_container_manager,
+        }
+
+        with training_lock:
+            try:
+                unknown = [group for group in groups if group not in managers]
+                if unknown:
+                    return jsonify({"status": "error", "message": f"Unknown container groups: {unknown}"}), 400
+
+                operations = [managers[group].restart_container(group).to_dict() for group in groups]
+                return jsonify({"status": "restarting", "operations": operations}), 202
+            except RuntimeError as e:
+                return jsonify({"status": "error", "message": str(e)}), 409
+            except Exception as e:
+                logger.error(f"Error restarting containers: {str(e)}", exc_info=True)
+                return jsonify({"status": "error", "message": f"Failed to restart containers: {str(e)}"}), 500
+
+
+    @training_blueprint.route("/operations/<operation_id>", methods=["GET"])
+    def operation_status(operation_id):
+        """Return the status of an asynchronous start/stop/restart operation."""
+        for manager in (training_container_manager, rendering_container_manager):
+            operation = manager.get_operation(operation_id)
+            if operation:
+                return jsonify({"status": "success", "operation": operation.to_dict()})
+        return jsonify({"status": "error", "message": f"Operation '{operation_id}' not found."}), 404
+
+
+    @training_blueprint.route("/container_status", methods=["GET"])
+    def container_status():
+        """Return tracked containers and start/stop/restart latency for each group."""
+        try:
+            return jsonify({
+                "status": "success",
+                "training_group": training_container_manager.get_status(),
+                "render_group": rendering_container_manager.get_status(),
+                "remote_envs": remote_env_pool.get_status(),
+            })
+        except Exception as e:
+            logger.error(f"Error fetching container status: {str(e)}", exc_info=True)
+            return jsonify({"status": "error", "message": f"Failed to fetch container status: {str(e)}"}), 500
+
+
+    @training_blueprint.route("/launch_trace", methods=["GET"])
+    @training_blueprint.route("/launch_trace/<run_id>", methods=["GET"])
+    def launch_trace(run_id=None):
+        """Return the launch-phase waterfall for a run (the latest one by default)."""
+        try:
+            run_id = run_id or latest_run_id()
+            waterfall = load_waterfall(run_id) if run_id else None
+            if waterfall is None:
+                return jsonify({"status": "error", "message": "No launch trace found."}), 404
+            return jsonify({"status": "success", "trace": waterfall})
+        except Exception as e:
+            logger.error(f"Error loading launch trace: {str(e)}", exc_info=True)
+            return jsonify({"status": "error", "message": f"Failed to load launch trace: {str(e)}"}), 500
+
+
+    @training_blueprint.route("/rollout_memory", methods=["POST"])
+    def rollout_memory():
+        """
+        Estimate the rollout buffer footprint of the active configuration before launching.
+
+        The request body may override any section (e.g. `{"training_config": {"num_envs": 32}}`).
+        """
+        try:
+            data = request.get_json(silent=True) or {}
+            config = training_manager.get_active_config()
+            merged = {
+                section: {**config.get(section, {}), **data.get(section, {})}
+                for section in ("training_config", "hyperparameters", "env_settings", "wrapper_settings")
+            }
+            advice = advise_rollout_memory(merged, budget_gb=data.get("budget_gb"))
+            return jsonify({"status": "success", "message": describe_advice(advice), "rollout_memory": advice})
+        except Exception as e:
+            logger.error(f"Error estimating rollout memory: {str(e)}", exc_info=True)
+            return jsonify({"status": "error", "message": f"Failed to estimate rollout memory: {str(e)}"}), 500
+
+
+    def active_save_path():
+        training_config = training_manager.get_active_config().get("training_config", {})
+        return training_config.get("save_path") or DEFAULT_PATHS["save_path"]
+
+
+    @training_blueprint.route("/checkpoints", methods=["GET"])
+    def checkpoints():
+        """List stored checkpoints and loose zips in the active save path, read from the store manifest."""
+        try:
+            return jsonify({"status": "success", "checkpoints": list_checkpoints(active_save_path())})
+        except Exception as e:
+            logger.error(f"Error listing checkpoints: {str(e)}", exc_info=True)
+            return jsonify({"status": "error", "message": f"Failed to list checkpoints: {str(e)}"}), 500
+
+
+    @training_blueprint.route("/checkpoints/import", methods=["POST"])
+    def import_checkpoints():
+        """Move loose checkpoint zips into the deduplicated store and apply its retention policies."""
+        try:
+            training_config = training_manager.get_active_config().get("training_config", {})
+            store = CheckpointStore(
+                active_save_path(),
+                keep_last=training_config.get("checkpoint_keep_last"),
+                keep_every=training_config.get("checkpoint_keep_every"),
+                keep_best=training_config.get("checkpoint_keep_best"),
+            )
+            imported = store.import_loose_zips()
+            return jsonify({
+                "status": "success",
+                "message": f"Imported {len(imported)} checkpoint(s) into the store.",
+                "imported": imported,
+                "usage": store.usage(),
+            })
+        except Exception as e:
+            logger.error(f"Error importing checkpoints: {str(e)}", exc_info=True)
+            return jsonify({"status": "error", "message": f"Failed to import checkpoints: {str(e)}"}), 500
+
+
+    @training_blueprint.route("/pbt", methods=["GET"])
+    @training_blueprint.route("/pbt/<run_id>", methods=["GET"])
+    def pbt(run_id=None):
+        """Return the population ranking and hyperparameters per round of a PBT run (the latest one by default)."""
+        try:
+            report = load_pbt_report(run_id)
+            if report is None:
+                return jsonify({"status": "error", "message": "No PBT report found."}), 404
+            return jsonify({"status": "success", "pbt": report})
+        except Exception as e:
+            logger.error(f"Error loading PBT report: {str(e)}", exc_info=True)
+            return jsonify({"status": "error", "message": f"Failed to load PBT report: {str(e)}"}), 500
+
+
+    @training_blueprint.route("/budget", methods=["GET"])
+    @training_blueprint.route("/budget/<run_id>", methods=["GET"])
+    def budget(run_id=None):
+        """Return the compute budget a run consumed and whether it stopped on a plateau (the latest run by default)."""
+        try:
+            report = load_budget_report(run_id)
+            if report is None:
+                return jsonify({"status": "error", "message": "No compute budget report found."}), 404
+            return jsonify({"status": "success", "budget": report})
+        except Exception as e:
+            logger.error(f"Error loading compute budget report: {str(e)}", exc_info=True)
+            return jsonify({"status": "error", "message": f"Failed to load compute budget report: {str(e)}"}), 500
+
+
+    @training_blueprint.route("/throughput", methods=["GET"])
+    @training_blueprint.route("/throughput/<run_id>", methods=["GET"])
+    def throughput(run_id=None):
+        """Return the per-update rollout and training phase breakdown of a run (the latest run by default)."""
+        try:
+            report = load_throughput_report(run_id)
+            if report is None:
+                return jsonify({"status": "error", "message": "No throughput report found."}), 404
+            return jsonify({"status": "success", "throughput": report})
+        except Exception as e:
+            logger.error(f"Error loading throughput report: {str(e)}", exc_info=True)
+            return jsonify({"status": "error", "message": f"Failed to load throughput report: {str(e)}"}), 500
+
+
+    @training_blueprint.route("/profile", methods=["POST"])
+    def profile():
+        """Ask the running training job to capture a torch.profiler trace of its next updates."""
+        try:
+            if not training_container_manager.is_monitoring():
+                return jsonify({"status": "error", "message": "No training is running."}), 409
+            data = request.get_json(silent=True) or {}
+            try:
+                profile_request = request_profile(data.get("updates", 3))
+            except (TypeError, ValueError) as e:
+                return jsonify({"status": "error", "message": str(e)}), 400
+            return jsonify({
+                "status": "success",
+                "message": f"Profiling the next {profile_request['updates']} update(s); "
+                           "the trace appears in TensorBoard's profiler tab when done.",
+                "request": profile_request,
+            })
+        except Exception as e:
+            logger.error(f"Error requesting a profiler capture: {str(e)}", exc_info=True)
+            return jsonify({"status": "error", "message": f"Failed to request a profiler capture: {str(e)}"}), 500
+
+
+    @training_blueprint.route("/profile", methods=["GET"])
+    def profile_status():
+        """Return the pending profile request and the state of the last capture."""
+        try:
+            return jsonify({"status": "success", "profile": load_profile_status()})
+        except Exception as e:
+            logger.error(f"Error loading profiler status: {str(e)}", exc_info=True)
+            return jsonify({"status": "error", "message": f"Failed to load profiler status: {str(e)}"}), 500
+
+
+    @training_blueprint.route("/control", methods=["POST"])
+    def control():
+        """
+        Send a live command to the running training job.
+
+        Body: {"command": "pause" | "resume" | "save" | "set", "settings": {...}} where `set`
+        accepts learning_rate, ent_coef and render_sync_every.
+        """
+        try:
+            if not training_container_manager.is_monitoring():
+                return jsonify({"status": "error", "message": "No training is running."}), 409
+            data = request.get_json(silent=True) or {}
+            try:
+                message = send_command(data.get("command"), data.get("settings"))
+            except ValueError as e:
+                return jsonify({"status": "error", "message": str(e)}), 400
+            return jsonify({"status": "success", "message": f"Command '{message['command']}' queued.", "command": message})
+        except Exception as e:
+            logger.error(f"Error sending control command: {str(e)}", exc_info=True)
+            return jsonify({"status": "error", "message": f"Failed to send control command: {str(e)}"}), 500
+
+
+    @training_blueprint.route("/control", methods=["GET"])
+    def control_state():
+        """Return the live settings and recent commands published by the training job."""
+        try:
+            state = load_control_state()
+            if state is None:
+                return jsonify({"status": "error", "message": "No control state published yet."}), 404
+            return jsonify({"status": "success", "control": state})
+        except Exception as e:
+            logger.error(f"Error loading control state: {str(e)}", exc_info=True)
+            return jsonify({"status": "error", "message": f"Failed to load control state: {str(e)}"}), 500
+
+
+    @training_blueprint.route("/run_spec", methods=["GET"])
+    @training_blueprint.route("/run_spec/<run_id>", methods=["GET"])
+    def run_spec(run_id=None):
+        """Return the seeds and config hash of a reproducible run (the latest one by default)."""
+        try:
+            spec = load_run_spec(run_id)
+            if spec is None:
+                return jsonify({"status": "error", "message": "No run spec found."}), 404
+            return jsonify({"status": "success", "run_spec": spec})
+        except Exception as e:
+            logger.error(f"Error loading run spec: {str(e)}", exc_info=True)
+            return jsonify({"status": "error", "message": f"Failed to load run spec: {str(e)}"}), 500
+
+
+    @training_blueprint.route("/shutdown", methods=["GET"])
+    @training_blueprint.route("/shutdown/<run_id>", methods=["GET"])
+    def shutdown_report(run_id=None):
+        """Return how a run's training process stopped and how long its shutdown took (the latest run by default)."""
+        try:
+            report = load_shutdown_report(run_id)
+            if report is None:
+                return jsonify({"status": "error", "message": "No shutdown report found."}), 404
+            return jsonify({"status": "success", "shutdown": report})
+        except Exception as e:
+            logger.error(f"Error loading shutdown report: {str(e)}", exc_info=True)
+            return jsonify({"status": "error", "message": f"Failed to load shutdown report: {str(e)}"}), 500
+
+
+    @training_blueprint.route("/preflight", methods=["GET"])
+    @training_blueprint.route("/preflight/<run_id>", methods=["GET"])
+    def preflight(run_id=None):
+        """Return the requested vs. effective PPO hyperparameters of a run (the latest one by default)."""
+        try:
+            report = load_preflight_report(run_id)
+            if report is None:
+                return jsonify({"status": "error", "message": "No pre-flight report found."}), 404
+            return jsonify({"status": "success", "preflight": report})
+        except Exception as e:
+            logger.error(f"Error loading pre-flight report: {str(e)}", exc_info=True)
+            return jsonify({"status": "error", "message": f"Failed to load pre-flight report: {str(e)}"}), 500
+
+
+    @training_blueprint.route("/action_repeat_benchmark", methods=["GET"])
+    def action_repeat_benchmark():
+        """Return the latest step_ratio x action_repeat throughput benchmark."""
+        try:
+            report = load_latest_benchmark(prefix="action_repeat")
+            if report is None:
+                return jsonify({"status": "error", "message": "No action repeat benchmark found."}), 404
+            return jsonify({"status": "success", "benchmark": report})
+        except Exception as e:
+            logger.error(f"Error loading action repeat benchmark: {str(e)}", exc_info=True)
+            return jsonify({"status": "error", "message": f"Failed to load action repeat benchmark: {str(e)}"}), 500
+
+
+    @training_blueprint.route("/vec_env_benchmark", methods=["GET"])
+    def vec_env_benchmark():
+        """Return the latest env-steps/s comparison across vec env backends."""
+        try:
+            report = load_latest_benchmark()
+            if report is None:
+                return jsonify({"status": "error", "message": "No vec env benchmark has been run yet."}), 404
+            return jsonify({"status": "success", "benchmark": report})
+        except Exception as e:
+            logger.error(f"Error loading vec env benchmark: {str(e)}", exc_info=True)
+            return jsonify({"status": "error", "message": f"Failed to load vec env benchmark: {str(e)}"}), 500
+
+
+    @training_blueprint.route("/affinity_calibration", methods=["GET"])
+    def affinity_calibration():
+        """Return the latest learner/env CPU split calibration."""
+        try:
+            report = load_latest_benchmark(prefix="affinity")
+            if report is None:
+                return jsonify({"status": "error", "message": "No CPU affinity calibration has been run yet."}), 404
+            return jsonify({"status": "success", "calibration": report})
+        except Exception as e:
+            logger.error(f"Error loading CPU affinity calibration: {str(e)}", exc_info=True)
+            return jsonify({"status": "error", "message": f"Failed to load CPU affinity calibration: {str(e)}"}), 500
+
+
+    @training_blueprint.route("/container_stats", methods=["GET"])
+    def container_stats():
+        """Return per-container CPU, memory and network time series for the dashboard."""
+        try:
+            group = request.args.get("group")
+            since = request.args.get("since", type=float)
+            return jsonify({"status": "success", **container_telemetry.get_series(group=group, since=since)})
+        except Exception as e:
+            logger.error(f"Error fetching container stats: {str(e)}", exc_info=True)
+            return jsonify({"status": "error", "message": f"Failed to fetch container stats: {str(e)}"}), 500
+
+
+    @training_blueprint.route("/supervisor_status", methods=["GET"])
+    def supervisor_status():
+        """Return the crash supervisor's state, restart count and lost-time metrics."""
+        try:
+            return jsonify({"status": "success", "supervisor": training_supervisor.get_status()})
+        except Exception as e:
+            logger.error(f"Error fetching supervisor status: {str(e)}", exc_info=True)
+            return jsonify({"status": "error", "message": f"Failed to fetch supervisor status: {str(e)}"}), 500
+
+
     @training_blueprint.route("/training_status", methods=["GET"])
     def training_status():
         """Return the current training status."""
@@ -0,0 +1,402 @@
+# path: app/sweep_manager.py
+
+from tensorboard.backend.event_processing.event_accumulator import EventAccumulator
+from datetime import datetime
+import statistics
+import itertools
+import threading
+import random
+import glob
+import math
+import copy
+import json
+import time
+import uuid
+import os
+from app import DEFAULT_PATHS
+from app.log_manager import LogManager
+from app.container_manager import ContainerManager
+from app.tools.utils import save_to_pickle
+
+SWEEP_DIR = os.path.join(DEFAULT_PATHS["log_dir"], "sweeps")
+CONFIG_DIR = os.path.join(os.getcwd(), "configs")
+SWEEP_SECTIONS = ("hyperparameters", "wrapper_settings")
+REWARD_TAG = "rollout/ep_rew_mean"
+
+
+def parse_space(space):
+    """
+    Normalize a parameter space.
+
+    Keys are "<section>.<key>" with section `hyperparameters` or `wrapper_settings`. Values are
+    a list of choices, `{"values": [...]}`, or a range `{"min": a, "max": b}` with optional
+    `"log": true` and `"type": "int"`.
+
+    :return: Dictionary of key -> normalized spec.
+    :raises ValueError: On unknown sections or malformed specs.
+    """
+    parsed = {}
+    for name, spec in (space or {}).items():
+        section, _, key = name.partition(".")
+        if section not in SWEEP_SECTIONS or not key:
+            raise ValueError(f"Sweep parameter '{name}' must be '<section>.<key>' with section in {SWEEP_SECTIONS}.")
+        if isinstance(spec, list):
+            spec = {"values": spec}
+        if "values" in spec:
+            if not spec["values"]:
+                raise ValueError(f"Sweep parameter '{name}' has no values.")
+        elif "min" in spec and "max" in spec:
+            if spec["min"] > spec["max"] or (spec.get("log") and spec["min"] <= 0):
+                raise ValueError(f"Sweep parameter '{name}' has an invalid range.")
+        else:
+            raise ValueError(f"Sweep parameter '{name}' needs 'values' or 'min'/'max'.")
+        parsed[name] = spec
+    if not parsed:
+        raise ValueError("The sweep space is empty.")
+    return parsed
+
+
+def _sample(spec, rng):
+    if "values" in spec:
+        return rng.choice(spec["values"])
+    low, high = spec["min"], spec["max"]
+    value = math.exp(rng.uniform(math.log(low), math.log(high))) if spec.get("log") else rng.uniform(low, high)
+    return int(round(value)) if spec.get("type") == "int" else value
+
+
+def generate_trials(space, method="grid", num_trials=None, seed=None):
+    """
+    Generate trial parameter sets.
+
+    :param space: Output of `parse_space`.
+    :param method: 'grid' (every combination of `values`; ranges are not allowed) or 'random'.
+    :param num_trials: Number of random trials, or a cap on the grid size.
+    :return: List of dictionaries "<section>.<key>" -> value.
+    """
+    names = list(space)
+    if method == "grid":
+        ranged = [name for name in names if "values" not in space[name]]
+        if ranged:
+            raise ValueError(f"Grid search needs explicit values; got ranges for {ranged}.")
+        trials = [dict(zip(names, combo)) for combo in itertools.product(*(space[name]["values"] for name in names))]
+        return trials[:num_trials] if num_trials else trials
+    if method == "random":
+        rng = random.Random(seed)
+        return [{name: _sample(space[name], rng) for name in names} for _ in range(int(num_trials or 10))]
+    raise ValueError(f"Unknown sweep method '{method}'. Expected 'grid' or 'random'.")
+
+
+def apply_params(config, params):
+    """Return a copy of `config` with the trial parameters applied."""
+    config = copy.deepcopy(config)
+    for name, value in params.items():
+        section, _, key = name.partition(".")
+        config.setdefault(section, {})[key] = value
+    return config
+
+
+def read_scalars(log_dir, tag=REWARD_TAG):
+    """
+    Read a scalar series from every TensorBoard run under `log_dir`.
+
+    :return: List of (step, value), sorted by step.
+    """
+    points = []
+    run_dirs = {os.path.dirname(path) for path in glob.glob(os.path.join(log_dir, "**", "events.out.tfevents.*"), recursive=True)}
+    for run_dir in run_dirs:
+        accumulator = EventAccumulator(run_dir, size_guidance={"scalars": 0})
+        accumulator.Reload()
+        if tag in accumulator.Tags().get("scalars", []):
+            points.extend((event.step, event.value) for event in accumulator.Scalars(tag))
+    return sorted(points)
+
+
+def running_average(points, step):
+    """Mean of the values reported up to `step`, or None."""
+    values = [value for point_step, value in points if point_step <= step]
+    return sum(values) / len(values) if values else None
+
+
+def should_stop_median(points, others, grace_steps=0, min_trials=3):
+    """
+    Median stopping rule: stop a trial whose best value so far is below the median of the
+    other trials' running averages at the same step.
+
+    :param points: The trial's (step, value) series.
+    :param others: Series of the other trials (running, finished or stopped).
+    :param grace_steps: Never stop before this many timesteps.
+    :param min_trials: Minimum number of other trials that reached the step.
+    """
+    if not points:
+        return False
+    step = points[-1][0]
+    if step < grace_steps:
+        return False
+    averages = [
+        average for average in (running_average(other, step) for other in others if other and other[-1][0] >= step)
+        if average is not None
+    ]
+    if len(averages) < min_trials:
+        return False
+    return max(value for _, value in points) < statistics.median(averages)
+
+
+class SweepTrial:
+    """One configuration of a sweep and the `diambra run` training it."""
+
+    def __init__(self, sweep_id, index, params, config):
+        self.sweep_id = sweep_id
+        self.index = index
+        self.params = params
+        self.config = config
+        self.run_id = f"{sweep_id}-{index}"
+        self.save_path = os.path.join(DEFAULT_PATHS["save_path"], "sweeps", sweep_id, f"trial_{index}")
+        self.tensorboard_log = os.path.join(DEFAULT_PATHS["tensorboard_log_dir"], "sweeps", sweep_id, f"trial_{index}")
+        self.num_envs = int(config.get("training_config", {}).get("num_envs") or 1)
+        self.state = "pending"
+        self.reason = None
+        self.manager = None
+        self.points = []
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self):
+        rewards = [value for _, value in self.points]
+        return {
+            "index": self.index,
+            "run_id": self.run_id,
+            "params": self.params,
+            "state": self.state,
+            "reason": self.reason,
+            "num_envs": self.num_envs,
+            "timesteps": self.points[-1][0] if self.points else 0,
+            "last_reward": rewards[-1] if rewards else None,
+            "best_reward": max(rewards) if rewards else None,
+            "duration": round((self.finished_at or time.time()) - self.started_at, 1) if self.started_at else None,
+            "save_path": self.save_path,
+            "tensorboard_log": self.tensorboard_log,
+        }
+
+
+class SweepManager:
+    """
+    Runs hyperparameter sweeps: trials generated from a base config and a parameter space are
+    launched as separate `diambra run` training groups, as many at a time as the env capacity
+    allows, and losers are stopped early by the median stopping rule on episode reward.
+    """
+
+    def __init__(self, training_manager, poll_interval=30, output_dir=SWEEP_DIR):
+        """
+        :param training_manager: TrainingManager whose blueprints and defaults every trial uses.
+        :param poll_interval: Seconds between scheduling / early-stopping passes.
+        :param output_dir: Directory for the per-sweep JSON reports.
+        """
+        self.training_manager = training_manager
+        self.poll_interval = poll_interval
+        self.output_dir = output_dir
+        self.logger = LogManager("SweepManager")
+        self.sweeps = {}
+
+    def load_base_config(self, spec):
+        """Base config of a sweep: a saved config by name, an inline config, or the active one."""
+        if spec.get("base_config"):
+            path = os.path.join(CONFIG_DIR, f"{spec['base_config']}.json")
+            if not os.path.isfile(path):
+                raise ValueError(f"Configuration '{spec['base_config']}' not found.")
+            with open(path, encoding="utf-8") as f:
+                config = json.load(f)
+        else:
+            config = copy.deepcopy(spec.get("config") or self.training_manager.get_active_config())
+        config.setdefault("training_config", {}).update(spec.get("training_config", {}))
+        return config
+
+    def start(self, spec):
+        """
+        Start a sweep in the background.
+
+        :param spec: Dictionary with `space`, optional `name`, `base_config` / `config`,
+            `training_config` overrides, `method`, `num_trials`, `seed`, `max_envs`
+            and `median_stopping` (`grace_timesteps`, `min_trials`, or false to disable).
+        :return: The sweep's report.
+        """
+        space = parse_space(spec.get("space"))
+        base_config = self.load_base_config(spec)
+        sweep_id = uuid.uuid4().hex[:8]
+        trials = [
+            SweepTrial(sweep_id, index, params, apply_params(base_config, params))
+            for index, params in enumerate(
+                generate_trials(space, spec.get("method", "grid"), spec.get("num_trials"), spec.get("seed"))
+            )
+        ]
+        # `null` or `true` means the default rule; only `false` disables it
+        median_stopping = spec.get("median_stopping")
+        if median_stopping is None or median_stopping is True:
+            median_stopping = {}
+        elif median_stopping is not False and not isinstance(median_stopping, dict):
+            raise ValueError("'median_stopping' must be an object with 'grace_timesteps'/'min_trials', or false.")
+        capacity = int(spec.get("max_envs") or max(trial.num_envs for trial in trials))
+        too_large = [trial.index for trial in trials if trial.num_envs > capacity]
+        if too_large:
+            raise ValueError(f"Trials {too_large} need more envs than the sweep capacity of {capacity}.")
+
+        sweep = {
+            "id": sweep_id,
+            "name": spec.get("name") or sweep_id,
+            "state": "running",
+            "capacity": capacity,
+            "median_stopping": median_stopping,
+            "space": space,
+            "created": datetime.now().isoformat(),
+            "trials": trials,
+            "stop_event": threading.Event(),
+        }
+        self.sweeps[sweep_id] = sweep
+        threading.Thread(target=self._run, args=(sweep,), daemon=True).start()
+        self.logger.info(f"Sweep '{sweep['name']}' ({sweep_id}) started with {len(trials)} trial(s), capacity {capacity} env(s).")
+        return self.report(sweep_id)
+
+    def stop(self, sweep_id):
+        """Stop a sweep and every running trial."""
+        sweep = self.sweeps.get(sweep_id)
+        if sweep is None:
+            return None
+        sweep["stop_event"].set()
+        return self.report(sweep_id)
+
+    def _launch(self, trial):
+        trial_manager = copy.deepcopy(self.training_manager)
+        config = copy.deepcopy(trial.config)
+        config["training_config"].update({
+            "run_id": trial.run_id,
+            "save_path": trial.save_path,
+            "tensorboard_log": trial.tensorboard_log,
+            "resume_from": "",
+            "supervise": False,
+        })
+        trial_manager.set_active_config(config)
+        pickle_path = save_to_pickle(
+            trial_manager, f"trial_{trial.index}.pkl", custom_dir=os.path.join(os.getcwd(), "tmp", "sweeps", trial.sweep_id)
+        )
+        trial.manager = ContainerManager(
+            f"sweep-{trial.run_id}", log_file=os.path.join("logs", f"sweep_{trial.sweep_id}_containers.log")
+        )
+        trial.manager.start_container(
+            container_group="training_group",
+            script_path=os.path.join(os.getcwd(), "training_script.py"),
+            num_envs=trial.num_envs,
+            pickle_path=pickle_path,
+        )
+        trial.state = "running"
+        trial.started_at = time.time()
+        self.logger.info(f"Sweep trial {trial.run_id} launched with {trial.params}.")
+
+    def _finish(self, trial, state, reason=None, stop=False):
+        if stop and trial.manager:
+            trial.manager.stop_container("training_group")
+        trial.state = state
+        trial.reason = reason
+        trial.finished_at = time.time()
+        self.logger.info(f"Sweep trial {trial.run_id} {state}{f': {reason}' if reason else ''}.")
+
+    def _poll(self, sweep):
+        rule = sweep["median_stopping"]
+        running = [trial for trial in sweep["trials"] if trial.state == "running"]
+        for trial in sweep["trials"]:
+            if trial.state in ("running", "completed", "stopped_early"):
+                trial.points = read_scalars(trial.tensorboard_log)
+
+        for trial in running:
+            start_operation = trial.manager.start_operation
+            if start_operation and start_operation.done.is_set() and start_operation.error:
+                self._finish(trial, "failed", f"launch failed: {start_operation.error}")
+                continue
+            exit_code = trial.manager.get_exit_code()
+            if exit_code is not None:
+                self._finish(trial, "completed" if exit_code == 0 else "failed",
+                             None if exit_code == 0 else f"exit code {exit_code}")
+                continue
+            if rule is not False:
+                others = [other.points for other in sweep["trials"] if other is not trial and other.points]
+                if should_stop_median(trial.points, others, int(rule.get("grace_timesteps") or 0),
+                                      int(rule.get("min_trials") or 3)):
+                    self._finish(trial, "stopped_early", "best reward below the median of the other trials", stop=True)
+
+        used = sum(trial.num_envs for trial in sweep["trials"] if trial.state == "running")
+        for trial in sweep["trials"]:
+            if trial.state == "pending" and used + trial.num_envs <= sweep["capacity"]:
+                try:
+                    self._launch(trial)
+                    used += trial.num_envs
+                except Exception as e:
+                    self.logger.error(f"Failed to launch sweep trial {trial.run_id}: {e}", exc_info=True)
+                    self._finish(trial, "failed", str(e))
+
+    def _run(self, sweep):
+        try:
+            while True:
+                self._poll(sweep)
+                self.write_report(sweep)
+                if all(trial.state not in ("pending", "running") for trial in sweep["trials"]):
+                    sweep["state"] = "finished"
+                    break
+                if sweep["stop_event"].wait(self.poll_interval):
+                    for trial in sweep["trials"]:
+                        if trial.state == "running":
+                            self._finish(trial, "stopped", "sweep stopped", stop=True)
+                        elif trial.state == "pending":
+                            trial.state = "skipped"
+                    sweep["state"] = "stopped"
+                    break
+        except Exception as e:
+            self.logger.error(f"Sweep {sweep['id']} failed: {e}", exc_info=True)
+            sweep["state"] = "failed"
+        self.write_report(sweep)
+
+    def results_table(self, sweep):
+        """Trial rows sorted by best episode reward, best first; trials without rewards last."""
+        rows = [trial.to_dict() for trial in sweep["trials"]]
+        return sorted(rows, key=lambda row: (row["best_reward"] is None, -(row["best_reward"] or 0)))
+
+    def report(self, sweep_id):
+        sweep = self.sweeps.get(sweep_id)
+        if sweep is None:
+            return load_sweep_report(sweep_id, self.output_dir)
+        return {
+            "id": sweep["id"],
+            "name": sweep["name"],
+            "state": sweep["state"],
+            "created": sweep["created"],
+            "capacity": sweep["capacity"],
+            "space": sweep["space"],
+            "median_stopping": sweep["median_stopping"],
+            "results": self.results_table(sweep),
+        }
+
+    def write_report(self, sweep):
+        os.makedirs(self.output_dir, exist_ok=True)
+        with open(os.path.join(self.output_dir, f"{sweep['id']}.json"), "w", encoding="utf-8") as f:
+            json.dump(self.report(sweep["id"]), f, indent=4, default=str)
+
+    def list_sweeps(self):
+        """Summaries of every sweep with a report on disk."""
+        summaries = []
+        for path in sorted(glob.glob(os.path.join(self.output_dir, "*.json")), key=os.path.getmtime, reverse=True):
+            with open(path, encoding="utf-8") as f:
+                report = json.load(f)
+            summaries.append({
+                "id": report["id"],
+                "name": report["name"],
+                "state": report["state"],
+                "created": report["created"],
+                "trials": len(report["results"]),
+            })
+        return summaries
+
+
+def load_sweep_report(sweep_id, output_dir=SWEEP_DIR):
+    """Return a sweep's report from disk, or None."""
+    path = os.path.join(output_dir, f"{sweep_id}.json")
+    if not os.path.isfile(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
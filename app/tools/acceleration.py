@@ -0,0 +1,195 @@
+# path: .app/tools/acceleration.py
+
+from stable_baselines3.common.callbacks import BaseCallback
+from functools import wraps
+import torch as th
+import numpy as np
+import time
+
+MIXED_PRECISION_MODES = ("off", "bf16")
+
+
+def bf16_supported(device):
+    """
+    Check whether bf16 autocast runs on the given device.
+
+    :param device: torch.device the policy lives on.
+    """
+    if device.type == "cuda":
+        return th.cuda.is_bf16_supported()
+    try:
+        with th.autocast(device_type=device.type, dtype=th.bfloat16):
+            th.ones(2, 2, device=device) @ th.ones(2, 2, device=device)
+        return True
+    except Exception:
+        return False
+
+
+def _float_outputs(outputs):
+    """Cast floating point tensors back to fp32 so SB3's loss math stays in full precision."""
+    return tuple(
+        output.float() if isinstance(output, th.Tensor) and output.is_floating_point() else output
+        for output in outputs
+    )
+
+
+def apply_autocast(policy, dtype=th.bfloat16):
+    """
+    Run the policy's rollout and training forward passes under autocast.
+
+    Wraps `forward` (used while collecting rollouts) and `evaluate_actions` (used by
+    `PPO.train`) on the instance; the backward pass follows the autocast graph.
+
+    :param policy: ActorCriticPolicy to wrap.
+    :param dtype: Autocast dtype.
+    """
+    device_type = policy.device.type
+
+    def autocast(method):
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            with th.autocast(device_type=device_type, dtype=dtype):
+                return _float_outputs(method(*args, **kwargs))
+        return wrapper
+
+    policy.forward = autocast(policy.forward)
+    policy.evaluate_actions = autocast(policy.evaluate_actions)
+
+
+def _compilable_modules(policy):
+    modules = [policy.mlp_extractor, policy.action_net, policy.value_net]
+    if policy.share_features_extractor:
+        modules.append(policy.features_extractor)
+    else:
+        modules.extend([policy.pi_features_extractor, policy.vf_features_extractor])
+    return modules
+
+
+def _sample_batch(policy, batch_size):
+    """Build a batch of random observations and actions from the policy's spaces."""
+    observations = [policy.observation_space.sample() for _ in range(batch_size)]
+    if isinstance(observations[0], dict):
+        batch = {key: np.stack([obs[key] for obs in observations]) for key in observations[0]}
+    else:
+        batch = np.stack(observations)
+    obs_tensor = policy.obs_to_tensor(batch)[0]
+    actions = th.as_tensor(np.stack([policy.action_space.sample() for _ in range(batch_size)]), device=policy.device)
+    return obs_tensor, actions
+
+
+def compile_policy(policy, batch_size=8):
+    """
+    Compile the policy's sub-networks in place with `torch.compile`.
+
+    Compilation is lazy, so a warm-up pass runs right away; on any failure the modules are
+    restored to eager mode. In-place compilation keeps state_dict keys unchanged, so
+    checkpoints stay loadable without acceleration.
+
+    :return: True if the policy runs compiled, False if it fell back to eager mode.
+    """
+    if not hasattr(th.nn.Module, "compile"):
+        print("torch.compile is not available in this torch version; running eagerly.")
+        return False
+
+    modules = _compilable_modules(policy)
+    try:
+        # Graph breaks and later recompilation errors fall back to eager instead of crashing training
+        th._dynamo.config.suppress_errors = True
+        for module in modules:
+            module.compile()
+        obs_tensor, actions = _sample_batch(policy, batch_size)
+        with th.no_grad():
+            policy.evaluate_actions(obs_tensor, actions)
+        return True
+    except Exception as e:
+        print(f"torch.compile failed, falling back to eager mode: {e}")
+        for module in modules:
+            module._compiled_call_impl = None
+        return False
+
+
+def time_update(policy, batch_size, iterations=5):
+    """
+    Time one mini-batch gradient pass (forward, loss, backward) on random data.
+
+    Gradients are cleared afterwards and no optimizer step is taken, so the weights are untouched.
+
+    :return: Mean seconds per mini-batch.
+    """
+    obs_tensor, actions = _sample_batch(policy, batch_size)
+    policy.set_training_mode(True)
+    timings = []
+    for iteration in range(iterations + 1):
+        start = time.perf_counter()
+        values, log_prob, entropy = policy.evaluate_actions(obs_tensor, actions)
+        loss = values.mean() - log_prob.mean() - (entropy.mean() if entropy is not None else 0)
+        loss.backward()
+        if policy.device.type == "cuda":
+            th.cuda.synchronize()
+        if iteration > 0:  # The first pass pays for lazy initialization and compilation
+            timings.append(time.perf_counter() - start)
+    policy.optimizer.zero_grad(set_to_none=True)
+    policy.set_training_mode(False)
+    return sum(timings) / len(timings)
+
+
+def accelerate_agent(agent, mixed_precision="off", compile_model=False):
+    """
+    Apply the opt-in acceleration mode to a PPO agent and measure its effect.
+
+    :param agent: PPO instance whose policy is modified in place.
+    :param mixed_precision: 'off' or 'bf16'.
+    :param compile_model: Whether to `torch.compile` the policy.
+    :return: Report with the applied settings and eager vs. accelerated mini-batch timings.
+    """
+    policy = agent.policy
+    report = {"mixed_precision": "off", "compiled": False, "device": str(policy.device)}
+    if mixed_precision == "off" and not compile_model:
+        return report
+
+    report["eager_fp32_seconds"] = time_update(policy, agent.batch_size)
+
+    if mixed_precision == "bf16":
+        if bf16_supported(policy.device):
+            apply_autocast(policy, th.bfloat16)
+            report["mixed_precision"] = "bf16"
+        else:
+            print(f"bf16 autocast is not supported on {policy.device}; staying in fp32.")
+    if compile_model:
+        report["compiled"] = compile_policy(policy)
+
+    report["accelerated_seconds"] = time_update(policy, agent.batch_size)
+    report["speedup"] = round(report["eager_fp32_seconds"] / report["accelerated_seconds"], 3)
+    return report
+
+
+class UpdateTimingCallback(BaseCallback):
+    """
+    Logs the wall time of every PPO update (the gap between two rollouts) to TensorBoard,
+    together with the mini-batch timings measured by `accelerate_agent`.
+    """
+
+    def __init__(self, report, verbose=0):
+        super(UpdateTimingCallback, self).__init__(verbose)
+        self.report = report
+        self.rollout_end = None
+        self.update_times = []
+
+    def _on_training_start(self):
+        for key in ("eager_fp32_seconds", "accelerated_seconds", "speedup"):
+            if key in self.report:
+                self.logger.record(f"acceleration/{key}", self.report[key])
+
+    def _on_rollout_start(self):
+        if self.rollout_end is None:
+            return
+        update_time = time.time() - self.rollout_end
+        self.update_times.append(update_time)
+        self.logger.record("acceleration/update_seconds", update_time)
+        self.logger.record("acceleration/update_seconds_mean", sum(self.update_times) / len(self.update_times))
+
+    def _on_rollout_end(self):
+        self.rollout_end = time.time()
+
+    def _on_step(self) -> bool:
+        return True
@@ -4,6 +4,10 @@ from stable_baselines3.common.callbacks import BaseCallback
 from app.log_manager import LogManager
 from app.tools.utils import diambra_blueprint as Blueprint
 from diambra.arena.stable_baselines3.sb3_utils import AutoSave
+from app.tools.checkpoint_writer import AsyncCheckpointCallback
+from app.custom_callbacks.plateau_stopping import PlateauStopping
+from app.custom_callbacks.throughput_profiler import ThroughputProfiler
+from app.tools.episode_stats import EpisodeStatsCallback
 
 # Define the AutoSave blueprint with argument mapping
 AutoSaveBlueprint = Blueprint(
@@ -24,18 +28,98 @@ AutoSaveBlueprint = Blueprint(
     description="Automatically saves the model at regular intervals and supports graceful training termination.",
 )
 
+# Define the AsyncCheckpoint blueprint with argument mapping
+AsyncCheckpointBlueprint = Blueprint(
+    component_class=AsyncCheckpointCallback,
+    component_type="callback",
+    required=False,
+    default_params={
+        "verbose": 1,
+    },
+    arg_map={
+        "check_freq": "autosave_freq",
+        "num_envs": "num_envs",
+        "save_path": "save_path",
+        "filename_prefix": "filename_prefix",
+        "keep_last": "checkpoint_keep_last",
+        "store": "checkpoint_store",
+        "keep_every": "checkpoint_keep_every",
+        "keep_best": "checkpoint_keep_best",
+    },
+    name="Async Checkpoint",
+    description="Saves the model at regular intervals on a background thread, keeping the last checkpoints and the best one by mean reward.",
+)
+
+# Define the PlateauStopping blueprint with argument mapping
+PlateauStoppingBlueprint = Blueprint(
+    component_class=PlateauStopping,
+    component_type="callback",
+    required=False,
+    default_params={
+        "verbose": 1,
+    },
+    arg_map={
+        "check_freq": "plateau_check_freq",
+        "num_envs": "num_envs",
+        "window": "plateau_window",
+        "min_improvement": "plateau_min_improvement",
+        "patience": "plateau_patience",
+        "min_timesteps": "plateau_min_timesteps",
+        "total_timesteps": "total_timesteps",
+        "run_id": "run_id",
+    },
+    name="Plateau Stopping",
+    description="Stops training when the rolling episode reward stops improving and reports the compute budget used.",
+)
+
+# Define the ThroughputProfiler blueprint with argument mapping
+ThroughputProfilerBlueprint = Blueprint(
+    component_class=ThroughputProfiler,
+    component_type="callback",
+    required=False,
+    default_params={
+        "verbose": 1,
+    },
+    arg_map={
+        "run_id": "run_id",
+        "report_freq": "profiler_report_freq",
+    },
+    name="Throughput Profiler",
+    description="Breaks every PPO update down into env step, inference, GAE and SGD time, with steps/s and samples/s.",
+)
+
+# Define the EpisodeStats blueprint with argument mapping
+EpisodeStatsBlueprint = Blueprint(
+    component_class=EpisodeStatsCallback,
+    component_type="callback",
+    required=False,
+    default_params={
+        "verbose": 0,
+    },
+    arg_map={
+        "window": "episode_stats_window",
+    },
+    name="Episode Stats",
+    description="Rolling episode reward means and percentiles per env, character pair and difficulty, logged to TensorBoard.",
+)
+
 class RenderCallback(BaseCallback):
     """
     A callback to signal the TrainingManager when the model should be updated. 
     """
 
-    def __init__(self, training_manager, verbose=0):
+    def __init__(self, training_manager, sync_every=1, verbose=0):
         super(RenderCallback, self).__init__(verbose)
         self.training_manager = training_manager
+        self.sync_every = sync_every  # Rollouts between syncs; changeable through the control channel
+        self.rollouts = 0
         self.logger = LogManager("RenderCallback")
 
     def _on_rollout_start(self):
-        """Signal TrainingManager to update the cached policy at the start of each rollout."""
+        """Signal TrainingManager to update the cached policy every `sync_every` rollouts."""
+        self.rollouts += 1
+        if self.rollouts % self.sync_every != 0:
+            return
         self.training_manager.set_model_updated()
         self.logger.info("Signaled TrainingManager to update cached policy.")
 
@@ -60,4 +144,8 @@ RenderCallbackBlueprint = Blueprint(
 callback_blueprints = {
     "AutoSave": AutoSaveBlueprint,
     "RenderCallback": RenderCallbackBlueprint,
+    "AsyncCheckpoint": AsyncCheckpointBlueprint,
+    "PlateauStopping": PlateauStoppingBlueprint,
+    "ThroughputProfiler": ThroughputProfilerBlueprint,
+    "EpisodeStats": EpisodeStatsBlueprint,
 }
@@ -9,7 +9,7 @@ CharacterTesterBlueprint = Blueprint(
     component_type="wrapper",
     required=False,
     default_params={},
-    arg_map={"env_index": "env_index"},
+    arg_map={"seed": "seed"},
     name="Character Tester",
     description="Test each character against the current hyperparameters.",
 )
@@ -0,0 +1,408 @@
+# path: .app/tools/checkpoint_store.py
+
+import stable_baselines3 as sb3
+import torch as th
+from contextlib import contextmanager
+import threading
+import hashlib
+import zipfile
+import glob
+import json
+import time
+import io
+import os
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows, where only the in-process lock applies
+    fcntl = None
+
+MANIFEST_NAME = "manifest.json"
+OBJECTS_DIR = "objects"
+RESTORE_DIR = "restore"
+BEST_MODEL_NAME = "best_model.zip"
+LOCK_NAME = ".lock"
+TENSOR_REF = "__checkpoint_tensor__"
+
+
+def atomic_write(path, writer):
+    """
+    Write a file via a temporary sibling, fsync it and rename it into place.
+
+    :param path: Final path.
+    :param writer: Callable receiving the open binary file object.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        writer(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    if hasattr(os, "O_DIRECTORY"):
+        # Persist the rename itself
+        dir_fd = os.open(directory, os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def _hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _hash_tensor(tensor):
+    """Content hash of a tensor, covering dtype and shape so reinterpretations don't collide."""
+    flat = tensor.detach().cpu().contiguous().reshape(-1)
+    digest = hashlib.sha256(f"{flat.dtype}:{tuple(tensor.shape)}:".encode())
+    digest.update(flat.view(th.uint8).numpy().tobytes())
+    return digest.hexdigest()
+
+
+class CheckpointStore:
+    """
+    Content-addressed checkpoint storage with a manifest index and retention policies.
+
+    Each checkpoint is recorded in `manifest.json` as the list of files SB3 puts in its zip.
+    Tensors inside the `.pth` state dicts are stored once per distinct content under
+    `objects/`, so tensors that do not change between saves (frozen layers, normalizer
+    statistics, optimizer hyperparameters) take no extra space. `materialize` rebuilds a
+    regular SB3 zip for `PPO.load`.
+
+    Retention keeps the last `keep_last` checkpoints, every `keep_every`-th one and the
+    `keep_best` best by metric; pinned checkpoints (e.g. `last_model`) are always kept.
+    """
+
+    def __init__(self, root, keep_last=5, keep_every=0, keep_best=1):
+        self.root = str(root)
+        self.objects_dir = os.path.join(self.root, OBJECTS_DIR)
+        self.manifest_path = os.path.join(self.root, MANIFEST_NAME)
+        self.keep_last = int(keep_last or 0)
+        self.keep_every = int(keep_every or 0)
+        self.keep_best = int(keep_best or 0)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self):
+        """
+        Hold the store lock across threads and processes.
+
+        The web app imports checkpoints while the training process writes them, so every
+        read-modify-write of the manifest and every garbage collection also takes an
+        exclusive `flock` on a lock file in the store directory.
+        """
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            os.makedirs(self.root, exist_ok=True)
+            with open(os.path.join(self.root, LOCK_NAME), "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # ----- manifest -----
+
+    def load_manifest(self):
+        """Return the manifest dictionary, empty if none was written yet."""
+        if not os.path.isfile(self.manifest_path):
+            return {"version": 1, "sequence": 0, "checkpoints": {}}
+        with open(self.manifest_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_manifest(self, manifest):
+        payload = json.dumps(manifest, indent=4).encode("utf-8")
+        atomic_write(self.manifest_path, lambda f: f.write(payload))
+
+    def checkpoints(self):
+        """Checkpoint entries, oldest first."""
+        return sorted(self.load_manifest()["checkpoints"].values(), key=lambda entry: entry["sequence"])
+
+    def select(self, selector="latest"):
+        """
+        Pick a checkpoint entry from the manifest.
+
+        :param selector: "latest" (most timesteps, then newest), "best" (highest metric) or a checkpoint name.
+        :return: Manifest entry, or None.
+        """
+        entries = self.checkpoints()
+        if not entries:
+            return None
+        if selector == "latest":
+            return max(entries, key=lambda entry: (entry["timesteps"], entry["sequence"]))
+        if selector == "best":
+            scored = [entry for entry in entries if entry.get("metric") is not None]
+            return max(scored, key=lambda entry: entry["metric"]) if scored else None
+        name = selector[:-4] if selector.endswith(".zip") else selector
+        return next((entry for entry in entries if entry["name"] == name), None)
+
+    # ----- objects -----
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def _put_object(self, digest, writer):
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            atomic_write(path, writer)
+        return digest
+
+    def _put_bytes(self, data):
+        return self._put_object(_hash_bytes(data), lambda f: f.write(data))
+
+    def _put_tensor(self, tensor):
+        tensor = tensor.detach().cpu().contiguous()
+        return self._put_object(_hash_tensor(tensor), lambda f: th.save(tensor.clone(), f))
+
+    def _split_tensors(self, value, tensors):
+        """Replace every tensor in a (nested) state dict by a reference to its stored object."""
+        if isinstance(value, th.Tensor):
+            digest = self._put_tensor(value)
+            tensors.append(digest)
+            return (TENSOR_REF, digest)
+        if isinstance(value, dict):
+            return {key: self._split_tensors(item, tensors) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return type(value)(self._split_tensors(item, tensors) for item in value)
+        return value
+
+    def _join_tensors(self, value):
+        if isinstance(value, tuple) and len(value) == 2 and value[0] == TENSOR_REF:
+            return th.load(self._object_path(value[1]), map_location="cpu")
+        if isinstance(value, dict):
+            return {key: self._join_tensors(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return type(value)(self._join_tensors(item) for item in value)
+        return value
+
+    def _put_state(self, state):
+        tensors = []
+        skeleton = self._split_tensors(state, tensors)
+        buffer = io.BytesIO()
+        th.save(skeleton, buffer)
+        return self._put_bytes(buffer.getvalue()), tensors
+
+    # ----- checkpoints -----
+
+    def add(self, name, files, metric=None, pinned=False):
+        """
+        Store a checkpoint.
+
+        :param name: Checkpoint name (without ".zip"); an existing entry with that name is replaced.
+        :param files: Mapping of zip member name -> `bytes` for plain members or a state dict for `.pth` members.
+        :param metric: Value used by the best-by-metric policy (higher is better), or None.
+        :param pinned: Exempt the checkpoint from retention.
+        :return: Manifest entry.
+        """
+        data = json.loads(files["data"]) if "data" in files else {}
+        # Objects are written under the lock too, so no process's garbage collection sees them unreferenced
+        with self._locked():
+            members = []
+            for file_name, content in files.items():
+                if isinstance(content, (bytes, str)):
+                    content = content.encode("utf-8") if isinstance(content, str) else content
+                    members.append({"file": file_name, "object": self._put_bytes(content)})
+                else:
+                    digest, tensors = self._put_state(content)
+                    members.append({"file": file_name, "object": digest, "tensors": tensors})
+
+            manifest = self.load_manifest()
+            manifest["sequence"] += 1
+            entry = {
+                "name": name,
+                "sequence": manifest["sequence"],
+                "timesteps": int(data.get("num_timesteps", 0)),
+                "created": time.time(),
+                "metric": metric,
+                "pinned": pinned,
+                "members": members,
+            }
+            manifest["checkpoints"][name] = entry
+            self._apply_retention(manifest)
+            self._save_manifest(manifest)
+            self._collect_garbage(manifest)
+        return entry
+
+    def add_snapshot(self, name, snapshot, metric=None, pinned=False):
+        """Store a snapshot from `checkpoint_writer.snapshot_model`."""
+        files = {"data": snapshot["data"]}
+        if snapshot["pytorch_variables"] is not None:
+            files["pytorch_variables.pth"] = snapshot["pytorch_variables"]
+        for file_name, state_dict in snapshot["params"].items():
+            files[file_name + ".pth"] = state_dict
+        files["_stable_baselines3_version"] = sb3.__version__
+        return self.add(name, files, metric=metric, pinned=pinned)
+
+    def add_zip(self, path, metric=None, pinned=False):
+        """Store an SB3 zip (e.g. written by AutoSave) under its file name."""
+        files = {}
+        with zipfile.ZipFile(path) as archive:
+            for file_name in archive.namelist():
+                content = archive.read(file_name)
+                if file_name.endswith(".pth"):
+                    content = th.load(io.BytesIO(content), map_location="cpu", weights_only=False)
+                files[file_name] = content
+        name = os.path.splitext(os.path.basename(path))[0]
+        return self.add(name, files, metric=metric, pinned=pinned)
+
+    def import_loose_zips(self, remove=True):
+        """
+        Move the `.zip` checkpoints lying in the store directory into the store.
+
+        :param remove: Delete each zip once it is stored.
+        :return: Names of the imported checkpoints.
+        """
+        imported = []
+        for path in sorted(glob.glob(os.path.join(self.root, "*.zip")), key=os.path.getmtime):
+            name = os.path.splitext(os.path.basename(path))[0]
+            self.add_zip(path, pinned=name == "last_model")
+            imported.append(name)
+            if remove:
+                os.remove(path)
+        return imported
+
+    def materialize(self, selector="latest"):
+        """
+        Rebuild a checkpoint as an SB3 zip under `restore/`, replacing the previously restored one.
+
+        :return: Path to the zip, or None if no checkpoint matches.
+        """
+        with self._locked():
+            return self._materialize(selector)
+
+    def _materialize(self, selector):
+        # Runs under the lock, so a concurrent add can't collect the entry's objects mid-read
+        entry = self.select(selector)
+        if entry is None:
+            return None
+        restore_dir = os.path.join(self.root, RESTORE_DIR)
+        path = os.path.join(restore_dir, f"{entry['name']}.zip")
+
+        def write(f):
+            with zipfile.ZipFile(f, mode="w") as archive:
+                for member in entry["members"]:
+                    with open(self._object_path(member["object"]), "rb") as object_file:
+                        content = object_file.read()
+                    if "tensors" not in member:
+                        archive.writestr(member["file"], content)
+                        continue
+                    skeleton = th.load(io.BytesIO(content), map_location="cpu", weights_only=False)
+                    with archive.open(member["file"], mode="w", force_zip64=True) as member_file:
+                        th.save(self._join_tensors(skeleton), member_file)
+
+        atomic_write(path, write)
+        for stale in glob.glob(os.path.join(restore_dir, "*.zip")):
+            if stale != path:
+                os.remove(stale)
+        return path
+
+    # ----- retention -----
+
+    def _apply_retention(self, manifest):
+        entries = sorted(manifest["checkpoints"].values(), key=lambda entry: entry["sequence"])
+        candidates = [entry for entry in entries if not entry.get("pinned")]
+        keep = set()
+        if self.keep_last:
+            keep.update(entry["name"] for entry in candidates[-self.keep_last:])
+        else:
+            keep.update(entry["name"] for entry in candidates)
+        if self.keep_every:
+            keep.update(entry["name"] for entry in candidates if entry["sequence"] % self.keep_every == 0)
+        if self.keep_best:
+            scored = sorted(
+                (entry for entry in candidates if entry.get("metric") is not None),
+                key=lambda entry: entry["metric"],
+                reverse=True,
+            )
+            keep.update(entry["name"] for entry in scored[:self.keep_best])
+        for entry in candidates:
+            if entry["name"] not in keep:
+                del manifest["checkpoints"][entry["name"]]
+
+    def _collect_garbage(self, manifest):
+        referenced = set()
+        for entry in manifest["checkpoints"].values():
+            for member in entry["members"]:
+                referenced.add(member["object"])
+                referenced.update(member.get("tensors", []))
+        for path in glob.glob(os.path.join(self.objects_dir, "*", "*")):
+            if os.path.basename(path) not in referenced and not path.endswith(".tmp"):
+                os.remove(path)
+
+    def usage(self):
+        """
+        Disk usage of the store.
+
+        :return: Dictionary with stored object bytes, the bytes the checkpoints would take
+            without deduplication, and the object count.
+        """
+        sizes = {
+            os.path.basename(path): os.path.getsize(path)
+            for path in glob.glob(os.path.join(self.objects_dir, "*", "*"))
+        }
+        logical = 0
+        for entry in self.checkpoints():
+            for member in entry["members"]:
+                logical += sizes.get(member["object"], 0)
+                logical += sum(sizes.get(digest, 0) for digest in member.get("tensors", []))
+        return {"stored_bytes": sum(sizes.values()), "logical_bytes": logical, "objects": len(sizes)}
+
+
+def checkpoint_timesteps(path):
+    """Read `num_timesteps` from an SB3 zip without loading its tensors."""
+    with zipfile.ZipFile(path) as archive:
+        return int(json.loads(archive.read("data")).get("num_timesteps", 0))
+
+
+def list_checkpoints(save_path):
+    """
+    Describe every checkpoint in `save_path`: store entries from the manifest and loose zips.
+
+    :return: Dictionary with `stored`, `files` and the store's disk `usage`.
+    """
+    store = CheckpointStore(save_path)
+    stored = [
+        {key: entry[key] for key in ("name", "sequence", "timesteps", "created", "metric", "pinned")}
+        for entry in store.checkpoints()
+    ]
+    files = [
+        {"name": os.path.basename(path), "bytes": os.path.getsize(path), "modified": os.path.getmtime(path)}
+        for path in sorted(glob.glob(os.path.join(save_path, "*.zip")), key=os.path.getmtime)
+    ]
+    return {"stored": stored, "files": files, "usage": store.usage()}
+
+
+def resolve_checkpoint(save_path, selector="latest"):
+    """
+    Resolve a checkpoint selector to a zip file `PPO.load` can read.
+
+    :param save_path: Checkpoint directory (loose zips and/or a checkpoint store).
+    :param selector: "latest" (newest of the store's latest entry and the loose zips other than
+        `best_model.zip`), "best" (the store's best entry, else `best_model.zip`), a store
+        checkpoint name, or a zip path (absolute or relative to `save_path`).
+    :return: Path to the zip, or None if nothing matches.
+    """
+    for candidate in (selector, os.path.join(save_path, selector)):
+        if selector not in ("latest", "best") and os.path.isfile(candidate):
+            return candidate
+
+    store = CheckpointStore(save_path)
+    best_path = os.path.join(save_path, BEST_MODEL_NAME)
+    if selector == "best":
+        # The default AsyncCheckpoint writer keeps the best model as a loose zip instead of a store entry
+        path = store.materialize("best")
+        return path or (best_path if os.path.isfile(best_path) else None)
+    if selector != "latest":
+        return store.materialize(selector)
+
+    entry = store.select("latest")
+    # A newer best-model write is not the latest point in training
+    loose = [path for path in glob.glob(os.path.join(save_path, "*.zip")) if path != best_path]
+    newest_file = max(loose, key=os.path.getmtime) if loose else None
+    if entry and (newest_file is None or entry["created"] >= os.path.getmtime(newest_file)):
+        return store.materialize(entry["name"])
+    return newest_file
@@ -0,0 +1,266 @@
+# path: .app/tools/checkpoint_writer.py
+
+from stable_baselines3.common.callbacks import BaseCallback
+from stable_baselines3.common.save_util import data_to_json
+from stable_baselines3.common.utils import get_system_info
+import stable_baselines3 as sb3
+import torch as th
+import numpy as np
+import threading
+import zipfile
+import shutil
+import time
+import os
+from app.tools.checkpoint_store import CheckpointStore, atomic_write, BEST_MODEL_NAME
+from app.tools.utils import parse_bool
+
+
+def _clone_to_cpu(value):
+    """Recursively copy tensors (e.g. inside optimizer state) to CPU memory."""
+    if isinstance(value, th.Tensor):
+        return value.detach().to("cpu", copy=True)
+    if isinstance(value, dict):
+        return {key: _clone_to_cpu(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_clone_to_cpu(item) for item in value)
+    return value
+
+
+def snapshot_model(model):
+    """
+    Capture everything `model.save()` writes, without touching the disk.
+
+    Mirrors `BaseAlgorithm.save`: class attributes are serialized to SB3's JSON format and
+    policy/optimizer state dicts are copied to CPU, so training can continue mutating the
+    live objects while the snapshot is written elsewhere.
+
+    :return: Dictionary with `data` (JSON string), `params` and `pytorch_variables`.
+    """
+    data = model.__dict__.copy()
+    exclude = set(model._excluded_save_params())
+    state_dicts_names, torch_variable_names = model._get_torch_save_params()
+    for torch_var in state_dicts_names + torch_variable_names:
+        exclude.add(torch_var.split(".")[0])
+    for param_name in exclude:
+        data.pop(param_name, None)
+
+    pytorch_variables = None
+    if torch_variable_names:
+        pytorch_variables = {}
+        for name in torch_variable_names:
+            attr = model
+            for part in name.split("."):
+                attr = getattr(attr, part)
+            pytorch_variables[name] = _clone_to_cpu(attr)
+
+    return {
+        "data": data_to_json(data),
+        "params": _clone_to_cpu(model.get_parameters()),
+        "pytorch_variables": pytorch_variables,
+        "num_timesteps": model.num_timesteps,
+    }
+
+
+def write_snapshot(file, snapshot):
+    """Write a snapshot in the same zip layout as `save_to_zip_file`, so `PPO.load` reads it."""
+    with zipfile.ZipFile(file, mode="w") as archive:
+        archive.writestr("data", snapshot["data"])
+        if snapshot["pytorch_variables"] is not None:
+            with archive.open("pytorch_variables.pth", mode="w", force_zip64=True) as pytorch_variables_file:
+                th.save(snapshot["pytorch_variables"], pytorch_variables_file)
+        for file_name, state_dict in snapshot["params"].items():
+            with archive.open(file_name + ".pth", mode="w", force_zip64=True) as param_file:
+                th.save(state_dict, param_file)
+        archive.writestr("_stable_baselines3_version", sb3.__version__)
+        archive.writestr("system_info.txt", get_system_info(print_info=False)[1])
+
+
+def _copy_file(source, destination):
+    with open(source, "rb") as f:
+        shutil.copyfileobj(f, destination)
+
+
+class AsyncCheckpointWriter:
+    """
+    Writes model snapshots on a background thread.
+
+    Only the newest pending snapshot is kept: if a write is still running when the next
+    checkpoint is due, the older pending one is replaced instead of stalling training.
+    With a CheckpointStore, snapshots go into the store and its retention policies
+    replace `keep_last` and the best-model copy.
+    """
+
+    def __init__(self, save_path, keep_last=5, best_filename=BEST_MODEL_NAME, store=None):
+        """
+        :param save_path: Checkpoint directory.
+        :param keep_last: Number of periodic checkpoints written by this writer to keep; 0 keeps all.
+        :param best_filename: File updated whenever a checkpoint has the best metric so far.
+        :param store: Optional CheckpointStore to write into instead of zip files.
+        """
+        self.save_path = save_path
+        self.keep_last = keep_last
+        self.store = store
+        self.best_path = os.path.join(save_path, best_filename) if best_filename else None
+        self.best_metric = None
+        self.written = []
+        self.last_write_seconds = None
+        self.dropped = 0
+
+        self._pending = None
+        self._busy = False
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, filename, snapshot, metric=None, periodic=True):
+        """
+        Queue a snapshot for writing.
+
+        :param filename: File name inside `save_path` (".zip" is appended if missing).
+        :param snapshot: Result of `snapshot_model`.
+        :param metric: Value compared for the best checkpoint (higher is better), or None.
+        :param periodic: Whether the file counts towards `keep_last` retention.
+        """
+        if not filename.endswith(".zip"):
+            filename += ".zip"
+        with self._condition:
+            if self._pending is not None:
+                self.dropped += 1
+            self._pending = (os.path.join(self.save_path, filename), snapshot, metric, periodic)
+            self._condition.notify_all()
+
+    def flush(self, timeout=None):
+        """
+        Block until every submitted snapshot is on disk.
+
+        :return: True if the queue drained within `timeout`.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._condition:
+            while self._pending is not None or self._busy:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def close(self, timeout=None):
+        """Flush and stop the writer thread."""
+        drained = self.flush(timeout)
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        return drained
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closed:
+                    self._condition.wait()
+                if self._pending is None:
+                    return
+                path, snapshot, metric, periodic = self._pending
+                self._pending = None
+                self._busy = True
+            try:
+                self._write(path, snapshot, metric, periodic)
+            except Exception as e:
+                print(f"Failed to write checkpoint {path}: {e}")
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
+
+    def _write(self, path, snapshot, metric, periodic):
+        start = time.time()
+        if self.store is not None:
+            name = os.path.splitext(os.path.basename(path))[0]
+            self.store.add_snapshot(name, snapshot, metric=metric, pinned=not periodic)
+            self.last_write_seconds = time.time() - start
+            print(f"Checkpoint '{name}' stored in {self.last_write_seconds:.2f}s.")
+            return
+
+        atomic_write(path, lambda f: write_snapshot(f, snapshot))
+        self.last_write_seconds = time.time() - start
+        print(f"Checkpoint written to {path} in {self.last_write_seconds:.2f}s.")
+
+        if metric is not None and self.best_path and (self.best_metric is None or metric > self.best_metric):
+            self.best_metric = metric
+            atomic_write(self.best_path, lambda f: _copy_file(path, f))
+            print(f"New best checkpoint (mean reward {metric:.3f}) copied to {self.best_path}.")
+
+        if periodic:
+            self.written.append(path)
+            while self.keep_last and len(self.written) > self.keep_last:
+                expired = self.written.pop(0)
+                try:
+                    os.remove(expired)
+                except OSError:
+                    pass
+
+
+class AsyncCheckpointCallback(BaseCallback):
+    """
+    Drop-in alternative to AutoSave that only pauses training for an in-memory snapshot.
+
+    Every `check_freq` timesteps the model is snapshotted and handed to an
+    AsyncCheckpointWriter; the last `keep_last` checkpoints plus `best_model.zip`
+    (by mean episode reward) are kept. `save_final` writes `last_model.zip` the same way.
+    With `store` enabled, checkpoints go into a deduplicated CheckpointStore in `save_path`
+    instead, retained by `keep_last`, `keep_every` and `keep_best`.
+    """
+
+    def __init__(self, check_freq, num_envs, save_path, filename_prefix="", keep_last=5, store=False,
+                 keep_every=0, keep_best=1, verbose=1):
+        super(AsyncCheckpointCallback, self).__init__(verbose)
+        self.check_freq = max(int(check_freq) // int(num_envs), 1)
+        self.num_envs = int(num_envs)
+        self.save_path = str(save_path)
+        self.filename = filename_prefix + "autosave_"
+        checkpoint_store = None
+        if parse_bool(store):
+            checkpoint_store = CheckpointStore(self.save_path, keep_last, keep_every, keep_best)
+        self.writer = AsyncCheckpointWriter(self.save_path, keep_last=int(keep_last), store=checkpoint_store)
+        self.snapshot_seconds = []
+
+    def _mean_episode_reward(self):
+        buffer = self.model.ep_info_buffer
+        if not buffer:
+            return None
+        return float(np.mean([info["r"] for info in buffer]))
+
+    def _snapshot(self):
+        start = time.time()
+        snapshot = snapshot_model(self.model)
+        self.snapshot_seconds.append(time.time() - start)
+        return snapshot
+
+    def _on_step(self) -> bool:
+        if self.n_calls % self.check_freq == 0:
+            snapshot = self._snapshot()
+            self.writer.submit(
+                # Named by the model's counter so resumed runs don't reuse earlier names
+                self.filename + str(self.model.num_timesteps),
+                snapshot,
+                metric=self._mean_episode_reward(),
+            )
+            self.logger.record("checkpoint/snapshot_seconds", self.snapshot_seconds[-1])
+            if self.writer.last_write_seconds is not None:
+                self.logger.record("checkpoint/write_seconds", self.writer.last_write_seconds)
+            if self.verbose > 0:
+                print(f"Checkpoint snapshot taken in {self.snapshot_seconds[-1]:.3f}s; writing in background.")
+        return True
+
+    def save(self, filename):
+        """Snapshot the model now and write it in the background, outside `keep_last` retention."""
+        self.writer.submit(filename, self._snapshot(), periodic=False)
+
+    def save_final(self, filename="last_model", timeout=None):
+        """
+        Write the final model through the writer and wait for every pending write.
+
+        :return: True if all checkpoints reached the disk within `timeout`.
+        """
+        self.save(filename)
+        return self.writer.close(timeout)
@@ -0,0 +1,219 @@
+# path: .app/tools/control_channel.py
+
+from stable_baselines3.common.callbacks import BaseCallback
+from stable_baselines3.common.utils import get_schedule_fn
+from datetime import datetime
+import json
+import time
+import uuid
+import os
+from app import DEFAULT_PATHS
+from app.tools.checkpoint_store import atomic_write
+
+MAILBOX_DIR = os.path.join(DEFAULT_PATHS["control_dir"], "mailbox")
+CONTROL_STATE = os.path.join(DEFAULT_PATHS["control_dir"], "state.json")
+
+COMMANDS = ("pause", "resume", "save", "set")
+# Settings `set` can change, with their type and lower bound
+SETTABLE = {
+    "learning_rate": (float, 0.0),
+    "ent_coef": (float, 0.0),
+    "render_sync_every": (int, 1),
+}
+
+
+def _write_json(path, payload):
+    atomic_write(path, lambda f: f.write(json.dumps(payload, indent=4).encode("utf-8")))
+
+
+def validate_command(command, settings=None):
+    """
+    Check a control command and convert its settings.
+
+    :return: The converted settings.
+    :raises ValueError: On unknown commands, unknown settings or out-of-range values.
+    """
+    if command not in COMMANDS:
+        raise ValueError(f"Unknown command '{command}'. Expected one of: {', '.join(COMMANDS)}.")
+    if command != "set":
+        return {}
+    if not settings:
+        raise ValueError(f"'set' needs at least one of: {', '.join(SETTABLE)}.")
+    converted = {}
+    for key, value in settings.items():
+        if key not in SETTABLE:
+            raise ValueError(f"Unknown setting '{key}'. Expected one of: {', '.join(SETTABLE)}.")
+        cast, minimum = SETTABLE[key]
+        try:
+            converted[key] = cast(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid value for '{key}': {value}.")
+        if converted[key] < minimum:
+            raise ValueError(f"'{key}' must be at least {minimum}.")
+    return converted
+
+
+def send_command(command, settings=None):
+    """
+    Drop a command into the training process's mailbox.
+
+    Commands are files processed in the order they were sent, within `poll_interval`
+    seconds of arriving, including while training is paused.
+
+    :return: The queued command.
+    :raises ValueError: If the command is invalid.
+    """
+    message = {
+        "id": f"{time.time_ns()}-{uuid.uuid4().hex[:8]}",
+        "command": command,
+        "settings": validate_command(command, settings),
+        "sent": datetime.now().isoformat(),
+    }
+    _write_json(os.path.join(MAILBOX_DIR, f"{message['id']}.json"), message)
+    return message
+
+
+def load_control_state():
+    """Return the state last published by the training process, or None."""
+    if not os.path.isfile(CONTROL_STATE):
+        return None
+    with open(CONTROL_STATE, encoding="utf-8") as f:
+        state = json.load(f)
+    try:
+        state["queued"] = len([name for name in os.listdir(MAILBOX_DIR) if name.endswith(".json")])
+    except OSError:
+        state["queued"] = 0
+    return state
+
+
+class ControlChannelCallback(BaseCallback):
+    """
+    Applies mailbox commands to the running job without restarting it.
+
+    - pause / resume: hold training inside `_on_step` until resumed; the mailbox keeps being read.
+    - save: write `manual_<timesteps>.zip` now (through the async writer when it is in use).
+    - set: replace the learning rate schedule with a constant, change `ent_coef` or the
+      number of rollouts between render model syncs.
+    """
+
+    def __init__(self, save_path, checkpoint_callback=None, render_callbacks=(), poll_interval=0.5,
+                 history=20, stop_event=None, verbose=1):
+        """
+        :param save_path: Directory for `save` when no async checkpoint callback is given.
+        :param checkpoint_callback: Optional AsyncCheckpointCallback that owns saving.
+        :param render_callbacks: RenderCallback instances whose sync frequency `set` changes.
+        :param poll_interval: Seconds between mailbox reads.
+        :param stop_event: Optional threading.Event that also ends a pause, e.g. on shutdown.
+        """
+        super(ControlChannelCallback, self).__init__(verbose)
+        self.save_path = save_path
+        self.checkpoint_callback = checkpoint_callback
+        self.render_callbacks = list(render_callbacks)
+        self.poll_interval = poll_interval
+        self.history_size = history
+        self.history = []
+        self.stop_event = stop_event
+        self.paused = False
+        self.last_poll = 0.0
+
+    def _on_training_start(self):
+        # Commands left behind by an earlier run are not meant for this one
+        for message_path in self._mailbox():
+            os.remove(message_path)
+        self.publish()
+
+    def _mailbox(self):
+        try:
+            names = sorted(name for name in os.listdir(MAILBOX_DIR) if name.endswith(".json"))
+        except OSError:
+            return []
+        return [os.path.join(MAILBOX_DIR, name) for name in names]
+
+    def _poll(self):
+        processed = False
+        for message_path in self._mailbox():
+            message = {"id": os.path.basename(message_path)}
+            try:
+                with open(message_path, encoding="utf-8") as f:
+                    message = json.load(f)
+                result = self._apply(message.get("command"), message.get("settings") or {})
+            except Exception as e:
+                result = f"failed: {e}"
+            finally:
+                try:
+                    os.remove(message_path)
+                except OSError:
+                    pass
+            if self.verbose > 0:
+                print(f"Control command {message.get('command')}: {result}")
+            self.history.append({
+                "id": message.get("id"),
+                "command": message.get("command"),
+                "settings": message.get("settings"),
+                "result": result,
+                "timesteps": self.num_timesteps,
+                "applied": datetime.now().isoformat(),
+            })
+            self.history = self.history[-self.history_size:]
+            processed = True
+        if processed:
+            self.publish()
+
+    def _apply(self, command, settings):
+        settings = validate_command(command, settings)
+        if command == "pause":
+            self.paused = True
+            return "paused"
+        if command == "resume":
+            self.paused = False
+            return "resumed"
+        if command == "save":
+            return self._save()
+        for key, value in settings.items():
+            if key == "learning_rate":
+                # `train` re-reads the schedule every update, so setting the optimizer alone would not stick
+                self.model.learning_rate = value
+                self.model.lr_schedule = get_schedule_fn(value)
+            elif key == "ent_coef":
+                self.model.ent_coef = value
+            elif key == "render_sync_every":
+                for render_callback in self.render_callbacks:
+                    render_callback.sync_every = value
+        return f"set {settings}"
+
+    def _save(self):
+        filename = f"manual_{self.num_timesteps}"
+        if self.checkpoint_callback is not None:
+            self.checkpoint_callback.save(filename)
+            return f"queued {filename} on the checkpoint writer"
+        path = os.path.join(self.save_path, f"{filename}.zip")
+        self.model.save(path)
+        return f"saved {path}"
+
+    def publish(self):
+        """Write the current settings and recent commands for the web app."""
+        state = {
+            "paused": self.paused,
+            "timesteps": self.num_timesteps,
+            "learning_rate": float(self.model.lr_schedule(self.model._current_progress_remaining)),
+            "ent_coef": float(self.model.ent_coef),
+            "render_sync_every": self.render_callbacks[0].sync_every if self.render_callbacks else None,
+            "updated": datetime.now().isoformat(),
+            "history": self.history,
+        }
+        _write_json(CONTROL_STATE, state)
+
+    def _on_step(self) -> bool:
+        now = time.time()
+        if now - self.last_poll < self.poll_interval:
+            return True
+        self.last_poll = now
+        self._poll()
+
+        if self.paused:
+            print(f"Training paused at {self.num_timesteps} timesteps.")
+            while self.paused and not (self.stop_event and self.stop_event.is_set()):
+                time.sleep(self.poll_interval)
+                self._poll()
+            print("Training resumed." if not self.paused else "Leaving pause to shut down.")
+        return True
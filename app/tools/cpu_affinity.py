@@ -0,0 +1,190 @@
+# path: .app/tools/cpu_affinity.py
+
+from datetime import datetime
+import subprocess
+import torch as th
+import json
+import time
+import os
+from app.tools.vec_env_backends import BENCHMARK_DIR
+
+
+def parse_core_list(spec):
+    """
+    Parse a core list such as "0-3,6" into sorted core ids.
+
+    :param spec: Comma-separated cores and inclusive ranges; empty means no cores.
+    :return: Sorted list of ints.
+    """
+    cores = set()
+    for part in (spec or "").replace(" ", "").split(","):
+        if not part:
+            continue
+        if "-" in part:
+            start, end = part.split("-", 1)
+            cores.update(range(int(start), int(end) + 1))
+        else:
+            cores.add(int(part))
+    return sorted(cores)
+
+
+def format_core_list(cores):
+    """Format core ids for `docker update --cpuset-cpus`."""
+    return ",".join(str(core) for core in sorted(cores))
+
+
+def available_cores():
+    """Cores this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def plan_split(learner_cores="", env_cores="", learner_threads=0):
+    """
+    Resolve the learner/env CPU split from the training config.
+
+    :param learner_cores: Core list for the learner; empty leaves it unpinned.
+    :param env_cores: Core list for env processes and containers; defaults to the cores not given to the learner.
+    :param learner_threads: torch intra-op threads; 0 uses one per learner core (or torch's default when unpinned).
+    :return: Dictionary with `learner_cores`, `env_cores` and `learner_threads`.
+    """
+    cores = available_cores()
+    learner = [core for core in parse_core_list(learner_cores) if core in cores]
+    env = parse_core_list(env_cores) or [core for core in cores if core not in learner]
+    threads = int(learner_threads or 0) or len(learner)
+    return {"learner_cores": learner, "env_cores": env if learner or env_cores else [], "learner_threads": threads}
+
+
+def find_env_containers(env_addresses):
+    """
+    Find the local engine containers publishing the given `host:port` addresses.
+
+    :return: List of container ids; remote engines are not found and therefore left alone.
+    """
+    container_ids = []
+    for address in env_addresses:
+        port = address.rsplit(":", 1)[-1]
+        result = subprocess.run(
+            ["docker", "ps", "-q", "--no-trunc", "--filter", f"publish={port}"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            timeout=30,
+        )
+        container_ids.extend(result.stdout.split())
+    return container_ids
+
+
+def pin_learner(cores, threads):
+    """
+    Pin the learner process and set its torch intra-op thread count.
+
+    :param cores: Core ids, or empty to leave the affinity unchanged.
+    :param threads: Thread count, or 0 to leave torch's setting unchanged.
+    """
+    if cores:
+        if hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, cores)
+        else:
+            print("CPU affinity is not supported on this platform; only the thread count is applied.")
+    if threads:
+        th.set_num_threads(threads)
+
+
+def pin_env_processes(env, cores):
+    """Pin SubprocVecEnv worker processes to the env cores."""
+    if not cores or not hasattr(os, "sched_setaffinity"):
+        return
+    for process in getattr(env, "processes", []):
+        try:
+            os.sched_setaffinity(process.pid, cores)
+        except OSError as e:
+            print(f"Failed to pin env worker {process.pid}: {e}")
+
+
+def pin_env_containers(container_ids, cores):
+    """Restrict engine containers to the env cores with `docker update --cpuset-cpus`."""
+    if not cores or not container_ids:
+        return
+    result = subprocess.run(
+        ["docker", "update", "--cpuset-cpus", format_core_list(cores), *container_ids],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        timeout=60,
+    )
+    if result.returncode != 0:
+        print(f"Failed to pin env containers: {result.stderr.strip()}")
+
+
+def apply_split(split, env, env_addresses):
+    """
+    Apply a split from `plan_split` to the learner, its env workers and the local engine containers.
+    """
+    pin_learner(split["learner_cores"], split["learner_threads"])
+    pin_env_processes(env, split["env_cores"])
+    pin_env_containers(find_env_containers(env_addresses), split["env_cores"])
+    print(
+        f"CPU split: learner cores {split['learner_cores'] or 'unpinned'} with "
+        f"{th.get_num_threads()} torch thread(s), env cores {split['env_cores'] or 'unpinned'}."
+    )
+
+
+def candidate_splits(cores=None):
+    """
+    Propose learner/env splits to calibrate: a few learner core counts, envs on the rest.
+
+    :return: List of split dictionaries, starting with an unpinned baseline.
+    """
+    cores = cores or available_cores()
+    splits = [{"learner_cores": [], "env_cores": [], "learner_threads": 0}]
+    counts = sorted({1, 2, len(cores) // 4, len(cores) // 2, 3 * len(cores) // 4})
+    for count in counts:
+        if 1 <= count < len(cores):
+            splits.append({"learner_cores": cores[:count], "env_cores": cores[count:], "learner_threads": count})
+    return splits
+
+
+def calibrate_cpu_splits(agent, env_addresses, splits=None, rollouts=3, output_dir=BENCHMARK_DIR):
+    """
+    Train briefly under each candidate split and report env-steps/s.
+
+    :param agent: PPO instance with its env attached; its weights are updated by the trial runs.
+    :param env_addresses: Engine addresses from `DIAMBRA_ENVS`.
+    :param splits: Splits to try; defaults to `candidate_splits()`.
+    :param rollouts: Number of PPO rollouts timed per split.
+    :return: Report dictionary, also written as JSON under `output_dir`.
+    """
+    cores = available_cores()
+    default_threads = th.get_num_threads()
+    container_ids = find_env_containers(env_addresses)
+    results = []
+    for split in splits or candidate_splits(cores):
+        # Unpinned entries mean "all cores" so every trial starts from a known state
+        pin_learner(split["learner_cores"] or cores, split["learner_threads"] or default_threads)
+        pin_env_processes(agent.env, split["env_cores"] or cores)
+        pin_env_containers(container_ids, split["env_cores"] or cores)
+
+        timesteps = rollouts * agent.n_steps * agent.n_envs
+        start = time.time()
+        agent.learn(total_timesteps=timesteps)
+        elapsed = time.time() - start
+        result = {
+            "learner_cores": format_core_list(split["learner_cores"]) or "all",
+            "env_cores": format_core_list(split["env_cores"]) or "all",
+            "learner_threads": th.get_num_threads(),
+            "env_steps_per_sec": round(agent.num_timesteps / elapsed, 2),
+        }
+        results.append(result)
+        print(f"  {result}")
+
+    pin_learner(cores, default_threads)
+    best = max(results, key=lambda result: result["env_steps_per_sec"])
+    report = {"timestamp": datetime.now().isoformat(), "cores": len(cores), "results": results, "best": best}
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f"affinity_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4)
+    print(f"Calibration results saved to: {path}")
+    return report
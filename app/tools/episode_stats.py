@@ -0,0 +1,209 @@
+# path: .app/tools/episode_stats.py
+
+from stable_baselines3.common.callbacks import BaseCallback
+import numpy as np
+
+# Info keys the episode settings wrappers fill in on the last step of an episode
+PAIR_KEY = "character_pair"
+DIFFICULTY_KEY = "difficulty"
+
+
+def pair_name(pair):
+    """TensorBoard-friendly name of a character selection, e.g. ['Ryu', 'Ken'] -> 'Ryu_Ken'."""
+    if isinstance(pair, (list, tuple)):
+        return "_".join(pair_name(character) for character in pair)
+    return str(pair).replace(" ", "-")
+
+
+class RollingWindow:
+    """
+    Fixed-size ring buffers for a set of groups, stored as one `(groups, window)` array.
+
+    A running sum per group keeps the rolling mean O(1) per insert; percentiles are taken
+    over the window only when exported.
+    """
+
+    def __init__(self, groups, window):
+        self.window = window
+        self.values = np.zeros((groups, window), dtype=np.float64)
+        self.sums = np.zeros(groups, dtype=np.float64)
+        self.counts = np.zeros(groups, dtype=np.int64)  # Episodes ever added, per group
+        self.cursor = np.zeros(groups, dtype=np.int64)
+
+    @property
+    def groups(self):
+        return self.values.shape[0]
+
+    def grow(self, groups):
+        """Make room for at least `groups` groups, doubling to keep growth amortized."""
+        if groups <= self.groups:
+            return
+        size = max(groups, 2 * self.groups)
+        extra = size - self.groups
+        self.values = np.concatenate([self.values, np.zeros((extra, self.window))])
+        self.sums = np.concatenate([self.sums, np.zeros(extra)])
+        self.counts = np.concatenate([self.counts, np.zeros(extra, dtype=np.int64)])
+        self.cursor = np.concatenate([self.cursor, np.zeros(extra, dtype=np.int64)])
+
+    def add(self, groups, values):
+        """
+        Insert `values[i]` into group `groups[i]`.
+
+        Episodes of the same group finishing on the same step are inserted one after the
+        other, so the loop only runs over repeated groups.
+        """
+        groups = np.asarray(groups, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        while groups.size:
+            # First occurrence of every group goes in this pass, the repeats in the next
+            unique, first = np.unique(groups, return_index=True)
+            slots = self.cursor[unique]
+            self.sums[unique] += values[first] - self.values[unique, slots]
+            self.values[unique, slots] = values[first]
+            self.cursor[unique] = (slots + 1) % self.window
+            self.counts[unique] += 1
+            remaining = np.ones(groups.size, dtype=bool)
+            remaining[first] = False
+            groups, values = groups[remaining], values[remaining]
+
+    def filled(self, group):
+        return min(int(self.counts[group]), self.window)
+
+    def mean(self, group):
+        filled = self.filled(group)
+        return self.sums[group] / filled if filled else None
+
+    def percentiles(self, group, q):
+        filled = self.filled(group)
+        if not filled:
+            return None
+        return np.percentile(self.values[group, :filled], q)
+
+
+class EpisodeStats:
+    """
+    Episode returns and lengths aggregated per env, per character pair and per difficulty.
+
+    Running returns live in arrays indexed by env id and are advanced for all envs with one
+    vectorized operation per step; only envs whose episode ended are touched individually,
+    to read the pair and difficulty from their info.
+    """
+
+    def __init__(self, num_envs, window=100, pairs=16, difficulties=10):
+        self.num_envs = num_envs
+        self.window = window
+        self.episode_return = np.zeros(num_envs, dtype=np.float64)
+        self.episode_length = np.zeros(num_envs, dtype=np.int64)
+        self.episodes = 0
+
+        self.rewards = RollingWindow(1, window)
+        self.lengths = RollingWindow(1, window)
+        self.env_rewards = RollingWindow(num_envs, window)
+        self.pair_rewards = RollingWindow(pairs, window)
+        self.difficulty_rewards = RollingWindow(difficulties, window)
+        self.pair_index = {}
+
+    def _pair_ids(self, pairs):
+        ids = np.empty(len(pairs), dtype=np.int64)
+        for position, pair in enumerate(pairs):
+            if pair not in self.pair_index:
+                self.pair_index[pair] = len(self.pair_index)
+            ids[position] = self.pair_index[pair]
+        self.pair_rewards.grow(len(self.pair_index))
+        return ids
+
+    def update(self, rewards, dones, infos=None):
+        """
+        Advance every env by one step.
+
+        :param rewards: Array of per-env rewards from the vec env.
+        :param dones: Array of per-env done flags.
+        :param infos: Per-env info dicts; read only for envs whose episode ended.
+        """
+        self.episode_return += rewards
+        self.episode_length += 1
+        finished = np.flatnonzero(dones)
+        if not finished.size:
+            return
+
+        returns = self.episode_return[finished]
+        zeros = np.zeros(finished.size, dtype=np.int64)
+        self.rewards.add(zeros, returns)
+        self.lengths.add(zeros, self.episode_length[finished])
+        self.env_rewards.add(finished, returns)
+        self.episodes += finished.size
+
+        if infos is not None:
+            tagged = [(index, infos[env].get(PAIR_KEY)) for index, env in enumerate(finished)]
+            tagged = [(index, pair) for index, pair in tagged if pair]
+            if tagged:
+                positions, pairs = zip(*tagged)
+                self.pair_rewards.add(self._pair_ids([pair_name(pair) for pair in pairs]), returns[list(positions)])
+
+            tagged = [(index, infos[env].get(DIFFICULTY_KEY)) for index, env in enumerate(finished)]
+            tagged = [(index, int(difficulty)) for index, difficulty in tagged if difficulty is not None]
+            if tagged:
+                positions, difficulties = zip(*tagged)
+                self.difficulty_rewards.grow(max(difficulties) + 1)
+                self.difficulty_rewards.add(difficulties, returns[list(positions)])
+
+        self.episode_return[finished] = 0.0
+        self.episode_length[finished] = 0
+
+    def summary(self, percentiles=(10, 50, 90)):
+        """
+        Rolling statistics over the last `window` episodes.
+
+        :return: Dictionary with the overall reward and length stats plus per-env, per-pair
+            and per-difficulty mean rewards.
+        """
+        summary = {"episodes": self.episodes}
+        if not self.rewards.counts[0]:
+            return summary
+        summary["reward_mean"] = float(self.rewards.mean(0))
+        for q, value in zip(percentiles, self.rewards.percentiles(0, percentiles)):
+            summary[f"reward_p{q}"] = float(value)
+        summary["length_mean"] = float(self.lengths.mean(0))
+        summary["env_reward_mean"] = {
+            env: float(self.env_rewards.mean(env)) for env in range(self.num_envs) if self.env_rewards.counts[env]
+        }
+        summary["pair_reward_mean"] = {
+            pair: float(self.pair_rewards.mean(index)) for pair, index in self.pair_index.items()
+        }
+        summary["difficulty_reward_mean"] = {
+            difficulty: float(self.difficulty_rewards.mean(difficulty))
+            for difficulty in np.flatnonzero(self.difficulty_rewards.counts).tolist()
+        }
+        return summary
+
+
+class EpisodeStatsCallback(BaseCallback):
+    """
+    Feeds every vec env step into an EpisodeStats engine and exports the rolling
+    statistics to TensorBoard under `episodes/` at the end of each rollout.
+    """
+
+    def __init__(self, window=100, percentiles=(10, 50, 90), verbose=0):
+        super(EpisodeStatsCallback, self).__init__(verbose)
+        self.window = int(window)
+        self.percentiles = tuple(percentiles)
+        self.stats = None
+
+    def _init_callback(self):
+        self.stats = EpisodeStats(self.training_env.num_envs, self.window)
+
+    def _on_step(self) -> bool:
+        self.stats.update(self.locals["rewards"], self.locals["dones"], self.locals.get("infos"))
+        return True
+
+    def _on_rollout_end(self):
+        summary = self.stats.summary(self.percentiles)
+        self.logger.record("episodes/count", summary["episodes"])
+        if "reward_mean" not in summary:
+            return
+        for key in ["reward_mean", "length_mean"] + [f"reward_p{q}" for q in self.percentiles]:
+            self.logger.record(f"episodes/{key}", summary[key])
+        for pair, mean in summary["pair_reward_mean"].items():
+            self.logger.record(f"episodes/pair/{pair}", mean)
+        for difficulty, mean in summary["difficulty_reward_mean"].items():
+            self.logger.record(f"episodes/difficulty/{difficulty}", mean)
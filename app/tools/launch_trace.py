@@ -0,0 +1,130 @@
+# path: .app/tools/launch_trace.py
+
+from stable_baselines3.common.callbacks import BaseCallback
+from contextlib import contextmanager
+import json
+import glob
+import os
+import time
+from app import DEFAULT_PATHS
+
+TRACE_DIR = os.path.join(DEFAULT_PATHS["log_dir"], "launch_traces")
+
+
+class LaunchTracer:
+    """
+    Records wall-clock time per launch stage to a JSON-lines file shared by the
+    web process and the container-side training script, correlated by run id.
+    """
+
+    def __init__(self, run_id, side, trace_dir=TRACE_DIR):
+        """
+        :param run_id: Identifier shared by every process taking part in the launch.
+        :param side: Which process is recording (e.g. 'web', 'training_group').
+        :param trace_dir: Directory holding one `<run_id>.jsonl` file per launch.
+        """
+        self.run_id = run_id
+        self.side = side
+        self.trace_dir = trace_dir
+        os.makedirs(trace_dir, exist_ok=True)
+        self.path = os.path.join(trace_dir, f"{run_id}.jsonl")
+
+    @contextmanager
+    def stage(self, name, **details):
+        """Time the enclosed block as one stage."""
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.time(), **details)
+
+    def record(self, name, start, end, **details):
+        """
+        Append a finished stage to the trace file.
+
+        :param name: Stage name.
+        :param start: UNIX timestamp when the stage began.
+        :param end: UNIX timestamp when the stage ended.
+        """
+        entry = {
+            "run_id": self.run_id,
+            "side": self.side,
+            "stage": name,
+            "start": start,
+            "end": end,
+            "duration": end - start,
+            "pid": os.getpid(),
+            "details": details,
+        }
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError as e:
+            print(f"Failed to record launch stage '{name}': {e}")
+
+
+class LaunchTraceCallback(BaseCallback):
+    """
+    Closes the launch trace once the first PPO rollout has been collected.
+    """
+
+    def __init__(self, tracer, verbose=0):
+        super(LaunchTraceCallback, self).__init__(verbose)
+        self.tracer = tracer
+        self.learn_start = None
+        self.recorded = False
+
+    def _on_training_start(self):
+        self.learn_start = time.time()
+
+    def _on_rollout_end(self):
+        if not self.recorded:
+            self.tracer.record("first_rollout", self.learn_start, time.time(), n_steps=self.model.n_steps)
+            self.recorded = True
+
+    def _on_step(self) -> bool:
+        return True
+
+
+def latest_run_id(trace_dir=TRACE_DIR):
+    """
+    Return the run id of the most recently written trace, or None.
+    """
+    traces = glob.glob(os.path.join(trace_dir, "*.jsonl"))
+    if not traces:
+        return None
+    return os.path.splitext(os.path.basename(max(traces, key=os.path.getmtime)))[0]
+
+
+def load_waterfall(run_id, trace_dir=TRACE_DIR):
+    """
+    Build a waterfall view of a launch trace.
+
+    :param run_id: Run id to load.
+    :param trace_dir: Directory holding the trace files.
+    :return: Dictionary with stages ordered by start time and offsets relative to the first stage,
+        or None if the trace does not exist.
+    """
+    path = os.path.join(trace_dir, f"{run_id}.jsonl")
+    if not os.path.exists(path):
+        return None
+
+    with open(path, encoding="utf-8") as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    if not entries:
+        return {"run_id": run_id, "total": 0.0, "stages": []}
+
+    entries.sort(key=lambda entry: entry["start"])
+    origin = entries[0]["start"]
+    stages = [
+        {
+            "side": entry["side"],
+            "stage": entry["stage"],
+            "offset": round(entry["start"] - origin, 3),
+            "duration": round(entry["duration"], 3),
+            "details": entry.get("details", {}),
+        }
+        for entry in entries
+    ]
+    total = max(entry["end"] for entry in entries) - origin
+    return {"run_id": run_id, "total": round(total, 3), "stages": stages}
@@ -0,0 +1,320 @@
+# path: .app/tools/pbt.py
+
+from stable_baselines3.common.callbacks import BaseCallback
+from datetime import datetime
+import numpy as np
+import threading
+import random
+import json
+import os
+from app import DEFAULT_PATHS, DEFAULT_HYPERPARAMETERS
+from app.tools.utils import load_run_report
+from app.tools.vec_env_backends import make_vec_env, agent_class
+
+PBT_DIR = os.path.join(DEFAULT_PATHS["log_dir"], "pbt")
+
+# Perturbed hyperparameters with the bounds they are clipped to
+PERTURBED = {
+    "learning_rate": (1e-6, 1e-2),
+    "ent_coef": (0.0, 0.1),
+    "clip_range": (0.01, 0.5),
+}
+
+_env_lock = threading.Lock()
+
+
+def split_env_addresses(addresses, population):
+    """
+    Divide the engine addresses into one contiguous subset per population member.
+
+    :raises ValueError: If there are fewer engines than members.
+    """
+    if len(addresses) < population:
+        raise ValueError(f"PBT needs at least one env per member: {len(addresses)} env(s) for {population} members.")
+    size, extra = divmod(len(addresses), population)
+    subsets, start = [], 0
+    for index in range(population):
+        end = start + size + (1 if index < extra else 0)
+        subsets.append(addresses[start:end])
+        start = end
+    return subsets
+
+
+def make_member_env(backend, game_id, env_settings, wrapper_settings, addresses):
+    """
+    Build a vec env on a subset of the engines.
+
+    DIAMBRA's env factory reads `DIAMBRA_ENVS` when the envs are created, so the variable is
+    narrowed to the subset for the duration of the call.
+    """
+    with _env_lock:
+        previous = os.environ.get("DIAMBRA_ENVS", "")
+        os.environ["DIAMBRA_ENVS"] = " ".join(addresses)
+        try:
+            return make_vec_env(backend, game_id, env_settings, wrapper_settings)
+        finally:
+            os.environ["DIAMBRA_ENVS"] = previous
+
+
+class _StopCallback(BaseCallback):
+    def __init__(self, stop_event):
+        super(_StopCallback, self).__init__()
+        self.stop_event = stop_event
+
+    def _on_step(self) -> bool:
+        return not self.stop_event.is_set()
+
+
+class MemberSchedule:
+    """
+    A member's linear schedule, scaled by its perturbed value and driven by run-wide progress.
+
+    Holds plain values only, because SB3 pickles `lr_schedule` and `clip_range` into every save.
+    SB3's `progress_remaining` only covers the current round's `learn` call, so the timesteps
+    are recovered from it via `learn_total` (the round's target timestep counter) before being
+    related to the member's `total_timesteps`.
+    """
+
+    def __init__(self, start, end, total_timesteps, scale=1.0):
+        self.start = float(start)
+        self.end = float(end)
+        self.total_timesteps = int(total_timesteps)
+        self.scale = float(scale)
+        self.learn_total = 0
+
+    def __call__(self, progress_remaining):
+        timesteps = (1.0 - progress_remaining) * self.learn_total
+        progress = max(1.0 - timesteps / self.total_timesteps, 0.0)
+        return self.scale * (self.end + progress * (self.start - self.end))
+
+
+class PopulationMember:
+    """
+    One PPO learner of the population with its own envs and perturbed hyperparameters.
+
+    The configured learning rate and clip range schedules keep their shape; PBT scales them
+    by the member's value relative to the configured start value. Members train in rounds, so
+    the schedules follow progress over the whole run instead of SB3's per-`learn` progress.
+    `ent_coef` is a constant and is replaced directly.
+    """
+
+    def __init__(self, index, agent, base_schedules, anchor, hyperparameters, total_timesteps):
+        """
+        :param base_schedules: Configured `(start, end)` of the `learning_rate` and `clip_range` schedules.
+        :param anchor: Configured start values the schedules are scaled relative to.
+        :param hyperparameters: This member's `learning_rate`, `ent_coef` and `clip_range`.
+        :param total_timesteps: Timesteps per member over the whole run.
+        """
+        self.index = index
+        self.agent = agent
+        self.anchor = anchor
+        self.hyperparameters = dict(hyperparameters)
+        self.total_timesteps = int(total_timesteps)
+        self.score = None
+        self.error = None
+        self.schedules = {
+            key: MemberSchedule(start, end, self.total_timesteps) for key, (start, end) in base_schedules.items()
+        }
+        self.agent.lr_schedule = self.schedules["learning_rate"]
+        self.agent.clip_range = self.schedules["clip_range"]
+        self.apply_hyperparameters()
+
+    def apply_hyperparameters(self):
+        for key, schedule in self.schedules.items():
+            schedule.scale = self.hyperparameters[key] / self.anchor[key]
+        self.agent.ent_coef = self.hyperparameters["ent_coef"]
+
+    def mean_reward(self):
+        buffer = self.agent.ep_info_buffer
+        if not buffer:
+            return None
+        return float(np.mean([info["r"] for info in buffer]))
+
+    def train(self, timesteps, stop_event):
+        # `learn(reset_num_timesteps=False)` runs up to this counter, which maps its progress back to timesteps
+        for schedule in self.schedules.values():
+            schedule.learn_total = self.agent.num_timesteps + timesteps
+        try:
+            self.agent.learn(
+                total_timesteps=timesteps,
+                callback=_StopCallback(stop_event),
+                reset_num_timesteps=False,
+                tb_log_name=f"PPO_pbt_member_{self.index}",
+            )
+        except Exception as e:
+            self.error = e
+        self.score = self.mean_reward()
+
+    def copy_from(self, other):
+        """Exploit: take over another member's weights, optimizer state and hyperparameters."""
+        self.agent.policy.load_state_dict(other.agent.policy.state_dict())
+        self.agent.policy.optimizer.load_state_dict(other.agent.policy.optimizer.state_dict())
+        self.hyperparameters = dict(other.hyperparameters)
+        self.apply_hyperparameters()
+        # Rank the copy by its own episodes from the next round on
+        self.agent.ep_info_buffer.clear()
+
+
+def perturb(hyperparameters, factor, rng):
+    """Explore: scale every perturbed hyperparameter up or down by `factor`, within its bounds."""
+    perturbed = dict(hyperparameters)
+    for key, (low, high) in PERTURBED.items():
+        scale = 1.0 + factor if rng.random() < 0.5 else 1.0 - factor
+        value = perturbed[key] * scale if perturbed[key] else high * factor
+        perturbed[key] = float(min(max(value, low), high))
+    return perturbed
+
+
+class PopulationTrainer:
+    """
+    Population-based training: M PPO learners train in parallel threads on separate engine
+    subsets. Every `interval` timesteps per member they are ranked by mean episode reward; the
+    bottom `fraction` copies the weights of a random member of the top `fraction` and
+    perturbs its learning rate, entropy coefficient and clip range.
+    """
+
+    def __init__(self, members, interval, fraction=0.25, perturb_factor=0.2, seed=None, run_id="pbt",
+                 output_dir=PBT_DIR):
+        self.members = members
+        self.interval = int(interval)
+        self.fraction = fraction
+        self.perturb_factor = perturb_factor
+        self.rng = random.Random(seed)
+        self.stop_event = threading.Event()
+        self.history = []
+        self.run_id = run_id
+        self.output_dir = output_dir
+
+    @property
+    def leader(self):
+        scored = [member for member in self.members if member.score is not None]
+        return max(scored, key=lambda member: member.score) if scored else self.members[0]
+
+    def train_round(self):
+        threads = [
+            threading.Thread(target=member.train, args=(self.interval, self.stop_event), daemon=True)
+            for member in self.members
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for member in self.members:
+            if member.error is not None:
+                raise member.error
+
+    def exploit_and_explore(self):
+        """
+        Replace the bottom members by perturbed copies of top members.
+
+        :return: List of (source, target) member indices.
+        """
+        ranked = sorted(
+            self.members,
+            key=lambda member: member.score if member.score is not None else float("-inf"),
+            reverse=True,
+        )
+        cutoff = max(1, int(len(ranked) * self.fraction))
+        if len(ranked) < 2 * cutoff:
+            return []
+        copies = []
+        for target in ranked[-cutoff:]:
+            source = self.rng.choice(ranked[:cutoff])
+            target.copy_from(source)
+            target.hyperparameters = perturb(source.hyperparameters, self.perturb_factor, self.rng)
+            target.apply_hyperparameters()
+            copies.append((source.index, target.index))
+        return copies
+
+    def run(self, total_timesteps, on_round=None):
+        """
+        Train until every member reached `total_timesteps` or `stop()` is called.
+
+        :param on_round: Optional callable receiving the trainer after each round.
+        :return: The final report.
+        """
+        while not self.stop_event.is_set():
+            remaining = total_timesteps - min(member.agent.num_timesteps for member in self.members)
+            if remaining <= 0:
+                break
+            self.train_round()
+            copies = self.exploit_and_explore() if remaining > self.interval else []
+            self.history.append({
+                "timestamp": datetime.now().isoformat(),
+                "timesteps": [member.agent.num_timesteps for member in self.members],
+                "scores": [member.score for member in self.members],
+                "hyperparameters": [dict(member.hyperparameters) for member in self.members],
+                "copies": copies,
+            })
+            self.write_report()
+            if on_round:
+                on_round(self)
+        return self.write_report()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def write_report(self):
+        report = {
+            "run_id": self.run_id,
+            "population": len(self.members),
+            "interval": self.interval,
+            "leader": self.leader.index,
+            "members": [
+                {
+                    "index": member.index,
+                    "score": member.score,
+                    "timesteps": member.agent.num_timesteps,
+                    "num_envs": member.agent.n_envs,
+                    "hyperparameters": member.hyperparameters,
+                }
+                for member in self.members
+            ],
+            "rounds": self.history,
+        }
+        os.makedirs(self.output_dir, exist_ok=True)
+        with open(os.path.join(self.output_dir, f"{self.run_id}.json"), "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4)
+        return report
+
+
+def build_population(population, backend, game_id, env_settings, wrapper_settings, agent_kwargs, hyperparameters,
+                     env_addresses, total_timesteps, perturb_factor=0.2, seed=None):
+    """
+    Create the population members, each with its own engines and an initial perturbation.
+
+    :param hyperparameters: Validated hyperparameters.
+    :param total_timesteps: Timesteps each member trains for.
+    :return: List of PopulationMember.
+    """
+    rng = random.Random(seed)
+    def configured(key):
+        return float(hyperparameters.get(key) or DEFAULT_HYPERPARAMETERS[key])
+
+    base = {
+        "learning_rate": configured("learning_rate_start"),
+        "ent_coef": configured("ent_coef"),
+        "clip_range": configured("clip_range_start"),
+    }
+    schedules = {
+        "learning_rate": (base["learning_rate"], configured("learning_rate_end")),
+        "clip_range": (base["clip_range"], configured("clip_range_end")),
+    }
+
+    members = []
+    for index, addresses in enumerate(split_env_addresses(env_addresses, population)):
+        env, _ = make_member_env(backend, game_id, env_settings, wrapper_settings, addresses)
+        member_kwargs = dict(agent_kwargs)
+        if member_kwargs.get("seed") is not None:
+            member_kwargs["seed"] = member_kwargs["seed"] + index
+        agent = agent_class(backend)("MultiInputPolicy", env, **member_kwargs)
+        # The first member keeps the configured values as the population's anchor
+        start = base if index == 0 else perturb(base, perturb_factor, rng)
+        members.append(PopulationMember(index, agent, schedules, base, start, total_timesteps))
+        print(f"PBT member {index}: {len(addresses)} env(s), {start}")
+    return members
+
+
+def load_pbt_report(run_id=None, output_dir=PBT_DIR):
+    """Return a PBT run's report (the latest one by default), or None."""
+    return load_run_report(output_dir, run_id)
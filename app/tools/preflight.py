@@ -0,0 +1,109 @@
+# path: .app/tools/preflight.py
+
+import json
+import os
+from app import DEFAULT_PATHS
+from app.tools.utils import load_run_report
+
+PREFLIGHT_DIR = os.path.join(DEFAULT_PATHS["log_dir"], "preflight")
+
+# Hyperparameters PPO stores under the same attribute name it is constructed with
+SCALAR_HYPERPARAMETERS = (
+    "n_steps", "batch_size", "n_epochs", "gamma", "gae_lambda", "ent_coef", "vf_coef", "max_grad_norm",
+    "target_kl", "normalize_advantage", "use_sde", "sde_sample_freq", "seed",
+)
+
+
+def describe_schedule(schedule):
+    """
+    Summarize a constant or progress-based schedule by its start and end values.
+
+    :param schedule: Float, callable of `progress_remaining`, or None.
+    """
+    if schedule is None:
+        return None
+    if callable(schedule):
+        return {"start": float(schedule(1.0)), "end": float(schedule(0.0))}
+    return float(schedule)
+
+
+def effective_hyperparameters(agent):
+    """
+    Read the hyperparameters an agent is actually using after construction.
+
+    :param agent: PPO instance.
+    :return: JSON-serializable dictionary.
+    """
+    effective = {key: getattr(agent, key, None) for key in SCALAR_HYPERPARAMETERS}
+    effective["stats_window_size"] = agent._stats_window_size
+    effective["learning_rate"] = describe_schedule(agent.lr_schedule)
+    effective["clip_range"] = describe_schedule(agent.clip_range)
+    effective["clip_range_vf"] = describe_schedule(agent.clip_range_vf)
+    effective["device"] = str(agent.device)
+    effective["policy_kwargs"] = {
+        key: value if isinstance(value, (int, float, str, bool, list, dict, type(None))) else repr(value)
+        for key, value in agent.policy_kwargs.items()
+    }
+    effective["net_arch"] = agent.policy.net_arch
+    effective["num_envs"] = agent.n_envs
+    effective["rollout_size"] = agent.n_steps * agent.n_envs
+    effective["minibatches_per_epoch"] = agent.n_steps * agent.n_envs // agent.batch_size
+    effective["trainable_parameters"] = sum(p.numel() for p in agent.policy.parameters() if p.requires_grad)
+    return effective
+
+
+def build_preflight_report(requested, agent):
+    """
+    Compare the requested PPO arguments with the agent's effective values.
+
+    :param requested: Keyword arguments the agent was built or loaded with.
+    :param agent: The resulting PPO instance.
+    :return: Report with `requested`, `effective`, `mismatches` and `warnings`.
+    """
+    effective = effective_hyperparameters(agent)
+    requested_view = {
+        key: describe_schedule(value) if key in ("learning_rate", "clip_range", "clip_range_vf") else value
+        for key, value in requested.items()
+        if key not in ("tensorboard_log", "verbose")
+    }
+
+    mismatches = {}
+    for key, value in requested_view.items():
+        if key in ("policy_kwargs", "device"):
+            continue
+        if key in effective and effective[key] != value:
+            mismatches[key] = {"requested": value, "effective": effective[key]}
+
+    warnings = []
+    rollout_size = effective["rollout_size"]
+    if rollout_size % agent.batch_size:
+        warnings.append(
+            f"Rollout size {rollout_size} (n_steps * num_envs) is not a multiple of batch_size {agent.batch_size}; "
+            f"the last {rollout_size % agent.batch_size} samples form a truncated mini-batch every epoch."
+        )
+    if agent.batch_size > rollout_size:
+        warnings.append(f"batch_size {agent.batch_size} exceeds the rollout size {rollout_size}.")
+
+    return {"requested": requested_view, "effective": effective, "mismatches": mismatches, "warnings": warnings}
+
+
+def write_preflight_report(run_id, report, output_dir=PREFLIGHT_DIR):
+    """
+    Save a pre-flight report as `<run_id>.json`.
+
+    :return: Path of the written file.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f"{run_id}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4, default=str)
+    return path
+
+
+def load_preflight_report(run_id=None, output_dir=PREFLIGHT_DIR):
+    """
+    Load the pre-flight report of a run, or the most recent one.
+
+    :return: Report dictionary, or None if it does not exist.
+    """
+    return load_run_report(output_dir, run_id)
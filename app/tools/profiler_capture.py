@@ -0,0 +1,143 @@
+# path: .app/tools/profiler_capture.py
+
+from stable_baselines3.common.callbacks import BaseCallback
+from datetime import datetime
+import torch as th
+import json
+import os
+from app import DEFAULT_PATHS
+from app.tools.checkpoint_store import atomic_write
+
+PROFILE_REQUEST = os.path.join(DEFAULT_PATHS["control_dir"], "profile.json")
+PROFILE_STATUS = os.path.join(DEFAULT_PATHS["control_dir"], "profile_status.json")
+# Inside the TensorBoard log dir so the profiler plugin picks the traces up
+PROFILER_DIR = os.path.join(DEFAULT_PATHS["tensorboard_log_dir"], "profiler")
+
+
+def _write_json(path, payload):
+    atomic_write(path, lambda f: f.write(json.dumps(payload, indent=4).encode("utf-8")))
+
+
+def request_profile(updates):
+    """
+    Ask the running training process to profile its next `updates` PPO updates.
+
+    The request is a control file picked up at the next rollout start; signals are not used
+    because SIGTERM and SIGINT mean shutdown to the training script.
+
+    :raises ValueError: If `updates` is not a positive integer.
+    """
+    updates = int(updates)
+    if updates < 1:
+        raise ValueError("The number of updates to profile must be at least 1.")
+    request = {"updates": updates, "requested": datetime.now().isoformat()}
+    _write_json(PROFILE_REQUEST, request)
+    return request
+
+
+def load_profile_status():
+    """Return the pending request and the state of the last capture."""
+    status = {"pending": None, "last_capture": None}
+    for key, path in (("pending", PROFILE_REQUEST), ("last_capture", PROFILE_STATUS)):
+        if os.path.isfile(path):
+            with open(path, encoding="utf-8") as f:
+                status[key] = json.load(f)
+    return status
+
+
+class ProfilerCaptureCallback(BaseCallback):
+    """
+    Captures a torch.profiler trace of the next K updates when a profile request appears.
+
+    The control file is checked once per rollout, so an idle request costs one `stat` per
+    update. Traces are written with `tensorboard_trace_handler` to
+    `logs/tensorboard/profiler/<run_id>`, one profiler step per update.
+    """
+
+    def __init__(self, run_id, trace_dir=PROFILER_DIR, verbose=1):
+        super(ProfilerCaptureCallback, self).__init__(verbose)
+        self.run_id = run_id
+        self.trace_dir = os.path.join(trace_dir, run_id)
+        self.profiler = None
+        self.status = None
+
+    def _read_request(self):
+        if not os.path.isfile(PROFILE_REQUEST):
+            return None
+        try:
+            with open(PROFILE_REQUEST, encoding="utf-8") as f:
+                request = json.load(f)
+            return max(int(request["updates"]), 1)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Ignoring malformed profile request: {e}")
+            return None
+        finally:
+            try:
+                os.remove(PROFILE_REQUEST)
+            except OSError:
+                pass
+
+    def _start(self, updates):
+        activities = [th.profiler.ProfilerActivity.CPU]
+        if th.cuda.is_available():
+            activities.append(th.profiler.ProfilerActivity.CUDA)
+        self.profiler = th.profiler.profile(
+            activities=activities,
+            on_trace_ready=th.profiler.tensorboard_trace_handler(self.trace_dir, worker_name=self.run_id),
+        )
+        self.profiler.start()
+        self.status = {
+            "state": "capturing",
+            "run_id": self.run_id,
+            "updates": updates,
+            "captured": 0,
+            "start_timesteps": self.num_timesteps,
+            "started": datetime.now().isoformat(),
+            "trace_dir": self.trace_dir,
+        }
+        _write_json(PROFILE_STATUS, self.status)
+        if self.verbose > 0:
+            print(f"Profiling the next {updates} update(s) into {self.trace_dir}.")
+
+    def _stop(self):
+        try:
+            self.profiler.stop()
+            self.status["state"] = "done"
+        except Exception as e:
+            self.status["state"] = "failed"
+            self.status["error"] = str(e)
+        self.profiler = None
+        self.status["end_timesteps"] = self.num_timesteps
+        self.status["finished"] = datetime.now().isoformat()
+        _write_json(PROFILE_STATUS, self.status)
+        if self.verbose > 0:
+            print(f"Profiler capture {self.status['state']}: {self.status['captured']} update(s) in {self.trace_dir}.")
+
+    def _on_training_start(self):
+        # A request left behind by a run that died mid-capture is not meant for this one
+        if os.path.isfile(PROFILE_REQUEST):
+            os.remove(PROFILE_REQUEST)
+
+    def _on_rollout_start(self):
+        if self.profiler is not None:
+            self.profiler.step()
+            self.status["captured"] += 1
+            if self.status["captured"] >= self.status["updates"]:
+                self._stop()
+            return
+
+        updates = self._read_request()
+        if updates:
+            try:
+                self._start(updates)
+            except Exception as e:
+                self.profiler = None
+                print(f"Failed to start the profiler: {e}")
+
+    def _on_step(self) -> bool:
+        return True
+
+    def _on_training_end(self):
+        # Keep whatever was captured if training ends mid-capture
+        if self.profiler is not None:
+            self._stop()
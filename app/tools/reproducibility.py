@@ -0,0 +1,109 @@
+# path: .app/tools/reproducibility.py
+
+from stable_baselines3.common.vec_env import VecEnvWrapper
+from datetime import datetime
+import numpy as np
+import torch as th
+import hashlib
+import random
+import json
+import os
+from app import DEFAULT_PATHS
+from app.tools.utils import load_run_report
+
+RUN_SPEC_DIR = os.path.join(DEFAULT_PATHS["log_dir"], "run_specs")
+
+# The engine takes the seed as a 32-bit signed integer
+MAX_SEED = 2 ** 31 - 1
+
+
+def derive_seeds(run_seed, num_envs):
+    """
+    Derive one independent seed per env from the run seed.
+
+    Uses NumPy's SeedSequence, so env `i` always gets the same seed for the same run seed
+    and the streams don't overlap the way `seed + rank` streams of neighbouring runs do.
+
+    :return: List of `num_envs` integer seeds.
+    """
+    children = np.random.SeedSequence(int(run_seed)).spawn(num_envs)
+    return [int(child.generate_state(1)[0] % MAX_SEED) for child in children]
+
+
+def set_reset_seeds(env, seeds):
+    """
+    Seed each env's next reset with its own derived seed.
+
+    SB3's `set_random_seed` calls `env.seed(seed)` when the agent is built or loaded, which
+    queues `seed + rank` for the first reset. This replaces the queue of the innermost vec env,
+    the one that performs the resets, so the gym-side RNGs get the seeds of the run spec.
+
+    :param env: Vec env, possibly wrapped (e.g. by VecTransposeImage).
+    :param seeds: One seed (or None) per env.
+    """
+    while isinstance(env, VecEnvWrapper):
+        env = env.venv
+    if len(seeds) != env.num_envs:
+        raise ValueError(f"Got {len(seeds)} seed(s) for {env.num_envs} env(s).")
+    env._seeds = list(seeds)
+
+
+def seed_everything(seed):
+    """Seed Python, NumPy and torch, and switch torch to deterministic kernels where available."""
+    random.seed(seed)
+    np.random.seed(seed)
+    th.manual_seed(seed)
+    # Required by deterministic cuBLAS; must be set before the first CUDA matmul
+    os.environ.setdefault("CUBLAS_WORKSPACE_CONFIG", ":4096:8")
+    th.backends.cudnn.deterministic = True
+    th.backends.cudnn.benchmark = False
+    th.use_deterministic_algorithms(True, warn_only=True)
+
+
+def _jsonable(value):
+    if isinstance(value, dict):
+        return {str(key): _jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if callable(value):
+        return getattr(value, "__name__", repr(value))
+    return str(value)
+
+
+def build_run_spec(run_id, run_seed, env_seeds, config, backend):
+    """
+    Describe a reproducible run: seeds, backend and the configuration they apply to.
+
+    `config_hash` covers everything but the run id, so two runs with equal hashes are
+    expected to produce identical rollouts.
+
+    :param config: The active `config` (training_config, hyperparameters, env and wrapper settings).
+    """
+    settings = _jsonable({key: value for key, value in config.items() if key != "enabled_callbacks"})
+    settings.get("training_config", {}).pop("run_id", None)
+    return {
+        "run_id": run_id,
+        "created": datetime.now().isoformat(),
+        "run_seed": int(run_seed),
+        "env_seeds": env_seeds,
+        "vec_env_backend": backend,
+        "torch_version": th.__version__,
+        "deterministic_algorithms": th.are_deterministic_algorithms_enabled(),
+        "config_hash": hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest(),
+        "config": settings,
+    }
+
+
+def write_run_spec(spec, output_dir=RUN_SPEC_DIR):
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f"{spec['run_id']}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(spec, f, indent=4)
+    return path
+
+
+def load_run_spec(run_id=None, output_dir=RUN_SPEC_DIR):
+    """Return a run's spec (the latest one by default), or None."""
+    return load_run_report(output_dir, run_id)
@@ -0,0 +1,296 @@
+# path: .app/tools/rollout_memory.py
+
+from stable_baselines3.common.buffers import DictRolloutBuffer
+from stable_baselines3.common.preprocessing import get_action_dim, get_obs_shape
+from gymnasium import spaces
+import numpy as np
+from app.tools.game_info import game_info
+from app.tools.utils import parse_bool
+
+GIB = 1024 ** 3
+
+# actions are counted separately; these hold one float32 per step and env
+SCALAR_BUFFERS = ("rewards", "returns", "episode_starts", "values", "log_probs", "advantages")
+
+
+def storage_dtype(space, compact=True):
+    """
+    Dtype a rollout buffer needs to hold observations from `space` losslessly.
+
+    SB3 stores every key as float32. The compact layout keeps uint8 frames and small
+    discrete/binary values as uint8; the policy converts them to float on the device.
+
+    :param space: Observation sub-space.
+    :param compact: Use the compact layout instead of SB3's float32.
+    """
+    if not compact:
+        return np.float32
+    if isinstance(space, spaces.Box) and space.dtype == np.uint8:
+        return np.uint8
+    if isinstance(space, spaces.Discrete) and space.start + space.n <= 256:
+        return np.uint8
+    if isinstance(space, spaces.MultiBinary):
+        return np.uint8
+    if isinstance(space, spaces.MultiDiscrete) and int(np.max(space.nvec)) <= 256:
+        return np.uint8
+    return np.float32
+
+
+class Uint8DictRolloutBuffer(DictRolloutBuffer):
+    """
+    DictRolloutBuffer that stores observations in their compact dtype (see `storage_dtype`).
+
+    Mini-batches reach the policy as uint8 tensors, so the float conversion (and the /255
+    for image keys) runs once per mini-batch on the learner device.
+    """
+
+    def reset(self):
+        super().reset()
+        # The float32 arrays allocated by the parent are never written, so they don't occupy memory
+        for key, space in self.observation_space.spaces.items():
+            dtype = storage_dtype(space)
+            if dtype != np.float32:
+                self.observations[key] = np.zeros((self.buffer_size, self.n_envs, *self.obs_shape[key]), dtype=dtype)
+
+
+def use_uint8_rollout_buffer(agent):
+    """
+    Replace a PPO agent's rollout buffer with a `Uint8DictRolloutBuffer` of the same size.
+    """
+    agent.rollout_buffer = Uint8DictRolloutBuffer(
+        agent.n_steps,
+        agent.observation_space,
+        agent.action_space,
+        device=agent.device,
+        gamma=agent.gamma,
+        gae_lambda=agent.gae_lambda,
+        n_envs=agent.n_envs,
+    )
+
+
+def rollout_buffer_bytes(observation_space, action_space, n_steps, num_envs, compact=False):
+    """
+    Compute the memory a Dict rollout buffer needs.
+
+    :param observation_space: Dict observation space as seen by the agent.
+    :param action_space: Action space.
+    :param n_steps: Rollout length per env.
+    :param num_envs: Number of envs.
+    :param compact: Size the `Uint8DictRolloutBuffer` layout instead of SB3's float32 one.
+    :return: Dictionary of byte counts: per observation key, totals and the peak while
+        `get()` flattens the buffer (one key is copied at a time).
+    """
+    transitions = n_steps * num_envs
+    observations = {
+        key: int(transitions * np.prod(get_obs_shape(space)) * np.dtype(storage_dtype(space, compact)).itemsize)
+        for key, space in observation_space.spaces.items()
+    }
+    actions = transitions * get_action_dim(action_space) * 4
+    scalars = transitions * len(SCALAR_BUFFERS) * 4
+    total = sum(observations.values()) + actions + scalars
+    return {
+        "observations": observations,
+        "observations_total": sum(observations.values()),
+        "actions_and_scalars": actions + scalars,
+        "total": total,
+        "peak": total + max(observations.values(), default=0),
+    }
+
+
+def memory_report(observation_space, action_space, n_steps, num_envs):
+    """
+    Compare SB3's float32 rollout buffer with the compact uint8 layout.
+
+    :return: Dictionary with `float32` and `uint8` byte counts plus the saving.
+    """
+    before = rollout_buffer_bytes(observation_space, action_space, n_steps, num_envs, compact=False)
+    after = rollout_buffer_bytes(observation_space, action_space, n_steps, num_envs, compact=True)
+    return {
+        "n_steps": n_steps,
+        "num_envs": num_envs,
+        "float32": before,
+        "uint8": after,
+        "saved_bytes": before["total"] - after["total"],
+        "ratio": round(before["total"] / after["total"], 2) if after["total"] else None,
+    }
+
+
+def format_bytes(size):
+    """Human-readable byte count."""
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TiB"
+
+
+def _parse_frame_shape(frame_shape):
+    if isinstance(frame_shape, str):
+        frame_shape = [part for part in frame_shape.replace(" ", "").split(",") if part]
+    return tuple(int(value) for value in (frame_shape or (0, 0, 0)))
+
+
+def _ram_key_elements(game_id, key, one_hot):
+    """
+    Number of buffer elements for a RAM-state key, using the game's observation metadata.
+
+    :return: Tuple of (elements, compact dtype).
+    """
+    observation_space = game_info.get(game_id, {}).get("observation_space", {})
+    name = key.split("_", 1)[1] if key.startswith(("own_", "opp_")) else key.split(".", 1)[-1]
+    spec = observation_space.get("global", {}).get(name) or observation_space.get("player_specific", {}).get(name)
+    if spec is None:
+        return 1, np.float32
+    if spec["type"] == "Discrete (Binary)":
+        return 1, np.uint8
+    if spec["type"] == "Discrete":
+        low, high = spec["value_range"]
+        return (high - low + 1 if one_hot else 1), np.uint8
+    return 1, np.float32
+
+
+def estimate_observation_layout(game_id, env_settings, wrapper_settings):
+    """
+    Estimate the per-transition observation layout from the settings alone, without an env.
+
+    Mirrors DIAMBRA's wrappers: the frame is frame_shape (native resolution for zero
+    dimensions) times stack_frames, discrete RAM keys become one-hot vectors when scaling
+    with `process_discrete_binary`, and the last actions are stacked `stack_actions` times.
+
+    :return: Dictionary of key -> (elements per transition, compact dtype).
+    """
+    info = game_info.get(game_id, {})
+    native_height, native_width, _ = info.get("resolution", (0, 0, 3))
+    height, width, channels = _parse_frame_shape(env_settings.get("frame_shape"))
+    scale = parse_bool(wrapper_settings.get("scale"))
+    one_hot = scale and parse_bool(wrapper_settings.get("process_discrete_binary"))
+    stack_frames = int(wrapper_settings.get("stack_frames") or 1)
+
+    filter_keys = wrapper_settings.get("filter_keys") or []
+    if isinstance(filter_keys, str):
+        filter_keys = [key.strip() for key in filter_keys.split(",") if key.strip()]
+
+    layout = {}
+    for key in filter_keys:
+        if key == "frame":
+            frame_elements = (height or native_height) * (width or native_width) * (channels if channels == 1 else 3)
+            frame_dtype = np.uint8 if not scale or parse_bool(wrapper_settings.get("exclude_image_scaling")) else np.float32
+            layout[key] = (frame_elements * stack_frames, frame_dtype)
+        elif key == "action":
+            if not parse_bool(wrapper_settings.get("add_last_action")):
+                continue
+            moves, attacks = len(info.get("moves", [])), len(info.get("attacks", []))
+            discrete = str(env_settings.get("action_space", "")).lower() == "discrete"
+            if one_hot:
+                elements = moves + attacks - 1 if discrete else moves + attacks
+            else:
+                elements = 1 if discrete else 2
+            layout[key] = (elements * int(wrapper_settings.get("stack_actions") or 1), np.uint8)
+        else:
+            layout[key] = _ram_key_elements(game_id, key, one_hot)
+    return layout
+
+
+def estimate_rollout_bytes(layout, n_steps, num_envs, action_dim=2, compact=False):
+    """
+    Rollout buffer footprint for an estimated layout; same fields as `rollout_buffer_bytes`.
+    """
+    transitions = n_steps * num_envs
+    observations = {
+        key: transitions * elements * (np.dtype(dtype).itemsize if compact else 4)
+        for key, (elements, dtype) in layout.items()
+    }
+    other = transitions * (action_dim + len(SCALAR_BUFFERS)) * 4
+    total = sum(observations.values()) + other
+    return {
+        "observations": observations,
+        "observations_total": sum(observations.values()),
+        "actions_and_scalars": other,
+        "total": total,
+        "peak": total + max(observations.values(), default=0),
+    }
+
+
+def suggest_rollout_sizes(layout, n_steps, num_envs, batch_size, budget_bytes, action_dim=2, compact=False):
+    """
+    Propose n_steps / num_envs combinations whose peak footprint fits the budget.
+
+    Tries the largest power-of-two n_steps (not above the requested one) for each env count
+    from the requested one down, keeping at least one full mini-batch per rollout.
+
+    :return: Up to five suggestions, largest rollouts first.
+    """
+    suggestions = []
+    for envs in range(num_envs, 0, -1):
+        steps = 1 << (max(n_steps, 1).bit_length() - 1) if n_steps & (n_steps - 1) else n_steps
+        while steps >= 2:
+            footprint = estimate_rollout_bytes(layout, steps, envs, action_dim, compact)
+            if footprint["peak"] <= budget_bytes and steps * envs >= batch_size:
+                suggestions.append({"n_steps": steps, "num_envs": envs, "peak_bytes": footprint["peak"]})
+                break
+            steps //= 2
+    suggestions.sort(key=lambda suggestion: suggestion["n_steps"] * suggestion["num_envs"], reverse=True)
+    return suggestions[:5]
+
+
+def advise_rollout_memory(config, budget_gb=None):
+    """
+    Check a training configuration's rollout buffer footprint against a memory budget.
+
+    :param config: Full configuration with `training_config`, `hyperparameters`,
+        `env_settings` and `wrapper_settings` sections.
+    :param budget_gb: Budget in GiB; defaults to `training_config.rollout_memory_budget_gb`.
+        0 disables the check.
+    :return: Advice dictionary with the estimate, `within_budget` and suggestions.
+    """
+    training_config = config.get("training_config", {})
+    hyperparameters = config.get("hyperparameters", {})
+    env_settings = config.get("env_settings", {})
+    wrapper_settings = config.get("wrapper_settings", {})
+
+    game_id = training_config.get("game_id") or env_settings.get("game_id", "")
+    n_steps = int(hyperparameters.get("n_steps") or 2048)
+    num_envs = int(training_config.get("num_envs") or 1)
+    batch_size = int(hyperparameters.get("batch_size") or 64)
+    compact = parse_bool(training_config.get("uint8_fast_path"))
+    if budget_gb is None:
+        budget_gb = training_config.get("rollout_memory_budget_gb")
+    budget_gb = float(budget_gb or 0)
+
+    layout = estimate_observation_layout(game_id, env_settings, wrapper_settings)
+    action_dim = 1 if str(env_settings.get("action_space", "")).lower() == "discrete" else 2
+    estimate = estimate_rollout_bytes(layout, n_steps, num_envs, action_dim, compact)
+    advice = {
+        "n_steps": n_steps,
+        "num_envs": num_envs,
+        "layout": "uint8" if compact else "float32",
+        "estimate": estimate,
+        "budget_bytes": int(budget_gb * GIB) if budget_gb else None,
+        "within_budget": not budget_gb or estimate["peak"] <= budget_gb * GIB,
+        "suggestions": [],
+    }
+    if not advice["within_budget"]:
+        advice["suggestions"] = suggest_rollout_sizes(
+            layout, n_steps, num_envs, batch_size, budget_gb * GIB, action_dim, compact
+        )
+        if not compact:
+            uint8_estimate = estimate_rollout_bytes(layout, n_steps, num_envs, action_dim, compact=True)
+            advice["uint8_fast_path_peak_bytes"] = uint8_estimate["peak"]
+    return advice
+
+
+def describe_advice(advice):
+    """One-line summary of `advise_rollout_memory` output for logs and error messages."""
+    message = (
+        f"Rollout buffer needs about {format_bytes(advice['estimate']['peak'])} at peak "
+        f"({advice['n_steps']} steps x {advice['num_envs']} envs, {advice['layout']} storage)"
+    )
+    if advice["within_budget"]:
+        return message + "."
+    message += f", over the {format_bytes(advice['budget_bytes'])} budget."
+    if advice["suggestions"]:
+        options = ", ".join(f"n_steps={s['n_steps']} x num_envs={s['num_envs']}" for s in advice["suggestions"])
+        message += f" Combinations that fit: {options}."
+    if "uint8_fast_path_peak_bytes" in advice:
+        message += f" uint8_fast_path would bring it to {format_bytes(advice['uint8_fast_path_peak_bytes'])}."
+    return message
@@ -0,0 +1,415 @@
+# path: .app/tools/rollout_workers.py
+
+from stable_baselines3 import PPO
+from stable_baselines3.common.base_class import BaseAlgorithm
+from stable_baselines3.common.vec_env import VecEnv
+from stable_baselines3.common.utils import obs_as_tensor
+from gymnasium import spaces
+import multiprocessing as mp
+import torch as th
+import numpy as np
+import traceback
+import cloudpickle
+import pickle
+import time
+import zlib
+import os
+from app.tools.reproducibility import set_reset_seeds
+
+# The only info keys callbacks read from a rollout, so the rest never leaves the worker
+INFO_KEYS = ("episode", "is_success", "TimeLimit.truncated", "character_pair", "difficulty")
+# zlib level for trajectories: level 1 already shrinks frames several times at a fraction of the cost
+COMPRESSION_LEVEL = 1
+
+
+def split_bounds(num_envs, workers):
+    """Divide `num_envs` envs into one contiguous `(start, end)` range per worker."""
+    size, extra = divmod(num_envs, workers)
+    bounds, start = [], 0
+    for index in range(workers):
+        end = start + size + (1 if index < extra else 0)
+        bounds.append((start, end))
+        start = end
+    return bounds
+
+
+def _stack(observations):
+    if isinstance(observations[0], dict):
+        return {key: np.stack([obs[key] for obs in observations]) for key in observations[0]}
+    return np.stack(observations)
+
+
+class RolloutWorker:
+    """
+    The worker side: a vec env over the worker's engines and a CPU copy of the policy.
+
+    Keeps its own last observation between rollouts, so only whole trajectories travel to
+    the learner.
+    """
+
+    def __init__(self, env):
+        self.env = env
+        self.policy = None
+        self.last_obs = None
+        self.episode_starts = np.ones(env.num_envs, dtype=bool)
+
+    def build_policy(self, payload):
+        policy_class, params = cloudpickle.loads(payload)
+        self.policy = policy_class(**params)
+        self.policy.set_training_mode(False)
+
+    def reset(self, seeds=None, options=None):
+        if seeds and any(seed is not None for seed in seeds):
+            set_reset_seeds(self.env, seeds)
+        if options:
+            self.env.set_options(options)
+        self.last_obs = self.env.reset()
+        self.episode_starts = np.ones(self.env.num_envs, dtype=bool)
+        return self.last_obs
+
+    def collect(self, n_steps, gamma, weights):
+        """
+        Step the envs for `n_steps` with the given weights.
+
+        :return: The zlib-compressed, pickled trajectory.
+        """
+        start = time.perf_counter()
+        self.policy.load_state_dict({key: th.from_numpy(value) for key, value in weights.items()})
+        if self.last_obs is None:
+            self.reset()
+
+        observations, actions, rewards, bootstrap, episode_starts, dones = [], [], [], [], [], []
+        values, log_probs, infos = [], [], []
+        env_seconds = 0.0
+        for _ in range(n_steps):
+            with th.no_grad():
+                step_actions, step_values, step_log_probs = self.policy(obs_as_tensor(self.last_obs, self.policy.device))
+            step_actions = step_actions.cpu().numpy()
+            clipped_actions = step_actions
+            if isinstance(self.env.action_space, spaces.Box):
+                clipped_actions = np.clip(step_actions, self.env.action_space.low, self.env.action_space.high)
+
+            env_start = time.perf_counter()
+            new_obs, step_rewards, step_dones, step_infos = self.env.step(clipped_actions)
+            env_seconds += time.perf_counter() - env_start
+
+            # Bootstrap truncated episodes with the value function, as SB3 does
+            step_bootstrap = np.zeros(self.env.num_envs, dtype=np.float32)
+            for idx, done in enumerate(step_dones):
+                if (
+                    done
+                    and step_infos[idx].get("terminal_observation") is not None
+                    and step_infos[idx].get("TimeLimit.truncated", False)
+                ):
+                    terminal_obs = self.policy.obs_to_tensor(step_infos[idx]["terminal_observation"])[0]
+                    with th.no_grad():
+                        step_bootstrap[idx] = gamma * self.policy.predict_values(terminal_obs)[0].item()
+
+            observations.append(self.last_obs)
+            actions.append(step_actions)
+            rewards.append(step_rewards)
+            bootstrap.append(step_bootstrap)
+            episode_starts.append(self.episode_starts)
+            dones.append(step_dones)
+            values.append(step_values.cpu().numpy().flatten())
+            log_probs.append(step_log_probs.cpu().numpy())
+            infos.append([{key: info[key] for key in INFO_KEYS if key in info} for info in step_infos])
+            self.last_obs = new_obs
+            self.episode_starts = step_dones
+
+        with th.no_grad():
+            last_values = self.policy.predict_values(obs_as_tensor(self.last_obs, self.policy.device))
+
+        batch = {
+            "observations": _stack(observations),
+            "actions": np.stack(actions),
+            "rewards": np.stack(rewards).astype(np.float32),
+            "bootstrap": np.stack(bootstrap),
+            "episode_starts": np.stack(episode_starts),
+            "dones": np.stack(dones),
+            "values": np.stack(values),
+            "log_probs": np.stack(log_probs),
+            "infos": infos,
+            "last_values": last_values.cpu().numpy().flatten(),
+            "last_dones": self.episode_starts,
+            "env_seconds": env_seconds,
+        }
+        raw = pickle.dumps(batch, protocol=pickle.HIGHEST_PROTOCOL)
+        batch_bytes = zlib.compress(raw, COMPRESSION_LEVEL)
+        return batch_bytes, len(raw), time.perf_counter() - start
+
+
+def _worker_main(remote, parent_remote, addresses, payload):
+    parent_remote.close()
+    game_id, env_settings, wrapper_settings, seeds = cloudpickle.loads(payload)
+    # DIAMBRA's env factory reads the engine addresses from the environment
+    os.environ["DIAMBRA_ENVS"] = " ".join(addresses)
+    th.set_num_threads(1)
+    if seeds:
+        th.manual_seed(seeds[0])
+    # Imported here because vec_env_backends imports this module
+    from app.tools.vec_env_backends import make_vec_env
+
+    env, _ = make_vec_env("dummy", game_id, env_settings, wrapper_settings, seeds=seeds)
+    # Same image transposition the learner applies, so the policy copy sees what the learner sees
+    env = BaseAlgorithm._wrap_env(env, monitor_wrapper=False)
+    worker = RolloutWorker(env)
+    handlers = {
+        "spaces": lambda _: (env.observation_space, env.action_space),
+        "policy": worker.build_policy,
+        "collect": lambda data: worker.collect(*data),
+        "reset": lambda data: worker.reset(*data),
+        "step": env.step,
+        "get_attr": lambda data: env.get_attr(*data),
+        "set_attr": lambda data: env.set_attr(*data),
+        "env_method": lambda data: env.env_method(data[0], *data[1], indices=data[3], **data[2]),
+        "env_is_wrapped": lambda data: env.env_is_wrapped(*data),
+    }
+    try:
+        while True:
+            command, data = remote.recv()
+            if command == "close":
+                break
+            try:
+                remote.send((True, handlers[command](data)))
+            except Exception as e:
+                traceback.print_exc()
+                try:
+                    remote.send((False, e))
+                except Exception:
+                    remote.send((False, RuntimeError(repr(e))))
+    except (KeyboardInterrupt, EOFError):
+        pass
+    finally:
+        env.close()
+        remote.close()
+
+
+class RolloutWorkerVecEnv(VecEnv):
+    """
+    Vec env whose envs live in rollout worker processes, each owning a subset of the engines.
+
+    Besides the regular step API, `collect` has every worker gather a whole rollout with its
+    own copy of the policy, so env stepping and action inference run in parallel across
+    processes instead of in the learner's GIL-bound loop. Trajectories come back over a pipe
+    as compressed pickles; the learner sends its current weights with every request.
+    """
+
+    def __init__(self, game_id, env_settings, wrapper_settings, addresses, workers=2, seeds=None):
+        """
+        :param addresses: Engine addresses, split contiguously between the workers.
+        :param workers: Number of worker processes, capped at one per address.
+        :param seeds: Optional per-env seeds, one per address.
+        """
+        if not addresses:
+            raise ValueError("Rollout workers need at least one env address in DIAMBRA_ENVS.")
+        if seeds is not None and len(seeds) != len(addresses):
+            raise ValueError(f"Got {len(seeds)} seed(s) for {len(addresses)} env(s).")
+        self.bounds = split_bounds(len(addresses), min(int(workers), len(addresses)))
+        self.remotes, self.processes = [], []
+        self.policy_sent = False
+        self.waiting = False
+        self.closed = False
+
+        start_methods = mp.get_all_start_methods()
+        context = mp.get_context("forkserver" if "forkserver" in start_methods else "spawn")
+        for start, end in self.bounds:
+            remote, work_remote = context.Pipe()
+            payload = cloudpickle.dumps((game_id, env_settings, wrapper_settings, seeds[start:end] if seeds else None))
+            process = context.Process(
+                target=_worker_main, args=(work_remote, remote, addresses[start:end], payload), daemon=True
+            )
+            process.start()
+            work_remote.close()
+            self.remotes.append(remote)
+            self.processes.append(process)
+
+        observation_space, action_space = self._request(0, "spaces")
+        super(RolloutWorkerVecEnv, self).__init__(len(addresses), observation_space, action_space)
+
+    @property
+    def workers(self):
+        return len(self.remotes)
+
+    def _receive(self, worker):
+        ok, result = self.remotes[worker].recv()
+        if not ok:
+            raise result
+        return result
+
+    def _request(self, worker, command, data=None):
+        self.remotes[worker].send((command, data))
+        return self._receive(worker)
+
+    def _broadcast(self, command, data_for_worker):
+        for worker, remote in enumerate(self.remotes):
+            remote.send((command, data_for_worker(worker)))
+        return [self._receive(worker) for worker in range(self.workers)]
+
+    def _merge(self, parts, axis=0):
+        if isinstance(parts[0], dict):
+            return {key: np.concatenate([part[key] for part in parts], axis=axis) for key in parts[0]}
+        return np.concatenate(parts, axis=axis)
+
+    def _targets(self, indices):
+        """Map global env indices to `{worker: [local indices]}`, keeping their order."""
+        if indices is None:
+            indices = range(self.bounds[-1][1])
+        elif isinstance(indices, int):
+            indices = [indices]
+        targets = {}
+        for index in indices:
+            worker = next(worker for worker, (start, end) in enumerate(self.bounds) if start <= index < end)
+            targets.setdefault(worker, []).append(index - self.bounds[worker][0])
+        return targets
+
+    def _per_env(self, command, indices, data):
+        results = []
+        for worker, local_indices in self._targets(indices).items():
+            results.extend(self._request(worker, command, data(local_indices)))
+        return results
+
+    def reset(self):
+        parts = self._broadcast("reset", lambda worker: (
+            self._seeds[self.bounds[worker][0]:self.bounds[worker][1]],
+            self._options[self.bounds[worker][0]:self.bounds[worker][1]],
+        ))
+        self._reset_seeds()
+        self._reset_options()
+        return self._merge(parts)
+
+    def step_async(self, actions):
+        for worker, (start, end) in enumerate(self.bounds):
+            self.remotes[worker].send(("step", actions[start:end]))
+        self.waiting = True
+
+    def step_wait(self):
+        results = [self._receive(worker) for worker in range(self.workers)]
+        self.waiting = False
+        obs, rewards, dones, infos = zip(*results)
+        return self._merge(obs), np.concatenate(rewards), np.concatenate(dones), sum(infos, [])
+
+    def collect(self, policy, n_steps, gamma):
+        """
+        Have every worker collect `n_steps` with the policy's current weights.
+
+        :return: Tuple of (trajectory, stats). Trajectory arrays are shaped `(n_steps, num_envs, ...)`
+            and `infos` is a list of per-step info lists, as the learner would have seen them.
+        """
+        start = time.perf_counter()
+        if not self.policy_sent:
+            payload = cloudpickle.dumps((type(policy), policy._get_constructor_parameters()))
+            self._broadcast("policy", lambda worker: payload)
+            self.policy_sent = True
+        weights = {key: value.detach().cpu().numpy() for key, value in policy.state_dict().items()}
+        replies = self._broadcast("collect", lambda worker: (n_steps, gamma, weights))
+
+        batches = [pickle.loads(zlib.decompress(batch_bytes)) for batch_bytes, _, _ in replies]
+        trajectory = {
+            key: self._merge([batch[key] for batch in batches], axis=1)
+            for key in ("observations", "actions", "rewards", "bootstrap", "episode_starts", "dones", "values", "log_probs")
+        }
+        trajectory["infos"] = [sum((batch["infos"][step] for batch in batches), []) for step in range(n_steps)]
+        trajectory["last_values"] = np.concatenate([batch["last_values"] for batch in batches])
+        trajectory["last_dones"] = np.concatenate([batch["last_dones"] for batch in batches])
+
+        elapsed = time.perf_counter() - start
+        compressed = sum(len(batch_bytes) for batch_bytes, _, _ in replies)
+        stats = {
+            "collect_seconds": elapsed,
+            "env_steps_per_sec": n_steps * self.num_envs / max(elapsed, 1e-9),
+            "worker_seconds_max": max(seconds for _, _, seconds in replies),
+            "worker_env_seconds_mean": float(np.mean([batch["env_seconds"] for batch in batches])),
+            "payload_mb": compressed / 2 ** 20,
+            "compression_ratio": sum(raw for _, raw, _ in replies) / max(compressed, 1),
+        }
+        return trajectory, stats
+
+    def close(self):
+        if self.closed:
+            return
+        if self.waiting:
+            for worker in range(self.workers):
+                self.remotes[worker].recv()
+        for remote in self.remotes:
+            try:
+                remote.send(("close", None))
+            except (BrokenPipeError, EOFError):
+                pass
+        for process in self.processes:
+            process.join(timeout=30)
+            if process.is_alive():
+                process.terminate()
+        self.closed = True
+
+    def get_attr(self, attr_name, indices=None):
+        return self._per_env("get_attr", indices, lambda local: (attr_name, local))
+
+    def set_attr(self, attr_name, value, indices=None):
+        self._per_env("set_attr", indices, lambda local: (attr_name, value, local))
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        return self._per_env("env_method", indices, lambda local: (method_name, method_args, method_kwargs, local))
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return self._per_env("env_is_wrapped", indices, lambda local: (wrapper_class, local))
+
+
+class DistributedPPO(PPO):
+    """
+    PPO whose rollouts are gathered by RolloutWorkerVecEnv workers.
+
+    The learner broadcasts its weights, every worker collects a rollout with its own policy
+    copy, and the merged trajectory is replayed step by step through the callbacks and into
+    the rollout buffer, so callbacks, `num_timesteps` and the episode info buffer behave as
+    with in-process collection. Rollouts stay on-policy: the workers act, and compute values
+    and log-probs, with the weights the next update starts from.
+    """
+
+    def collect_rollouts(self, env, callback, rollout_buffer, n_rollout_steps):
+        if not isinstance(env, RolloutWorkerVecEnv):
+            raise TypeError(f"DistributedPPO needs a RolloutWorkerVecEnv, got {type(env).__name__}.")
+        if self.use_sde:
+            raise ValueError("gSDE is not supported with rollout workers.")
+
+        self.policy.set_training_mode(False)
+        rollout_buffer.reset()
+        callback.on_rollout_start()
+
+        trajectory, stats = env.collect(self.policy, n_rollout_steps, self.gamma)
+        for key, value in stats.items():
+            self.logger.record(f"distributed/{key}", value)
+
+        observations = trajectory["observations"]
+        for step in range(n_rollout_steps):
+            rewards, dones, infos = trajectory["rewards"][step], trajectory["dones"][step], trajectory["infos"][step]
+            actions = trajectory["actions"][step]
+            self.num_timesteps += env.num_envs
+
+            callback.update_locals({"rewards": rewards, "dones": dones, "infos": infos, "actions": actions})
+            if callback.on_step() is False:
+                return False
+
+            self._update_info_buffer(infos, dones)
+            step_obs = (
+                {key: values[step] for key, values in observations.items()}
+                if isinstance(observations, dict) else observations[step]
+            )
+            rollout_buffer.add(
+                step_obs,
+                actions,
+                rewards + trajectory["bootstrap"][step],
+                trajectory["episode_starts"][step],
+                th.as_tensor(trajectory["values"][step]),
+                th.as_tensor(trajectory["log_probs"][step]),
+            )
+
+        self._last_episode_starts = trajectory["last_dones"]
+        rollout_buffer.compute_returns_and_advantage(
+            last_values=th.as_tensor(trajectory["last_values"]), dones=trajectory["last_dones"]
+        )
+
+        callback.update_locals(locals())
+        callback.on_rollout_end()
+
+        return True
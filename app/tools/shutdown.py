@@ -0,0 +1,153 @@
+# path: .app/tools/shutdown.py
+
+from stable_baselines3.common.callbacks import BaseCallback
+from datetime import datetime
+import threading
+import signal
+import json
+import time
+import os
+from app import DEFAULT_PATHS
+from app.tools.utils import load_run_report
+
+SHUTDOWN_DIR = os.path.join(DEFAULT_PATHS["log_dir"], "shutdown")
+
+
+class ShutdownCoordinator:
+    """
+    Turns termination signals into an orderly stop of the training process.
+
+    During setup (env creation, benchmarks, calibration) a signal exits right away, since
+    there is nothing to save yet. Once `enter_training` is called, the signal handler only
+    sets a flag, which `StopOnSignalCallback` honors at the next step, so `learn` returns
+    normally and callbacks see the end of training. `finish` then
+    runs the final save and the env closes in parallel threads under one deadline, exactly
+    once, and reports how long each took.
+    """
+
+    def __init__(self, deadline=8.0):
+        """
+        :param deadline: Seconds `finish` waits for its tasks. The web app kills the process
+            10 seconds after SIGTERM, so the default leaves room to exit.
+        """
+        self.deadline = float(deadline)
+        self.stop_requested = threading.Event()
+        self.signum = None
+        self.requested_at = None
+        self.stopped_at_timesteps = None
+        self.listeners = []
+        self.report = None
+        self.exit_on_signal = True
+        self._lock = threading.Lock()
+
+    def install(self, signals=(signal.SIGTERM, signal.SIGINT)):
+        for signum in signals:
+            signal.signal(signum, self.handle)
+
+    def enter_training(self):
+        """Defer signals to the training loop from now on."""
+        self.exit_on_signal = False
+
+    def add_listener(self, listener):
+        """Call `listener()` when a stop is requested, e.g. `PopulationTrainer.stop`."""
+        self.listeners.append(listener)
+        if self.stop_requested.is_set():
+            listener()
+
+    def request_stop(self):
+        if self.stop_requested.is_set():
+            return
+        self.requested_at = time.time()
+        self.stop_requested.set()
+        for listener in self.listeners:
+            listener()
+
+    def handle(self, signum, frame):
+        if self.exit_on_signal:
+            print(f"\nReceived termination signal: {signum} before training started. Exiting.")
+            raise SystemExit(128 + signum)
+        if self.stop_requested.is_set():
+            # A second signal means the stop is stuck (e.g. inside an env step), so unwind right away
+            raise KeyboardInterrupt
+        print(f"\nReceived termination signal: {signum}. Stopping at the next step...")
+        self.signum = signum
+        self.request_stop()
+
+    def _run_task(self, task, result):
+        start = time.time()
+        try:
+            task()
+            result["status"] = "ok"
+        except Exception as e:
+            result["status"] = "failed"
+            result["error"] = str(e)
+        result["seconds"] = round(time.time() - start, 3)
+
+    def finish(self, tasks, run_id=None):
+        """
+        Run the shutdown tasks in parallel and wait for them until the deadline.
+
+        :param tasks: Dictionary of name -> callable, e.g. the final save and the env close.
+        :return: The shutdown report. Later calls return the first report without running anything.
+        """
+        with self._lock:
+            if self.report is not None:
+                return self.report
+            start = time.time()
+            results = {name: {"status": "running"} for name in tasks}
+            threads = {
+                name: threading.Thread(target=self._run_task, args=(task, results[name]), daemon=True)
+                for name, task in tasks.items()
+            }
+            for thread in threads.values():
+                thread.start()
+            for name, thread in threads.items():
+                thread.join(max(start + self.deadline - time.time(), 0))
+
+            task_report = {}
+            for name, thread in threads.items():
+                task_report[name] = dict(results[name])
+                if thread.is_alive():
+                    task_report[name] = {"status": "timeout"}
+            self.report = {
+                "run_id": run_id,
+                "reason": signal.Signals(self.signum).name if self.signum else ("stop" if self.requested_at else "completed"),
+                "stop_latency_seconds": round(start - self.requested_at, 3) if self.requested_at else None,
+                "stopped_at_timesteps": self.stopped_at_timesteps,
+                "deadline_seconds": self.deadline,
+                "shutdown_seconds": round(time.time() - start, 3),
+                "within_deadline": all(task["status"] != "timeout" for task in task_report.values()),
+                "tasks": task_report,
+                "finished": datetime.now().isoformat(),
+            }
+            return self.report
+
+
+class StopOnSignalCallback(BaseCallback):
+    """Ends training at the next step once the coordinator has a stop request."""
+
+    def __init__(self, coordinator, verbose=1):
+        super(StopOnSignalCallback, self).__init__(verbose)
+        self.coordinator = coordinator
+
+    def _on_step(self) -> bool:
+        if not self.coordinator.stop_requested.is_set():
+            return True
+        if self.coordinator.stopped_at_timesteps is None:
+            self.coordinator.stopped_at_timesteps = self.num_timesteps
+            if self.verbose > 0:
+                print(f"Stopping training at {self.num_timesteps} timesteps.")
+        return False
+
+
+def write_shutdown_report(report, output_dir=SHUTDOWN_DIR):
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f"{report['run_id']}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4)
+    return path
+
+
+def load_shutdown_report(run_id=None, output_dir=SHUTDOWN_DIR):
+    """Return a run's shutdown report (the latest one by default), or None."""
+    return load_run_report(output_dir, run_id)
@@ -6,7 +6,9 @@ from inspect import signature
 import importlib
 import inspect
 import pickle
+import json
 import os
+import glob
 import tempfile
 from app import DEFAULT_HYPERPARAMETERS, DEFAULT_TRAINING_CONFIG, DEFAULT_PATHS, ENV_SETTINGS, WRAPPER_SETTINGS
 
@@ -157,6 +159,45 @@ def apply_wrappers(env, selected_wrappers, blueprints):
     return env
 
 
+def initialize_wrappers(training_manager):
+    """
+    Resolve the enabled wrapper blueprints into DIAMBRA `wrappers` entries.
+
+    Arguments come from the hyperparameters and training config through each blueprint's
+    arg_map, falling back to the defaults only for keys the config doesn't have.
+    The entries are stored as `training_manager.wrapper_entries`, a list of [class, kwargs].
+    """
+    logger = LogManager("initialize_wrappers")
+    config = training_manager.active_config["config"]
+    settings = {**config.get("hyperparameters", {}), **config.get("training_config", {})}
+    fallback_config = {
+        **DEFAULT_TRAINING_CONFIG,
+        **DEFAULT_HYPERPARAMETERS,
+        **ENV_SETTINGS,
+        **WRAPPER_SETTINGS,
+    }
+
+    wrapper_entries = []
+    for wrapper_name in config.get("enabled_wrappers", []):
+        blueprint = next(
+            (bp for key, bp in training_manager.wrapper_blueprints.items()
+             if key == wrapper_name or bp.name == wrapper_name),
+            None
+        )
+        if not blueprint:
+            logger.warning(f"Wrapper blueprint '{wrapper_name}' not found. Skipping.")
+            continue
+        kwargs = dict(blueprint.default_params)
+        for arg_name, config_key in blueprint.arg_map.items():
+            value = settings[config_key] if config_key in settings else fallback_config.get(config_key)
+            if value is not None:
+                kwargs[arg_name] = value
+        wrapper_entries.append([blueprint.component_class, kwargs])
+        logger.info(f"Initialized wrapper: {wrapper_name} with params: {kwargs}")
+
+    training_manager.wrapper_entries = wrapper_entries
+
+
 def initialize_callbacks(training_manager):
     logger = LogManager("initialize_callbacks")
     logger.info("Initializing callbacks...")
@@ -184,14 +225,16 @@ def initialize_callbacks(training_manager):
             logger.debug(f"Found blueprint for callback '{cb_name}': {blueprint}")
 
             try:
+                training_config = training_manager.active_config["config"]["training_config"]
+                # Only unset values fall back, so a configured 0 or False is kept
                 params = {
                     key: (
-                        training_manager.active_config["config"]["training_config"].get(value)
-                        or fallback_config.get(value)
+                        training_config[value]
+                        if training_config.get(value) not in (None, "")
+                        else fallback_config.get(value)
                     )
                     for key, value in blueprint.arg_map.items()
-                    if value in training_manager.active_config["config"]["training_config"]
-                    or value in fallback_config
+                    if value in training_config or value in fallback_config
                 }
 
                 # Convert numeric parameters where needed
@@ -218,6 +261,23 @@ def initialize_callbacks(training_manager):
     logger.info("Callbacks initialized successfully.")
 
 
+def load_run_report(output_dir, run_id=None):
+    """
+    Load the `<run_id>.json` report from a report directory, or the most recent one.
+
+    :return: Report dictionary, or None if there is no such report.
+    """
+    if run_id:
+        path = os.path.join(output_dir, f"{run_id}.json")
+        reports = [path] if os.path.isfile(path) else []
+    else:
+        reports = glob.glob(os.path.join(output_dir, "*.json"))
+    if not reports:
+        return None
+    with open(max(reports, key=os.path.getmtime), encoding="utf-8") as f:
+        return json.load(f)
+
+
 def load_from_pickle(file_path):
     """Load an object from a pickle file."""
     logger = app_logger.__class__("load_from_pickle")
@@ -239,3 +299,18 @@ def filter_config(config, allowed_keys):
     """
     return {key: config[key] for key in config if key in allowed_keys}
 
+
+def parse_bool(value, default=False):
+    """
+    Interpret a config value that may arrive from the dashboard as a string.
+
+    :param value: Boolean, string ("True"/"false"/"1"...) or None.
+    :param default: Value returned for None or empty strings.
+    :return: The boolean value.
+    """
+    if value is None or value == "":
+        return default
+    if isinstance(value, str):
+        return value.strip().lower() in {"true", "1", "yes", "on"}
+    return bool(value)
+
@@ -0,0 +1,355 @@
+# path: .app/tools/vec_env_backends.py
+
+from diambra.arena.stable_baselines3.make_sb3_env import make_sb3_env
+import diambra.arena
+from stable_baselines3 import PPO
+from stable_baselines3.common.monitor import Monitor
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv
+from stable_baselines3.common.utils import obs_as_tensor
+from gymnasium import spaces
+from datetime import datetime
+import torch as th
+import numpy as np
+import threading
+import copy
+import glob
+import json
+import time
+import os
+from app import DEFAULT_PATHS
+from app.custom_wrappers.action_repeat import ActionRepeat
+from app.tools.rollout_workers import RolloutWorkerVecEnv, DistributedPPO
+
+VEC_ENV_BACKENDS = ("dummy", "subprocess", "async", "distributed")
+# Engine step ratios and agent-side repeats compared by the action repeat benchmark
+BENCHMARK_STEP_RATIOS = (1, 3, 6)
+BENCHMARK_ACTION_REPEATS = (1, 2, 4)
+BENCHMARK_DIR = os.path.join(DEFAULT_PATHS["log_dir"], "benchmarks")
+
+
+def _seeded_env_fn(game_id, env_settings, wrapper_settings, rank, seed, log_dir_base="/tmp/DIAMBRALog/"):
+    """Env factory for one rank with its own copy of the settings, mirroring `make_sb3_env`."""
+    env_settings = copy.deepcopy(env_settings)
+    env_settings.seed = seed
+
+    def _init():
+        env = diambra.arena.make(game_id, env_settings, wrapper_settings, render_mode="rgb_array", rank=rank)
+        log_dir = os.path.join(log_dir_base, str(rank))
+        os.makedirs(log_dir, exist_ok=True)
+        return Monitor(env, log_dir, allow_early_resets=True)
+    return _init
+
+
+def make_vec_env(backend, game_id, env_settings, wrapper_settings, seeds=None, workers=2):
+    """
+    Build the vectorized environment for a backend.
+
+    :param backend: 'dummy' steps every env in the learner process, 'subprocess' and 'async'
+        give each env its own worker process, 'distributed' splits the envs between rollout
+        worker processes that also run the policy.
+    :param seeds: Optional per-env seeds, one per address in `DIAMBRA_ENVS`. `make_sb3_env`
+        seeds from the clock and shares one settings object between ranks, so seeded envs are
+        built here with a settings copy per rank instead.
+    :param workers: Number of rollout worker processes for the 'distributed' backend.
+    :return: Tuple of (env, num_envs) as returned by `make_sb3_env`.
+    """
+    if backend not in VEC_ENV_BACKENDS:
+        raise ValueError(f"Unknown vec env backend '{backend}'. Expected one of {VEC_ENV_BACKENDS}.")
+    if backend == "distributed":
+        env = RolloutWorkerVecEnv(
+            game_id, env_settings, wrapper_settings, os.getenv("DIAMBRA_ENVS", "").split(), workers=workers, seeds=seeds
+        )
+        return env, env.num_envs
+    if seeds is None:
+        return make_sb3_env(game_id, env_settings, wrapper_settings, use_subprocess=backend != "dummy")
+
+    num_envs = len(os.getenv("DIAMBRA_ENVS", "").split())
+    if len(seeds) != num_envs:
+        raise ValueError(f"Got {len(seeds)} seed(s) for {num_envs} env(s).")
+    env_fns = [_seeded_env_fn(game_id, env_settings, wrapper_settings, rank, seed) for rank, seed in enumerate(seeds)]
+    if num_envs == 1 or backend == "dummy":
+        return DummyVecEnv(env_fns), num_envs
+    return SubprocVecEnv(env_fns), num_envs
+
+
+def agent_class(backend):
+    """Return the PPO class to train with on the given backend."""
+    return {"async": AsyncCollectorPPO, "distributed": DistributedPPO}.get(backend, PPO)
+
+
+class AsyncCollectorPPO(PPO):
+    """
+    PPO that collects the next rollout on a background thread while it trains on the current one.
+
+    The background rollout is gathered by a snapshot of the policy taken right before the
+    update, so every batch is one update behind the learner. The stored log-probs come from
+    that snapshot, so PPO's ratio compares against the policy that actually acted; it starts
+    one update away from 1 rather than at 1, and the clipping bounds that lag as well.
+
+    The collector thread only records what callbacks need. Once it is joined, the recorded
+    steps are replayed through the callbacks on the learner thread, so callbacks never run
+    concurrently with `train()` and see `num_timesteps` advance as usual. A callback asking
+    to stop therefore takes effect after the overlapped rollout instead of mid-rollout.
+    """
+
+    def _setup_model(self):
+        super()._setup_model()
+        self.behavior_policy = copy.deepcopy(self.policy)
+        self.behavior_policy.set_training_mode(False)
+        self._next_buffer = None
+        self._collector = None
+        self._collected = None
+        self._stop_collecting = threading.Event()
+
+    def _excluded_save_params(self):
+        return super()._excluded_save_params() + [
+            "behavior_policy", "_next_buffer", "_collector", "_collected", "_stop_collecting",
+        ]
+
+    def learn(self, *args, **kwargs):
+        try:
+            return super().learn(*args, **kwargs)
+        finally:
+            self._drain()
+
+    def collect_rollouts(self, env, callback, rollout_buffer, n_rollout_steps):
+        if self._collector is None:
+            return super().collect_rollouts(env, callback, rollout_buffer, n_rollout_steps)
+
+        self._collector.join()
+        self._collector = None
+        error, steps = self._collected
+        if error is not None:
+            raise error
+
+        callback.on_rollout_start()
+        for step in steps:
+            self.num_timesteps += env.num_envs
+            callback.update_locals(step)
+            if callback.on_step() is False:
+                return False
+            self._update_info_buffer(step["infos"], step["dones"])
+        if len(steps) < n_rollout_steps:
+            # Collection was interrupted, so there is no complete batch to train on
+            return False
+
+        # `train` reads `self.rollout_buffer`, so swapping hands it the freshly collected batch
+        self.rollout_buffer, self._next_buffer = self._next_buffer, self.rollout_buffer
+        callback.update_locals({"rollout_buffer": self.rollout_buffer})
+        callback.on_rollout_end()
+        return True
+
+    def train(self):
+        if self.num_timesteps < self._total_timesteps:
+            self._start_collection()
+        super().train()
+
+    def _start_collection(self):
+        if self._next_buffer is None:
+            self._next_buffer = copy.deepcopy(self.rollout_buffer)
+        self.behavior_policy.load_state_dict(self.policy.state_dict())
+        self._stop_collecting.clear()
+        self._collected = None
+        self._collector = threading.Thread(
+            target=self._collect_in_background,
+            args=(self.env, self._next_buffer, self.n_steps),
+            daemon=True,
+        )
+        self._collector.start()
+
+    def _collect_in_background(self, env, rollout_buffer, n_rollout_steps):
+        try:
+            self._collected = (None, self._collect(env, rollout_buffer, n_rollout_steps))
+        except Exception as e:
+            self._collected = (e, [])
+
+    def _collect(self, env, rollout_buffer, n_rollout_steps):
+        """
+        Mirror of `OnPolicyAlgorithm.collect_rollouts` driven by the behaviour policy.
+
+        Callbacks are not called here; each step's locals are recorded for `collect_rollouts`
+        to replay on the learner thread.
+
+        :return: List of per-step callback locals.
+        """
+        policy = self.behavior_policy
+        steps = []
+        n_steps = 0
+        rollout_buffer.reset()
+        if self.use_sde:
+            policy.reset_noise(env.num_envs)
+
+        while n_steps < n_rollout_steps:
+            if self._stop_collecting.is_set():
+                return steps
+            if self.use_sde and self.sde_sample_freq > 0 and n_steps % self.sde_sample_freq == 0:
+                policy.reset_noise(env.num_envs)
+
+            with th.no_grad():
+                obs_tensor = obs_as_tensor(self._last_obs, self.device)
+                actions, values, log_probs = policy(obs_tensor)
+            actions = actions.cpu().numpy()
+
+            clipped_actions = actions
+            if isinstance(self.action_space, spaces.Box):
+                clipped_actions = np.clip(actions, self.action_space.low, self.action_space.high)
+
+            new_obs, rewards, dones, infos = env.step(clipped_actions)
+            steps.append({"rewards": rewards.copy(), "dones": dones, "infos": infos, "actions": actions})
+            n_steps += 1
+
+            if isinstance(self.action_space, spaces.Discrete):
+                actions = actions.reshape(-1, 1)
+
+            # Bootstrap truncated episodes with the value function, as SB3 does
+            for idx, done in enumerate(dones):
+                if (
+                    done
+                    and infos[idx].get("terminal_observation") is not None
+                    and infos[idx].get("TimeLimit.truncated", False)
+                ):
+                    terminal_obs = policy.obs_to_tensor(infos[idx]["terminal_observation"])[0]
+                    with th.no_grad():
+                        terminal_value = policy.predict_values(terminal_obs)[0]
+                    rewards[idx] += self.gamma * terminal_value
+
+            rollout_buffer.add(self._last_obs, actions, rewards, self._last_episode_starts, values, log_probs)
+            self._last_obs = new_obs
+            self._last_episode_starts = dones
+
+        with th.no_grad():
+            values = policy.predict_values(obs_as_tensor(new_obs, self.device))
+
+        rollout_buffer.compute_returns_and_advantage(last_values=values, dones=dones)
+
+        return steps
+
+    def _drain(self):
+        """Stop and join a pending background rollout."""
+        if self._collector is not None:
+            self._stop_collecting.set()
+            self._collector.join()
+            self._collector = None
+
+
+def measure_env_steps(env, steps):
+    """
+    Step an env with random actions, without a learner attached.
+
+    :return: Env-steps per second across all envs.
+    """
+    env.reset()
+    start = time.time()
+    for _ in range(steps):
+        env.step(np.array([env.action_space.sample() for _ in range(env.num_envs)]))
+    return steps * env.num_envs / (time.time() - start)
+
+
+def benchmark_vec_env_backends(game_id, env_settings, wrapper_settings, agent_kwargs, backends=VEC_ENV_BACKENDS,
+                               rollouts=3, output_dir=BENCHMARK_DIR):
+    """
+    Compare env-steps/s across vec env backends on the engines of the current `diambra run`.
+
+    For every backend this measures raw stepping with random actions and the end-to-end rate
+    of a short PPO run, which is where overlapping env stepping with updates pays off.
+
+    :param agent_kwargs: Keyword arguments for the PPO constructor.
+    :param rollouts: Number of PPO rollouts timed per backend.
+    :return: Dictionary of results, also written as JSON under `output_dir`.
+    """
+    results = {}
+    for backend in backends:
+        print(f"Benchmarking vec env backend '{backend}'...")
+        env, num_envs = make_vec_env(backend, game_id, env_settings, wrapper_settings)
+        try:
+            raw_rate = measure_env_steps(env, agent_kwargs["n_steps"])
+            agent = agent_class(backend)("MultiInputPolicy", env, **agent_kwargs)
+            timesteps = rollouts * agent.n_steps * num_envs
+            start = time.time()
+            agent.learn(total_timesteps=timesteps)
+            elapsed = time.time() - start
+            results[backend] = {
+                "num_envs": num_envs,
+                "raw_env_steps_per_sec": round(raw_rate, 2),
+                "training_env_steps_per_sec": round(agent.num_timesteps / elapsed, 2),
+                "timesteps": agent.num_timesteps,
+                "elapsed": round(elapsed, 3),
+            }
+        except Exception as e:
+            results[backend] = {"error": str(e)}
+        finally:
+            env.close()
+        print(f"  {backend}: {results[backend]}")
+
+    report = {"game_id": game_id, "timestamp": datetime.now().isoformat(), "results": results}
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f"vec_env_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4)
+    print(f"Benchmark results saved to: {path}")
+    return report
+
+
+def benchmark_action_repeat(game_id, env_settings, wrapper_settings, steps=256, step_ratios=BENCHMARK_STEP_RATIOS,
+                            repeats=BENCHMARK_ACTION_REPEATS, backend="subprocess", output_dir=BENCHMARK_DIR):
+    """
+    Compare engine `step_ratio` against agent-side ActionRepeat, and their combinations.
+
+    For every pair, `steps` random decisions are timed across all envs. Agent decisions/s is
+    what PPO collects; env steps/s counts engine steps (decisions x repeat) and game
+    frames/s adds the step ratio, i.e. how fast game time passes per wall second.
+
+    :return: Dictionary of results, also written as JSON under `output_dir`.
+    """
+    results = {}
+    for step_ratio in step_ratios:
+        for repeat in repeats:
+            key = f"step_ratio_{step_ratio}_repeat_{repeat}"
+            print(f"Benchmarking step_ratio={step_ratio}, action_repeat={repeat}...")
+            run_env_settings = copy.deepcopy(env_settings)
+            run_env_settings.step_ratio = step_ratio
+            run_wrapper_settings = copy.deepcopy(wrapper_settings)
+            run_wrapper_settings.wrappers = [
+                [wrapper, kwargs] for wrapper, kwargs in (run_wrapper_settings.wrappers or []) if wrapper is not ActionRepeat
+            ]
+            if repeat > 1:
+                run_wrapper_settings.wrappers.insert(0, [ActionRepeat, {"repeat": repeat}])
+            env = None
+            try:
+                env, num_envs = make_vec_env(backend, game_id, run_env_settings, run_wrapper_settings)
+                decisions_per_sec = measure_env_steps(env, steps)
+                results[key] = {
+                    "step_ratio": step_ratio,
+                    "action_repeat": repeat,
+                    "num_envs": num_envs,
+                    "agent_decisions_per_sec": round(decisions_per_sec, 2),
+                    "env_steps_per_sec": round(decisions_per_sec * repeat, 2),
+                    "game_frames_per_sec": round(decisions_per_sec * repeat * step_ratio, 2),
+                }
+            except Exception as e:
+                results[key] = {"step_ratio": step_ratio, "action_repeat": repeat, "error": str(e)}
+            finally:
+                if env is not None:
+                    env.close()
+            print(f"  {key}: {results[key]}")
+
+    report = {"game_id": game_id, "timestamp": datetime.now().isoformat(), "backend": backend, "results": results}
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f"action_repeat_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4)
+    print(f"Benchmark results saved to: {path}")
+    return report
+
+
+def load_latest_benchmark(prefix="vec_env", output_dir=BENCHMARK_DIR):
+    """
+    Return the most recent benchmark report of a kind, or None.
+
+    :param prefix: Report kind, e.g. 'vec_env', 'affinity' or 'action_repeat'.
+    """
+    reports = glob.glob(os.path.join(output_dir, f"{prefix}_*.json"))
+    if not reports:
+        return None
+    with open(max(reports, key=os.path.getmtime), encoding="utf-8") as f:
+        return json.load(f)
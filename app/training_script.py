@@ -1,27 +1,57 @@
 # path: .app/training_script.py
 
+import time
+SCRIPT_START = time.time()  # Taken before the heavy imports so their cost shows up in the launch trace
+
 import json
 import sys
-from diambra.arena.stable_baselines3.make_sb3_env import make_sb3_env, EnvironmentSettings, WrappersSettings
+from diambra.arena.stable_baselines3.make_sb3_env import EnvironmentSettings, WrappersSettings
 from diambra.arena import SpaceTypes, load_settings_flat_dict
 from stable_baselines3 import PPO
 from diambra.arena.stable_baselines3.sb3_utils import linear_schedule
 from stable_baselines3.common.callbacks import CallbackList
+from collections import deque
 import os
 import pickle
-import signal
 
 # Add the project root directory and the `app` directory to `sys.path`
 project_root = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
 sys.path.insert(0, project_root)
 sys.path.insert(1, os.path.join(project_root, "app"))
 
-from app.tools.utils import dynamic_load_blueprints, initialize_callbacks, apply_wrappers
+from app.tools.utils import dynamic_load_blueprints, initialize_callbacks, initialize_wrappers
+from app.tools.checkpoint_store import resolve_checkpoint, checkpoint_timesteps, atomic_write
+from app.custom_wrappers.episode_settings import DifficultySettings
 from app.log_manager import LogManager
-from app import DEFAULT_PATHS
-
-
-def validate_and_convert(env_settings, wrapper_settings, hyperparameters):
+from app.tools.launch_trace import LaunchTracer, LaunchTraceCallback
+from app.tools.checkpoint_writer import AsyncCheckpointCallback
+from app.tools.acceleration import MIXED_PRECISION_MODES, accelerate_agent, UpdateTimingCallback
+from app.tools.profiler_capture import ProfilerCaptureCallback
+from app.tools.control_channel import ControlChannelCallback
+from app.tools.app_callbacks import RenderCallback
+from app.custom_callbacks.plateau_stopping import PlateauStopping
+from app.custom_callbacks.throughput_profiler import ThroughputProfiler
+from app.tools.cpu_affinity import plan_split, apply_split, calibrate_cpu_splits
+from app.tools.rollout_memory import use_uint8_rollout_buffer, memory_report, format_bytes, GIB
+from app.custom_wrappers.frame_stack import RingFrameStack
+from app.custom_wrappers.action_repeat import ActionRepeat
+from app.tools.preflight import build_preflight_report, write_preflight_report
+from app.tools.vec_env_backends import (
+    VEC_ENV_BACKENDS, make_vec_env, agent_class, benchmark_vec_env_backends, benchmark_action_repeat,
+)
+from app.tools.pbt import PopulationTrainer, build_population
+from app.tools.reproducibility import derive_seeds, seed_everything, set_reset_seeds, build_run_spec, write_run_spec
+from app.tools.shutdown import ShutdownCoordinator, StopOnSignalCallback, write_shutdown_report
+from app.container_manager import record_launch_addresses
+from app import DEFAULT_PATHS, DEFAULT_HYPERPARAMETERS
+
+# PPO arguments baked into a checkpoint's network and RNG; they cannot change on resume
+FIXED_ON_RESUME = ("policy_kwargs", "use_sde", "seed", "verbose")
+# Enabled callbacks that write per-run reports or end the run; the render group skips them
+TRAINING_GROUP_ONLY = (PlateauStopping, ThroughputProfiler)
+
+
+def validate_and_convert(env_settings, wrapper_settings, hyperparameters, training_config=None):
     """Validate and convert settings to their correct types and ranges."""
     env_types_and_defaults = {
         "frame_shape": {"type": tuple, "default": (0, 0, 0)},
@@ -79,6 +109,47 @@ def validate_and_convert(env_settings, wrapper_settings, hyperparameters):
         "device": {"type": (str, "torch.device"), "default": "auto"},
     }
 
+    training_types_and_defaults = {
+        "resume_from": {"type": str, "default": ""},
+        "supervise": {"type": bool, "default": False},
+        "stall_timeout": {"type": int, "range": [1, None]},
+        "max_restarts": {"type": int, "range": [0, None]},
+        "remote_env_addresses": {"type": str, "default": ""},
+        "run_id": {"type": str, "default": ""},
+        "vec_env_backend": {"type": str, "default": "subprocess", "choices": VEC_ENV_BACKENDS},
+        "vec_env_benchmark": {"type": bool, "default": False},
+        "benchmark_rollouts": {"type": int, "range": [1, None]},
+        "mixed_precision": {"type": str, "default": "off", "choices": MIXED_PRECISION_MODES},
+        "compile_policy": {"type": bool, "default": False},
+        "learner_cores": {"type": str, "default": ""},
+        "env_cores": {"type": str, "default": ""},
+        "learner_threads": {"type": int, "range": [0, None]},
+        "cpu_calibration": {"type": bool, "default": False},
+        "uint8_fast_path": {"type": bool, "default": False},
+        "rollout_memory_budget_gb": {"type": float, "range": [0.0, None]},
+        "rollout_memory_policy": {"type": str, "default": "warn", "choices": ("warn", "refuse")},
+        "checkpoint_keep_last": {"type": int, "range": [1, None]},
+        "checkpoint_store": {"type": bool, "default": False},
+        "checkpoint_keep_every": {"type": int, "range": [0, None]},
+        "checkpoint_keep_best": {"type": int, "range": [1, None]},
+        "pbt_population": {"type": int, "range": [1, None]},
+        "pbt_interval": {"type": int, "range": [1, None]},
+        "pbt_fraction": {"type": float, "range": [0.0, 0.5]},
+        "pbt_perturb": {"type": float, "range": [0.0, 1.0]},
+        "plateau_check_freq": {"type": int, "range": [1, None]},
+        "plateau_window": {"type": int, "range": [1, None]},
+        "plateau_min_improvement": {"type": float, "range": [0.0, None]},
+        "plateau_patience": {"type": int, "range": [1, None]},
+        "plateau_min_timesteps": {"type": int, "range": [0, None]},
+        "profiler_report_freq": {"type": int, "range": [1, None]},
+        "episode_stats_window": {"type": int, "range": [1, None]},
+        "reproducible": {"type": bool, "default": False},
+        "action_repeat": {"type": int, "range": [1, 16]},
+        "action_repeat_benchmark": {"type": bool, "default": False},
+        "rollout_workers": {"type": int, "range": [1, None]},
+        "shutdown_deadline": {"type": float, "range": [1.0, None]},
+    }
+
     def convert_value(key, value, rules):
         """Validate and convert a single value based on the provided rules."""
         try:
@@ -139,6 +210,10 @@ def validate_and_convert(env_settings, wrapper_settings, hyperparameters):
                 if (min_val is not None and value < min_val) or (max_val is not None and value > max_val):
                     raise ValueError(f"Value for '{key}' is out of range: {value}.")
 
+            # Choice validation
+            if "choices" in rules and value not in rules["choices"]:
+                raise ValueError(f"Invalid value for '{key}': {value}. Allowed values: {list(rules['choices'])}")
+
             return value
         except Exception as e:
             print(f"Error converting field '{key}' with value '{value}': {e}")
@@ -160,6 +235,12 @@ def validate_and_convert(env_settings, wrapper_settings, hyperparameters):
             print(f"Checking hyperparameters[{key}]: {hyperparameters[key]}")
             hyperparameters[key] = convert_value(key, hyperparameters[key], rules)
 
+    if training_config is not None:
+        for key, rules in training_types_and_defaults.items():
+            if key in training_config:
+                print(f"Checking training_config[{key}]: {training_config[key]}")
+                training_config[key] = convert_value(key, training_config[key], rules)
+
     return env_settings, wrapper_settings, hyperparameters
 
 
@@ -178,6 +259,7 @@ def validate_and_initialize_blueprints(training_manager):
     logger.info(f"Loaded Callback Blueprints: {list(training_manager.callback_blueprints.keys())}")
 
     initialize_callbacks(training_manager)
+    initialize_wrappers(training_manager)
     logger.info("Blueprint validation and initialization completed.")
 
 
@@ -192,7 +274,9 @@ def validate_loaded_config(training_manager):
         hyperparameters = config["hyperparameters"]
 
         print("Validating and converting configuration...")
-        env_settings, wrapper_settings, hyperparameters = validate_and_convert(env_settings, wrapper_settings, hyperparameters)
+        env_settings, wrapper_settings, hyperparameters = validate_and_convert(
+            env_settings, wrapper_settings, hyperparameters, training_config=config["training_config"]
+        )
 
         config["env_settings"] = env_settings
         config["wrapper_settings"] = wrapper_settings
@@ -216,40 +300,239 @@ def load_from_pickle(file_path):
         raise RuntimeError(f"Failed to load object from {file_path}: {e}")
 
 
-def signal_handler(signum, frame):
-    """Handles termination signals (e.g., SIGTERM, SIGINT)."""
-    global agent, env, save_path
-    print(f"\nReceived termination signal: {signum}. Cleaning up...")
-    if agent and save_path:
-        model_path = os.path.join(save_path, "last_model.zip")
-        print(f"Saving the model to: {model_path}")
-        agent.save(model_path)
-    print("Cleanup complete. Exiting.")
-    sys.exit(0)
+def resolve_resume_path(resume_from, save_path):
+    """
+    Resolve the `resume_from` setting to a checkpoint file.
+
+    :param resume_from: Empty to start fresh, "latest" for the newest checkpoint, "best", a checkpoint
+        store name, or a checkpoint path (absolute or relative to `save_path`).
+    :param save_path: Directory where checkpoints are written.
+    :return: Path to the checkpoint, or None to start from scratch.
+    """
+    if not resume_from:
+        return None
+    checkpoint = resolve_checkpoint(save_path, resume_from)
+    if checkpoint is None and resume_from != "latest":
+        raise FileNotFoundError(f"Checkpoint to resume from not found: {resume_from}")
+    return checkpoint
+
+
+def restore_wrapper_progress(wrapper_settings, timesteps, num_envs):
+    """
+    Continue step-based wrapper schedules from a checkpoint's timestep counter.
+
+    DifficultySettings counts steps per env, so every DifficultySettings entry in the custom
+    wrappers starts from `timesteps // num_envs` instead of zero.
+    """
+    wrappers = list(wrapper_settings.get("wrappers") or [])
+    for index, (wrapper_class, kwargs) in enumerate(wrappers):
+        if wrapper_class is DifficultySettings:
+            wrappers[index] = [wrapper_class, {**kwargs, "initial_steps": timesteps // max(num_envs, 1)}]
+    wrapper_settings["wrappers"] = wrappers
+
+
+def describe_resume(agent, checkpoint, total_timesteps):
+    """
+    Summarize where a resumed agent picks up: timesteps, schedule values and optimizer state.
+
+    :return: JSON-serializable dictionary, added to the pre-flight report.
+    """
+    progress_remaining = 1.0 - agent.num_timesteps / max(int(total_timesteps), 1)
+    optimizer_state = agent.policy.optimizer.state
+    return {
+        "checkpoint": checkpoint,
+        "num_timesteps": agent.num_timesteps,
+        "progress_remaining": round(progress_remaining, 6),
+        "learning_rate": agent.lr_schedule(progress_remaining),
+        "clip_range": agent.clip_range(progress_remaining),
+        "optimizer_state_restored": len(optimizer_state) > 0,
+        "optimizer_step": max(
+            (int(state["step"]) for state in optimizer_state.values() if "step" in state), default=0
+        ),
+    }
+
+
+def enable_ring_frame_stack(wrapper_settings):
+    """
+    Move frame stacking from DIAMBRA's FrameStack to RingFrameStack.
+
+    DIAMBRA's stacking is disabled (`stack_frames=1`) and RingFrameStack is appended to the
+    custom wrappers with the requested depth and dilation. Image scaling is excluded so
+    frames stay uint8 all the way into the rollout buffer.
+    """
+    n_frames = int(wrapper_settings.get("stack_frames") or 1)
+    dilation = int(wrapper_settings.get("dilation") or 1)
+    wrapper_settings["stack_frames"] = 1
+    wrapper_settings["dilation"] = 1
+    wrapper_settings["exclude_image_scaling"] = True
+    if n_frames > 1:
+        wrapper_settings["wrappers"] = list(wrapper_settings.get("wrappers") or []) + [
+            [RingFrameStack, {"n_frames": n_frames, "dilation": dilation}]
+        ]
+    print(f"uint8 fast path: ring frame stack of {n_frames} frame(s) with dilation {dilation}.")
+
+
+def build_agent_kwargs(hyperparameters, tensorboard_log_dir):
+    """
+    Collect the PPO constructor arguments from validated hyperparameters.
+
+    Expects the schedules (`learning_rate`, `clip_range`, optional `clip_range_vf`) and
+    `policy_kwargs` to be built already. Optional settings left unset are omitted so SB3's
+    defaults apply.
+
+    :return: Keyword arguments for `PPO(...)`.
+    """
+    agent_kwargs = dict(
+        verbose=1,
+        learning_rate=hyperparameters["learning_rate"],
+        n_steps=hyperparameters["n_steps"],
+        batch_size=hyperparameters["batch_size"],
+        n_epochs=hyperparameters["n_epochs"],
+        gamma=hyperparameters["gamma"],
+        gae_lambda=hyperparameters["gae_lambda"],
+        clip_range=hyperparameters["clip_range"],
+        clip_range_vf=hyperparameters.get("clip_range_vf"),
+        target_kl=hyperparameters.get("target_kl"),
+        policy_kwargs=hyperparameters.get("policy_kwargs"),
+        tensorboard_log=tensorboard_log_dir,
+        seed=hyperparameters.get("seed"),
+        device=hyperparameters["device"],
+    )
+    for key in ("ent_coef", "vf_coef", "max_grad_norm", "normalize_advantage", "use_sde", "sde_sample_freq",
+                "stats_window_size"):
+        if hyperparameters.get(key) is not None:
+            agent_kwargs[key] = hyperparameters[key]
+    return agent_kwargs
+
+
+def extend_env_addresses(remote_env_addresses):
+    """
+    Append remote engine addresses to the ones provided by `diambra run`.
+
+    `make_sb3_env` creates one environment per address in `DIAMBRA_ENVS`, so the
+    learner steps local and remote containers alike.
+
+    :param remote_env_addresses: Space-separated `host:port` engine addresses.
+    :return: Total number of environment addresses.
+    """
+    addresses = os.getenv("DIAMBRA_ENVS", "").split() + (remote_env_addresses or "").split()
+    os.environ["DIAMBRA_ENVS"] = " ".join(addresses)
+    if remote_env_addresses:
+        print(f"Added remote env addresses: {remote_env_addresses}")
+    return len(addresses)
+
+
+def pbt_conflicts(training_config, callback_instances):
+    """
+    Name the enabled features PBT members don't run with: callbacks, the uint8 fast path and acceleration.
+
+    :return: List of feature names; empty if the configuration can train with PBT.
+    """
+    conflicts = [f"callback {type(callback).__name__}" for callback in callback_instances]
+    if training_config.get("uint8_fast_path"):
+        conflicts.append("uint8_fast_path")
+    if (training_config.get("mixed_precision") or "off") != "off":
+        conflicts.append("mixed_precision")
+    if training_config.get("compile_policy"):
+        conflicts.append("compile_policy")
+    return conflicts
+
+
+def train_population(population, backend, training_config, env_settings, wrapper_settings, agent_kwargs,
+                     hyperparameters, save_path, run_id, coordinator):
+    """
+    Population-based training: one PPO learner per engine subset, exploited and perturbed every
+    `pbt_interval` timesteps. The leader is saved as `last_model.zip` after every round.
+    """
+    members = build_population(
+        population,
+        backend,
+        training_config["game_id"],
+        env_settings,
+        wrapper_settings,
+        agent_kwargs,
+        hyperparameters,
+        os.getenv("DIAMBRA_ENVS", "").split(),
+        total_timesteps=int(training_config["total_timesteps"]),
+        perturb_factor=training_config.get("pbt_perturb") or 0.2,
+        seed=hyperparameters.get("seed"),
+    )
+    trainer = PopulationTrainer(
+        members,
+        interval=training_config.get("pbt_interval") or 50000,
+        fraction=training_config.get("pbt_fraction") or 0.25,
+        perturb_factor=training_config.get("pbt_perturb") or 0.2,
+        seed=hyperparameters.get("seed"),
+        run_id=run_id,
+    )
+    preflight = build_preflight_report(agent_kwargs, members[0].agent)
+    print(f"Pre-flight report of member 0 saved to: {write_preflight_report(run_id, preflight)}")
+
+    # A stop ends the current round early; its leader is still saved before the run ends
+    coordinator.add_listener(trainer.stop)
+    coordinator.enter_training()
+
+    def save_leader(trainer):
+        atomic_write(os.path.join(save_path, "last_model.zip"), trainer.leader.agent.save)
+        print(f"PBT round {len(trainer.history)}: scores {trainer.history[-1]['scores']}, "
+              f"leader is member {trainer.leader.index}.")
+
+    try:
+        trainer.run(int(training_config["total_timesteps"]), on_round=save_leader)
+    finally:
+        trainer.stop()
+        finish_shutdown(
+            coordinator, {f"env_{member.index}": member.agent.env.close for member in members}, run_id
+        )
+    print(f"PBT complete. Leader: member {trainer.leader.index}.")
+
+
+def finish_shutdown(coordinator, tasks, run_id):
+    """Run the shutdown tasks under the coordinator's deadline and report how long they took."""
+    report = coordinator.finish(tasks, run_id)
+    for name, task in report["tasks"].items():
+        print(f"Shutdown task '{name}': {task['status']}"
+              + (f" in {task['seconds']}s" if "seconds" in task else "")
+              + (f" ({task['error']})" if "error" in task else ""))
+    print(f"Shutdown took {report['shutdown_seconds']}s ({report['reason']}, deadline {report['deadline_seconds']}s).")
+    if os.getenv("DIAMBRA_CONTAINER_GROUP", "training_group") == "training_group":
+        print(f"Shutdown report saved to: {write_shutdown_report(report)}")
+    return report
 
 
 def main():
     """Main function for setting up and training the PPO agent."""
-    global agent, env, save_path
-
-    # Register signal handlers for SIGTERM and SIGINT
-    signal.signal(signal.SIGTERM, signal_handler)
-    signal.signal(signal.SIGINT, signal_handler)
+    # SIGTERM and SIGINT exit during setup; once training starts they only request a stop,
+    # training ends at the next step and shuts down once
+    coordinator = ShutdownCoordinator()
+    coordinator.install()
+    # Let the web app attribute this launch's engine containers to its group
+    record_launch_addresses()
 
     if len(sys.argv) < 2:
         print("Usage: python training_script.py <pickle_file_path>")
         sys.exit(1)
 
+    main_start = time.time()
     pickle_file_path = sys.argv[1]
     training_manager = load_from_pickle(pickle_file_path)
+    pickle_loaded = time.time()
 
     # Validate and initialize configuration and blueprints
     if not training_manager or not training_manager.active_config or not training_manager.active_config["use_active"]:
         print("No valid active configuration found in the loaded TrainingManager.")
         sys.exit(1)
 
-    validate_loaded_config(training_manager)
-    validate_and_initialize_blueprints(training_manager)
+    # Correlate this process's launch stages with the web side's
+    run_id = training_manager.active_config["config"]["training_config"].get("run_id") or f"untracked-{os.getpid()}"
+    tracer = LaunchTracer(run_id, side=os.getenv("DIAMBRA_CONTAINER_GROUP", "training_group"))
+    tracer.record("script_imports", SCRIPT_START, main_start)
+    tracer.record("load_pickle", main_start, pickle_loaded)
+
+    with tracer.stage("validate_and_convert"):
+        validate_loaded_config(training_manager)
+    with tracer.stage("blueprint_reload"):
+        validate_and_initialize_blueprints(training_manager)
 
     # Extract configurations
     training_config = training_manager.active_config["config"]["training_config"]
@@ -257,6 +540,7 @@ def main():
     wrapper_settings = training_manager.active_config["config"]["wrapper_settings"]
     env_settings = training_manager.active_config["config"]["env_settings"]
     callback_instances = training_manager.callback_instances
+    coordinator.deadline = float(training_config.get("shutdown_deadline") or coordinator.deadline)
 
     # Log the active configuration for debugging
     print("Active Configuration:")
@@ -281,6 +565,28 @@ def main():
             SpaceTypes.DISCRETE if action_space_value == "discrete" else SpaceTypes.MULTI_DISCRETE
         )
 
+    # Enabled wrapper blueprints (e.g. Difficulty Settings) run as DIAMBRA custom wrappers
+    wrapper_settings["wrappers"] = list(training_manager.wrapper_entries) + list(wrapper_settings.get("wrappers") or [])
+
+    # Resolve the checkpoint first so step-based wrappers can continue from its timestep counter
+    resume_path = resolve_resume_path(training_config.get("resume_from"), save_path)
+    if resume_path:
+        restore_wrapper_progress(
+            wrapper_settings, checkpoint_timesteps(resume_path), int(training_config.get("num_envs") or 1)
+        )
+
+    # Agent-side frame skip goes first among the custom wrappers, so a ring frame stack sees pooled frames
+    action_repeat = int(training_config.get("action_repeat") or 1)
+    if action_repeat > 1:
+        wrapper_settings["wrappers"] = [[ActionRepeat, {"repeat": action_repeat}]] + list(wrapper_settings.get("wrappers") or [])
+        print(f"Action repeat: each decision is held for {action_repeat} env steps "
+              f"({action_repeat * int(env_settings.get('step_ratio') or 1)} game frames).")
+
+    # uint8 fast path: frames stay uint8 and are stacked by a ring buffer instead of FrameStack
+    uint8_fast_path = training_config.get("uint8_fast_path", False)
+    if uint8_fast_path:
+        enable_ring_frame_stack(wrapper_settings)
+
     # Convert settings to objects
     env_settings_obj = load_settings_flat_dict(EnvironmentSettings, env_settings)
     wrapper_settings_obj = load_settings_flat_dict(WrappersSettings, wrapper_settings)
@@ -300,75 +606,227 @@ def main():
             float(hyperparameters["clip_range_vf_end"]),
         )
 
+    # An unset policy width falls back to two 64-unit layers; an unset value width keeps the
+    # value head directly on the extracted features
     policy_kwargs = {
-        "net_arch": [
-            dict(
-                pi=list(map(int, hyperparameters["pi_net"].split(","))) if hyperparameters.get("pi_net") else [64, 64],
-                vf=list(map(int, hyperparameters["vf_net"].split(","))) if hyperparameters.get("vf_net") else [],
-            )
-        ]
+        "net_arch": dict(
+            pi=list(map(int, hyperparameters["pi_net"].split(","))) if hyperparameters.get("pi_net") else [64, 64],
+            vf=list(map(int, hyperparameters["vf_net"].split(","))) if hyperparameters.get("vf_net") else [],
+        )
     }
     hyperparameters["policy_kwargs"] = policy_kwargs
 
     # Initialize the environment
     print("Initializing environment...")
-    env, num_envs = make_sb3_env(
-        training_config["game_id"],
-        env_settings_obj,
-        wrapper_settings_obj,
-    )
+    container_group = os.getenv("DIAMBRA_CONTAINER_GROUP", "training_group")
+    if container_group == "training_group":
+        extend_env_addresses(training_config.get("remote_env_addresses"))
+    else:
+        callback_instances = [cb for cb in callback_instances if not isinstance(cb, TRAINING_GROUP_ONLY)]
+
+    # PPO constructor arguments, shared by fresh runs, resumes and the backend benchmark
+    agent_kwargs = build_agent_kwargs(hyperparameters, tensorboard_log_dir)
+
+    if training_config.get("vec_env_benchmark"):
+        if container_group == "training_group":
+            benchmark_vec_env_backends(
+                training_config["game_id"],
+                env_settings_obj,
+                wrapper_settings_obj,
+                {**agent_kwargs, "tensorboard_log": None, "verbose": 0},
+                rollouts=training_config.get("benchmark_rollouts") or 3,
+            )
+        print("Benchmark mode: skipping training.")
+        return
+
+    if training_config.get("action_repeat_benchmark"):
+        if container_group == "training_group":
+            benchmark_action_repeat(training_config["game_id"], env_settings_obj, wrapper_settings_obj)
+        print("Benchmark mode: skipping training.")
+        return
+
+    vec_env_backend = training_config.get("vec_env_backend") or "subprocess"
+    print(f"Using vec env backend: {vec_env_backend}")
+
+    population = int(training_config.get("pbt_population") or 1)
+    if population > 1 and container_group == "training_group":
+        conflicts = pbt_conflicts(training_config, callback_instances)
+        if conflicts:
+            print(f"PBT does not support: {', '.join(conflicts)}. Disable them or set pbt_population to 1.")
+            sys.exit(1)
+
+    # Reproducibility mode: every seed derives from the run seed and is recorded in the run spec
+    env_seeds = None
+    if training_config.get("reproducible") and container_group == "training_group":
+        run_seed = hyperparameters.get("seed")
+        if run_seed is None:
+            run_seed = agent_kwargs["seed"] = DEFAULT_HYPERPARAMETERS["seed"]
+        if vec_env_backend == "async":
+            # The collector thread and the learner draw from the same torch RNG in a racy order
+            print("Reproducible mode does not support the async backend; using 'subprocess'.")
+            vec_env_backend = "subprocess"
+        if population > 1:
+            print("Warning: PBT members train in parallel threads, so PBT runs are not reproducible.")
+        seed_everything(run_seed)
+        env_seeds = derive_seeds(run_seed, len(os.getenv("DIAMBRA_ENVS", "").split()))
+        run_spec = build_run_spec(run_id, run_seed, env_seeds, training_manager.active_config["config"], vec_env_backend)
+        print(f"Run spec saved to: {write_run_spec(run_spec)} (config hash {run_spec['config_hash'][:12]}, "
+              f"env seeds {env_seeds})")
+
+    if population > 1 and container_group == "training_group":
+        train_population(population, vec_env_backend, training_config, env_settings_obj, wrapper_settings_obj,
+                         agent_kwargs, hyperparameters, save_path, run_id, coordinator)
+        return
+    with tracer.stage("make_sb3_env", backend=vec_env_backend):
+        env, num_envs = make_vec_env(
+            vec_env_backend,
+            training_config["game_id"],
+            env_settings_obj,
+            wrapper_settings_obj,
+            seeds=env_seeds,
+            workers=int(training_config.get("rollout_workers") or 2),
+        )
 
-    # Train with callbacks
-    print("Creating PPO agent...")
-    agent = PPO(
-        "MultiInputPolicy",
-        env,
-        verbose=1,
-        learning_rate=hyperparameters["learning_rate"],
-        n_steps=hyperparameters["n_steps"],
-        batch_size=hyperparameters["batch_size"],
-        n_epochs=hyperparameters["n_epochs"],
-        gamma=hyperparameters["gamma"],
-        gae_lambda=hyperparameters["gae_lambda"],
-        clip_range=hyperparameters["clip_range"],
-        tensorboard_log=tensorboard_log_dir,
-        seed=hyperparameters.get("seed"),
-        device=hyperparameters["device"],
+    # Keep the learner and the env processes/containers off each other's cores
+    cpu_split = plan_split(
+        training_config.get("learner_cores"),
+        training_config.get("env_cores"),
+        training_config.get("learner_threads"),
     )
+    if container_group == "training_group" and any(cpu_split.values()):
+        apply_split(cpu_split, env, os.getenv("DIAMBRA_ENVS", "").split())
+
+    # Train with callbacks, resuming from a checkpoint when requested
+    ppo_init_start = time.time()
+    if resume_path:
+        print(f"Resuming PPO agent from checkpoint: {resume_path}")
+        agent = agent_class(vec_env_backend).load(
+            resume_path,
+            env=env,
+            custom_objects={
+                "learning_rate": hyperparameters["learning_rate"],
+                "lr_schedule": hyperparameters["learning_rate"],
+                "clip_range": hyperparameters["clip_range"],
+            },
+            **{key: value for key, value in agent_kwargs.items() if key not in FIXED_ON_RESUME},
+        )
+        print(f"Restored timestep counter: {agent.num_timesteps}")
+        # SB3 keeps the window as `_stats_window_size`, and the restored episode buffers carry the old size
+        if "stats_window_size" in agent_kwargs:
+            agent._stats_window_size = agent_kwargs["stats_window_size"]
+            agent.ep_info_buffer = deque(agent.ep_info_buffer or [], maxlen=agent._stats_window_size)
+            agent.ep_success_buffer = deque(agent.ep_success_buffer or [], maxlen=agent._stats_window_size)
+        # `learn(reset_num_timesteps=False)` keeps `_total_timesteps` = configured total, so the
+        # schedules continue from the restored counter instead of restarting at progress 1.0
+    else:
+        print("Creating PPO agent...")
+        agent = agent_class(vec_env_backend)("MultiInputPolicy", env, **agent_kwargs)
+    if env_seeds is not None:
+        # Building or loading the agent queued `seed + rank` resets; the first reset uses the run spec's seeds instead
+        set_reset_seeds(env, env_seeds)
+    # Includes building the policy and moving it to the torch device
+    tracer.record("ppo_init", ppo_init_start, time.time(), device=str(agent.device), resumed=bool(resume_path))
+
+    if uint8_fast_path:
+        use_uint8_rollout_buffer(agent)
+
+    # Pre-flight report of the values the agent actually runs with
+    preflight = build_preflight_report(agent_kwargs, agent)
+    if resume_path:
+        preflight["resume"] = describe_resume(agent, resume_path, training_config["total_timesteps"])
+        print(f"Resume: {json.dumps(preflight['resume'], default=str)}")
+    preflight["rollout_memory"] = memory_report(agent.observation_space, agent.action_space, agent.n_steps, agent.n_envs)
+    print(
+        f"Rollout buffer: {format_bytes(preflight['rollout_memory']['float32']['total'])} as float32, "
+        f"{format_bytes(preflight['rollout_memory']['uint8']['total'])} with uint8 storage "
+        f"({'in use' if uint8_fast_path else 'enable uint8_fast_path to use it'})."
+    )
+    budget_gb = float(training_config.get("rollout_memory_budget_gb") or 0)
+    peak = preflight["rollout_memory"]["uint8" if uint8_fast_path else "float32"]["peak"]
+    if budget_gb and peak > budget_gb * GIB:
+        print(f"Warning: rollout buffer peaks at {format_bytes(peak)}, over the {budget_gb} GiB budget.")
+    print("Effective PPO hyperparameters:")
+    print(json.dumps(preflight["effective"], indent=4, default=str))
+    for key, values in preflight["mismatches"].items():
+        print(f"Warning: '{key}' requested {values['requested']} but the agent uses {values['effective']}.")
+    for warning in preflight["warnings"]:
+        print(f"Warning: {warning}")
+    if container_group == "training_group":
+        print(f"Pre-flight report saved to: {write_preflight_report(run_id, preflight)}")
+
+    # Opt-in mixed precision / torch.compile, timed against the fp32 eager baseline
+    acceleration = accelerate_agent(
+        agent,
+        mixed_precision=training_config.get("mixed_precision") or "off",
+        compile_model=training_config.get("compile_policy", False),
+    )
+    if "speedup" in acceleration:
+        print(f"Acceleration: {json.dumps(acceleration)}")
+
+    if training_config.get("cpu_calibration"):
+        if container_group == "training_group":
+            print("Calibrating learner/env CPU splits instead of training...")
+            calibrate_cpu_splits(agent, os.getenv("DIAMBRA_ENVS", "").split(),
+                                 rollouts=training_config.get("benchmark_rollouts") or 3)
+        print("Calibration mode: skipping training.")
+        env.close()
+        return
 
     # Log the CallbackList for debugging
-    callback_list = CallbackList(callback_instances)
+    always_on = [LaunchTraceCallback(tracer), UpdateTimingCallback(acceleration)]
+    if container_group == "training_group":
+        # The render group runs this script from the same pickle; control files are meant for the learner only
+        always_on.append(ProfilerCaptureCallback(run_id))
+        always_on.append(ControlChannelCallback(
+            save_path,
+            checkpoint_callback=next((cb for cb in callback_instances if isinstance(cb, AsyncCheckpointCallback)), None),
+            render_callbacks=[cb for cb in callback_instances if isinstance(cb, RenderCallback)],
+            stop_event=coordinator.stop_requested,
+        ))
+    callback_list = CallbackList(callback_instances + always_on + [StopOnSignalCallback(coordinator)])
     print(f"CallbackList contains: {[type(cb).__name__ for cb in callback_list.callbacks]}")
 
     print("Starting training...")
+    coordinator.enter_training()
     try:
-        agent.learn(total_timesteps=int(training_config["total_timesteps"]), callback=callback_list)
+        # The timestep counter carries over on resume, so only the remainder is trained
+        remaining_timesteps = max(int(training_config["total_timesteps"]) - agent.num_timesteps, 0)
+        agent.learn(
+            total_timesteps=remaining_timesteps,
+            callback=callback_list,
+            reset_num_timesteps=resume_path is None,
+        )
     except KeyboardInterrupt:
         print("\nTraining interrupted by user.")
     except Exception as e:
         print(f"Error during training: {e}")
     finally:
-        print("Saving the model before exiting...")
-        try:
-            agent.save(os.path.join(save_path, "last_model.zip"))
-            print(f"Model saved to: {os.path.join(save_path, 'last_model.zip')}")
-        except Exception as e:
-            print(f"Failed to save model: {e}")
-        if env:
-            print("Closing the environment...")
-            try:
-                env.close()
-                print("Environment closed.")
-            except Exception as e:
-                print(f"Failed to close environment: {e}")
+        # The async writer also owns the final save so it lands after any pending checkpoint
+        checkpoint_writer = next(
+            (cb for cb in callback_instances if isinstance(cb, AsyncCheckpointCallback)), None
+        )
+
+        def save_final():
+            print("Saving the model before exiting...")
+            if checkpoint_writer:
+                if not checkpoint_writer.save_final(timeout=coordinator.deadline):
+                    raise TimeoutError("Timed out waiting for pending checkpoints.")
+                if checkpoint_writer.writer.store is not None:
+                    print(f"Model saved to the checkpoint store in {save_path} as 'last_model'.")
+                return
+            model_path = os.path.join(save_path, "last_model.zip")
+            atomic_write(model_path, agent.save)
+            print(f"Model saved to: {model_path}")
+
+        # The save works on an in-memory snapshot, so it can run alongside the env close.
+        # The render group trains from the same pickle and must not overwrite the learner's model.
+        tasks = {"env": env.close}
+        if container_group == "training_group":
+            tasks["save"] = save_final
+        finish_shutdown(coordinator, tasks, run_id)
     print("Training complete. Exiting.")
     print("Please ignore the 'No such container' error messages...")
 
-    try:
-        env.close()
-    except Exception as e:
-        print(f"")
-
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,199 @@
+# path: app/training_supervisor.py
+
+import threading
+import time
+import os
+from app import DEFAULT_PATHS
+from app.log_manager import LogManager
+from app.tools.utils import save_to_pickle
+from app.tools.checkpoint_store import resolve_checkpoint
+
+
+class TrainingSupervisor:
+    """
+    Watches a training ContainerManager and restarts it from the newest checkpoint
+    when the `diambra run` process crashes or stops producing output.
+    """
+
+    def __init__(self, container_manager, stall_timeout=600, max_restarts=3, backoff_base=10, backoff_max=300,
+                 poll_interval=5):
+        """
+        Initialize the supervisor.
+
+        :param container_manager: ContainerManager running the training group.
+        :param stall_timeout: Seconds without stdout before the job is considered stalled.
+        :param max_restarts: Maximum automatic restarts per supervised run.
+        :param backoff_base: Delay in seconds before the first restart; doubled for each retry.
+        :param backoff_max: Upper bound for the restart delay.
+        :param poll_interval: Seconds between health checks.
+        """
+        self.container_manager = container_manager
+        self.stall_timeout = stall_timeout
+        self.max_restarts = max_restarts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.poll_interval = poll_interval
+        self.logger = LogManager("TrainingSupervisor")
+
+        self.training_manager = None
+        self.container_group = None
+        self.restarts = 0
+        self.incidents = []
+        self.state = "idle"
+        self._stop_event = threading.Event()
+        # Serializes stop() with the relaunch in _recover, so a stop can't be followed by a restart
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def configure(self, training_config):
+        """
+        Apply supervisor options from a training configuration.
+
+        :param training_config: The `training_config` section of the active configuration.
+        """
+        self.stall_timeout = int(training_config.get("stall_timeout") or self.stall_timeout)
+        # A configured 0 disables restarts, so only unset values keep the current setting
+        if training_config.get("max_restarts") not in (None, ""):
+            self.max_restarts = int(training_config["max_restarts"])
+
+    def start(self, training_manager, container_group="training_group"):
+        """
+        Begin supervising the training group.
+
+        :param training_manager: TrainingManager whose snapshot is re-pickled on restart.
+        :param container_group: Name of the supervised container group.
+        """
+        self.stop()
+        self.training_manager = training_manager
+        self.container_group = container_group
+        self.restarts = 0
+        self.incidents = []
+        self.state = "watching"
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._watch, daemon=True)
+        self._thread.start()
+        self.logger.info(
+            f"Supervising '{container_group}' (stall_timeout={self.stall_timeout}s, max_restarts={self.max_restarts})."
+        )
+
+    def stop(self):
+        """Stop supervising; a deliberate stop must never trigger a restart."""
+        with self._lock:
+            self._stop_event.set()
+        if self._thread and self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.poll_interval * 2)
+        self._thread = None
+        if self.state not in ("gave_up", "finished"):
+            self.state = "idle"
+
+    def _watch(self):
+        """Poll the container process for abnormal exits and stalls."""
+        while not self._stop_event.wait(self.poll_interval):
+            manager = self.container_manager
+            if manager.stop_requested:
+                continue
+
+            start_operation = manager.start_operation
+            if start_operation and not start_operation.done.is_set():
+                continue
+
+            exit_code = manager.get_exit_code()
+            if exit_code == 0:
+                self.logger.info(f"Training group '{self.container_group}' finished cleanly; supervisor exiting.")
+                self.state = "finished"
+                return
+
+            reason = None
+            if exit_code is not None:
+                reason = f"process exited with return code {exit_code}"
+            elif manager.last_output_time and time.time() - manager.last_output_time > self.stall_timeout:
+                reason = f"no output for {int(time.time() - manager.last_output_time)}s"
+
+            if reason and not self._recover(reason):
+                return
+
+    def _recover(self, reason):
+        """
+        Restart the training group from the latest checkpoint.
+
+        :param reason: Human-readable failure description.
+        :return: True if supervision should continue, False if it gave up.
+        """
+        detected_at = time.time()
+        last_output_time = self.container_manager.last_output_time
+        self.logger.error(f"Training group '{self.container_group}' failed: {reason}.")
+
+        if self.restarts >= self.max_restarts:
+            self.logger.error(f"Giving up after {self.restarts} restart(s).")
+            self.state = "gave_up"
+            self.container_manager.stop_container(self.container_group)
+            return False
+
+        delay = min(self.backoff_base * (2 ** self.restarts), self.backoff_max)
+        self.restarts += 1
+        self.state = "backoff"
+        self.logger.warning(f"Restart {self.restarts}/{self.max_restarts} in {delay}s...")
+        if self._stop_event.wait(delay):
+            return False
+
+        with self._lock:
+            # stop() may have been called after the backoff ended
+            if self._stop_event.is_set():
+                return False
+            self.state = "restarting"
+            checkpoint = self._prepare_resume()
+            operation = self.container_manager.restart_container(self.container_group)
+        operation.done.wait()
+
+        restarted_at = time.time()
+        checkpoint_time = os.path.getmtime(checkpoint) if checkpoint else None
+        incident = {
+            "reason": reason,
+            "detected_at": detected_at,
+            "restarted_at": restarted_at,
+            # Idle time between the last sign of life and the relaunch
+            "downtime": round(restarted_at - (last_output_time or detected_at), 3),
+            # Training progress since the checkpoint that has to be redone
+            "lost_progress_time": round(detected_at - checkpoint_time, 3) if checkpoint_time else None,
+            "checkpoint": checkpoint,
+            "error": operation.error,
+        }
+        self.incidents.append(incident)
+        self.logger.info(f"Training restarted from {checkpoint or 'scratch'} after {incident['downtime']}s downtime.")
+        self.state = "watching"
+        return True
+
+    def _prepare_resume(self):
+        """
+        Point the pickled TrainingManager at the newest checkpoint.
+
+        :return: Path of the checkpoint to resume from, or None to start from scratch.
+        """
+        training_config = self.training_manager.active_config["config"]["training_config"]
+        save_path = training_config.get("save_path") or DEFAULT_PATHS["save_path"]
+        checkpoint = resolve_checkpoint(save_path)
+
+        previous = training_config.get("resume_from")
+        training_config["resume_from"] = checkpoint or ""
+        try:
+            temp_dir = os.path.join(os.getcwd(), "tmp")
+            save_to_pickle(self.training_manager, "training_manager_snapshot.pkl", custom_dir=temp_dir)
+        finally:
+            training_config["resume_from"] = previous
+        return checkpoint
+
+    def get_status(self):
+        """
+        Summarize supervision state and lost-time metrics.
+
+        :return: JSON-serializable status dictionary.
+        """
+        return {
+            "state": self.state,
+            "restarts": self.restarts,
+            "max_restarts": self.max_restarts,
+            "stall_timeout": self.stall_timeout,
+            "total_downtime": round(sum(i["downtime"] for i in self.incidents), 3),
+            "total_lost_progress_time": round(sum(i["lost_progress_time"] or 0 for i in self.incidents), 3),
+            "incidents": self.incidents,
+        }